@@ -1,65 +1,148 @@
 """AI Chat Q&A — lets users ask questions about grants using Claude."""
 
-import anthropic
+from typing import Iterator, Optional
+
+from app.ai.client import ai_available, create_message, stream_text
+from app.ai.faq_cache import FAQCache
+from app.ai.prompt_builder import fit_to_budget, record_prompt, truncate_to_tokens
 from app.config import get_settings
 
-settings = get_settings()
+CHAT_MODEL = "claude-sonnet-4-5-20250929"
+
+# Profile fields that appear in the chat prompt — the only ones that can
+# change the answer, so the only ones the FAQ cache keys on
+PROMPT_PROFILE_FIELDS = ("county", "home_status", "employment_status")
+
+faq_cache = FAQCache(
+    "chat.faq",
+    maxsize=get_settings().AI_FAQ_CACHE_MAX_ENTRIES,
+    profile_fields=PROMPT_PROFILE_FIELDS,
+)
+
+UNAVAILABLE_MESSAGE = (
+    "I'm sorry, the AI assistant is not available at the moment. "
+    "Please check the individual grant pages for more information, "
+    "or contact the relevant government body directly."
+)
+
+SYSTEM_PROMPT = (
+    "You are an Irish government grants advisor chatbot for GrantFinder.ie. "
+    "You help users understand what grants they qualify for and how to apply.\n\n"
+    "Rules:\n"
+    "- Be accurate. Only reference grants you have data for.\n"
+    "- If unsure, say \"I'd recommend checking [source] directly\" with the URL.\n"
+    "- Use simple language, no jargon.\n"
+    "- Be concise — aim for 2-3 short paragraphs max.\n"
+    "- Always mention relevant amounts in Euro (€).\n"
+    "- Never give tax or legal advice — suggest consulting an accountant/solicitor.\n"
+    "- You are NOT a government representative. You help people find information."
+)
+
+
+def _error_message(e: Exception) -> str:
+    return (
+        "I'm sorry, I couldn't process your question right now. "
+        f"Please try again in a moment. (Error: {str(e)[:100]})"
+    )
+
+
+def _build_request(question: str, user_profile: dict, relevant_grants: list) -> dict:
+    """Keyword arguments for the Messages API call (shared by both variants).
+
+    ``relevant_grants`` is in relevance order; their context is fitted into
+    ``AI_CHAT_CONTEXT_TOKENS`` with long descriptions truncated first.
+    """
+    budget = get_settings().AI_CHAT_CONTEXT_TOKENS
+    grants = relevant_grants[:5]
+    # Share the budget across grants by trimming descriptions, so the amount
+    # and application link of each grant survive
+    description_tokens = budget // max(len(grants), 1) - 40
+    grants_context = "\n".join(fit_to_budget(
+        [
+            f"Grant: {g['name']}\n"
+            f"Description: {truncate_to_tokens(g.get('long_description', g.get('short_description', '')) or '', description_tokens)}\n"
+            f"Max amount: {g.get('amount_description', 'variable')}\n"
+            f"Eligibility: {g.get('notes', 'See official source')}\n"
+            f"How to apply: {g.get('application_url', g.get('source_url', ''))}\n"
+            for g in grants
+        ],
+        budget,
+    ))
+    content = (
+        f"User context:\n"
+        f"- County: {user_profile.get('county', 'unknown')}\n"
+        f"- Home status: {user_profile.get('home_status', 'unknown')}\n"
+        f"- Employment: {user_profile.get('employment_status', 'unknown')}\n"
+        f"\nRelevant grants in our database:\n{grants_context}\n"
+        f"User question: {question}"
+    )
+    record_prompt("chat", SYSTEM_PROMPT, content)
+    return {
+        "model": CHAT_MODEL,
+        "max_tokens": 800,
+        "system": SYSTEM_PROMPT,
+        "messages": [{"role": "user", "content": content}],
+    }
 
 
 def answer_grant_question(
-    question: str, user_profile: dict, relevant_grants: list
+    question: str,
+    user_profile: dict,
+    relevant_grants: list,
+    faq_key: Optional[tuple[str, str]] = None,
 ) -> str:
-    """Answer a user question about grants using their profile context."""
-    grants_context = "\n".join(
-        f"Grant: {g['name']}\n"
-        f"Description: {g.get('long_description', g.get('short_description', ''))}\n"
-        f"Max amount: {g.get('amount_description', 'variable')}\n"
-        f"Eligibility: {g.get('notes', 'See official source')}\n"
-        f"How to apply: {g.get('application_url', g.get('source_url', ''))}\n"
-        for g in relevant_grants[:5]
-    )
+    """Answer a user question about grants using their profile context.
+
+    ``faq_key`` is ``(grant_slug, catalogue_version)`` for questions scoped
+    to one grant; those answers are served from and stored in ``faq_cache``.
+    """
+    if faq_key:
+        cached = faq_cache.lookup(faq_key[0], question, user_profile, faq_key[1])
+        if cached is not None:
+            return cached
+
+    if not ai_available():
+        return UNAVAILABLE_MESSAGE
+
+    try:
+        message = create_message(**_build_request(question, user_profile, relevant_grants))
+        answer = message.content[0].text
+    except Exception as e:
+        return _error_message(e)
+    if faq_key:
+        faq_cache.store(faq_key[0], question, user_profile, faq_key[1], answer)
+    return answer
+
+
+def stream_grant_answer(
+    question: str,
+    user_profile: dict,
+    relevant_grants: list,
+    faq_key: Optional[tuple[str, str]] = None,
+) -> Iterator[str]:
+    """Like ``answer_grant_question`` but yields text chunks as they arrive.
+
+    Fallback messages and FAQ cache hits are yielded as a single chunk, so
+    callers can relay the iterator as-is.
+    """
+    if faq_key:
+        cached = faq_cache.lookup(faq_key[0], question, user_profile, faq_key[1])
+        if cached is not None:
+            yield cached
+            return
 
-    if not settings.ANTHROPIC_API_KEY:
-        return (
-            "I'm sorry, the AI assistant is not available at the moment. "
-            "Please check the individual grant pages for more information, "
-            "or contact the relevant government body directly."
-        )
+    if not ai_available():
+        yield UNAVAILABLE_MESSAGE
+        return
 
+    chunks: list[str] = []
     try:
-        client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-        message = client.messages.create(
-            model="claude-sonnet-4-5-20250929",
-            max_tokens=800,
-            system=(
-                "You are an Irish government grants advisor chatbot for GrantFinder.ie. "
-                "You help users understand what grants they qualify for and how to apply.\n\n"
-                "Rules:\n"
-                "- Be accurate. Only reference grants you have data for.\n"
-                "- If unsure, say \"I'd recommend checking [source] directly\" with the URL.\n"
-                "- Use simple language, no jargon.\n"
-                "- Be concise — aim for 2-3 short paragraphs max.\n"
-                "- Always mention relevant amounts in Euro (€).\n"
-                "- Never give tax or legal advice — suggest consulting an accountant/solicitor.\n"
-                "- You are NOT a government representative. You help people find information."
-            ),
-            messages=[
-                {
-                    "role": "user",
-                    "content": (
-                        f"User context:\n"
-                        f"- County: {user_profile.get('county', 'unknown')}\n"
-                        f"- Home status: {user_profile.get('home_status', 'unknown')}\n"
-                        f"- Employment: {user_profile.get('employment_status', 'unknown')}\n"
-                        f"\nRelevant grants in our database:\n{grants_context}\n"
-                        f"User question: {question}"
-                    ),
-                }
-            ],
-        )
-        return message.content[0].text
+        for chunk in stream_text(**_build_request(question, user_profile, relevant_grants)):
+            chunks.append(chunk)
+            yield chunk
     except Exception as e:
-        return (
-            "I'm sorry, I couldn't process your question right now. "
-            f"Please try again in a moment. (Error: {str(e)[:100]})"
-        )
+        # Mid-stream failures are appended after what the user has already seen
+        yield ("\n\n" if chunks else "") + _error_message(e)
+        return
+    if faq_key and chunks:
+        faq_cache.store(faq_key[0], question, user_profile, faq_key[1], "".join(chunks))
@@ -0,0 +1,168 @@
+"""Shared Anthropic client with connection pooling and a circuit breaker.
+
+All AI call sites go through :func:`create_message` / :func:`stream_text`
+so they reuse one pooled HTTP client (keep-alive connections and TLS
+sessions) and share a breaker: while the upstream is failing, calls raise
+``CircuitOpenError`` immediately and callers serve their template fallbacks
+instead of waiting out a timeout. After ``AI_BREAKER_RESET_SECONDS`` the
+next call is let through as a probe.
+
+Set ``ANTHROPIC_BASE_URL`` to point the client at a local stub server, or
+``AI_BACKEND=fake`` to use the offline backend in ``app/ai/fake.py``.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any, Iterator, Optional
+
+from app.ai import fake
+from app.ai.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.config import get_settings
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+_settings = get_settings()
+
+breaker = CircuitBreaker(
+    failure_threshold=_settings.AI_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=_settings.AI_BREAKER_RESET_SECONDS,
+)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide Anthropic client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _build_client()
+    return _client
+
+
+def _build_client():
+    import anthropic
+
+    settings = get_settings()
+    # Use the SDK's own HTTP client/limits types so this works whichever
+    # httpx flavour the installed SDK is built on
+    limits_cls = type(anthropic.DEFAULT_CONNECTION_LIMITS)
+    http_client = anthropic.DefaultHttpxClient(
+        limits=limits_cls(
+            max_connections=settings.AI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.AI_MAX_CONNECTIONS,
+            keepalive_expiry=60.0,
+        ),
+    )
+    return anthropic.Anthropic(
+        api_key=settings.ANTHROPIC_API_KEY,
+        base_url=settings.ANTHROPIC_BASE_URL or None,
+        timeout=anthropic.Timeout(
+            settings.AI_READ_TIMEOUT_SECONDS,
+            connect=settings.AI_CONNECT_TIMEOUT_SECONDS,
+        ),
+        max_retries=settings.AI_MAX_RETRIES,
+        http_client=http_client,
+    )
+
+
+def reset_client() -> None:
+    """Drop the shared client (e.g. after settings change in tests)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+
+def _use_fake() -> bool:
+    return get_settings().AI_BACKEND == "fake"
+
+
+def ai_available() -> bool:
+    """True if an API key is configured and the breaker isn't rejecting calls."""
+    if _use_fake():
+        return True
+    return bool(get_settings().ANTHROPIC_API_KEY) and not breaker.is_open()
+
+
+def _is_upstream_failure(exc: Exception) -> bool:
+    """Connection errors, timeouts, 429 and 5xx trip the breaker; 4xx don't."""
+    import anthropic
+
+    if isinstance(exc, anthropic.APIConnectionError):
+        return True
+    if isinstance(exc, anthropic.APIStatusError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return False
+
+
+def _record_error(exc: Exception) -> None:
+    """Feed a failed call into the breaker according to where it failed."""
+    import anthropic
+
+    if _is_upstream_failure(exc):
+        breaker.record_failure()
+        metrics.incr("ai.upstream.failures")
+    elif isinstance(exc, anthropic.APIError):
+        # The upstream answered (e.g. 400), so it is up
+        breaker.record_success()
+    else:
+        # Raised locally: says nothing about the upstream either way
+        breaker.release_probe()
+
+
+def create_message(timeout: Optional[float] = None, **kwargs: Any):
+    """``client.messages.create`` guarded by the circuit breaker.
+
+    ``timeout`` overrides the client default for this call only.
+    """
+    if _use_fake():
+        return fake.create_message(**kwargs)
+    if not breaker.allow():
+        metrics.incr("ai.breaker.rejected")
+        raise CircuitOpenError("AI service temporarily unavailable")
+
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    try:
+        message = get_client().messages.create(**kwargs)
+    except Exception as e:
+        _record_error(e)
+        raise
+    breaker.record_success()
+    return message
+
+
+def stream_text(timeout: Optional[float] = None, **kwargs: Any) -> Iterator[str]:
+    """Stream completion text chunks, guarded by the circuit breaker.
+
+    Raises ``CircuitOpenError`` before yielding anything if the breaker is
+    open. Upstream errors raised mid-stream propagate to the caller.
+    """
+    if _use_fake():
+        yield from fake.stream_text(**kwargs)
+        return
+    if not breaker.allow():
+        metrics.incr("ai.breaker.rejected")
+        raise CircuitOpenError("AI service temporarily unavailable")
+
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    try:
+        with get_client().messages.stream(**kwargs) as stream:
+            for text in stream.text_stream:
+                yield text
+    except GeneratorExit:
+        # Client disconnected — the upstream was fine
+        breaker.record_success()
+        raise
+    except Exception as e:
+        _record_error(e)
+        raise
+    breaker.record_success()
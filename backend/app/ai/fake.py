@@ -0,0 +1,51 @@
+"""Offline stand-in for the Anthropic API (``AI_BACKEND=fake``).
+
+Returns deterministic canned text so the AI code paths — including token
+streaming — can be exercised in development and tests without a key or
+network access.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from types import SimpleNamespace
+from typing import Any, Iterator
+
+FAKE_TOKEN_DELAY_SECONDS = 0.0
+
+
+def _prompt_text(kwargs: dict[str, Any]) -> str:
+    parts = [kwargs.get("system") or ""]
+    for m in kwargs.get("messages", []):
+        content = m.get("content", "")
+        parts.append(content if isinstance(content, str) else str(content))
+    return "\n".join(parts)
+
+
+def fake_completion(kwargs: dict[str, Any]) -> str:
+    """A short, deterministic reply derived from the prompt."""
+    prompt = _prompt_text(kwargs)
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+    return (
+        "This is an offline response from the fake AI backend. "
+        f"It was generated for a {len(prompt)}-character prompt (ref {digest}). "
+        "Check the grant pages linked in your results for full details."
+    )
+
+
+def create_message(**kwargs: Any) -> SimpleNamespace:
+    """Mimic ``client.messages.create`` — only ``.content[0].text`` is populated."""
+    return SimpleNamespace(
+        content=[SimpleNamespace(type="text", text=fake_completion(kwargs))],
+        model=kwargs.get("model", "fake"),
+    )
+
+
+def stream_text(**kwargs: Any) -> Iterator[str]:
+    """Mimic ``messages.stream(...).text_stream`` — yields word-sized chunks."""
+    words = fake_completion(kwargs).split(" ")
+    for i, word in enumerate(words):
+        if FAKE_TOKEN_DELAY_SECONDS:
+            time.sleep(FAKE_TOKEN_DELAY_SECONDS)
+        yield word if i == 0 else " " + word
@@ -0,0 +1,132 @@
+"""
+Near-duplicate answer cache for grant-scoped chat questions.
+
+Questions like "how do I apply?" and "How can I apply for this" should hit
+the same cached answer. Entries are bucketed by (grant slug, the profile
+fields the chat prompt uses, catalogue version). Within a bucket a question
+matches if its normalised form is identical, or if the Jaccard similarity
+of its word-shingle sets is at least ``threshold``.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+from app.ai.retrieval import tokenize
+from app.utils import metrics
+
+
+def normalise_question(question: str) -> tuple[str, ...]:
+    """Lowercased content words with stopwords and plural 's' removed."""
+    return tuple(tokenize(question))
+
+
+def shingles(tokens: tuple[str, ...]) -> frozenset[str]:
+    """Unigrams plus adjacent word pairs, so word order counts a little."""
+    grams = set(tokens)
+    grams.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return frozenset(grams)
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass
+class _Entry:
+    bucket: Hashable
+    normalised: tuple[str, ...]
+    shingles: frozenset[str]
+    answer: str
+
+
+class FAQCache:
+    """Bounded LRU of chat answers with shingle-similarity lookup."""
+
+    def __init__(
+        self,
+        name: str = "chat.faq",
+        maxsize: int = 2000,
+        threshold: float = 0.6,
+        profile_fields: tuple[str, ...] = (),
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.profile_fields = profile_fields
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._buckets: dict[Hashable, dict[tuple[str, ...], int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _bucket(self, grant_slug: str, profile: dict, catalogue_version: str) -> Hashable:
+        return (
+            grant_slug,
+            tuple(str(profile.get(f) or "").lower() for f in self.profile_fields),
+            catalogue_version,
+        )
+
+    def lookup(
+        self, grant_slug: str, question: str, profile: dict, catalogue_version: str
+    ) -> Optional[str]:
+        bucket = self._bucket(grant_slug, profile, catalogue_version)
+        norm = normalise_question(question)
+        with self._lock:
+            ids = self._buckets.get(bucket)
+            best_id = ids.get(norm) if ids else None
+            if best_id is None and ids:
+                query = shingles(norm)
+                best_score = self.threshold
+                for entry_id in ids.values():
+                    score = jaccard(query, self._entries[entry_id].shingles)
+                    if score >= best_score:
+                        best_id, best_score = entry_id, score
+            if best_id is None:
+                metrics.incr(f"{self.name}.misses")
+                return None
+            self._entries.move_to_end(best_id)
+            metrics.incr(f"{self.name}.hits")
+            return self._entries[best_id].answer
+
+    def store(
+        self, grant_slug: str, question: str, profile: dict, catalogue_version: str, answer: str
+    ) -> None:
+        bucket = self._bucket(grant_slug, profile, catalogue_version)
+        norm = normalise_question(question)
+        with self._lock:
+            ids = self._buckets.setdefault(bucket, {})
+            old_id = ids.pop(norm, None)
+            if old_id is not None:
+                self._entries.pop(old_id, None)
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _Entry(bucket, norm, shingles(norm), answer)
+            ids[norm] = entry_id
+            while len(self._entries) > self.maxsize:
+                _, evicted = self._entries.popitem(last=False)
+                bucket_ids = self._buckets.get(evicted.bucket)
+                if bucket_ids is not None:
+                    bucket_ids.pop(evicted.normalised, None)
+                    if not bucket_ids:
+                        del self._buckets[evicted.bucket]
+
+    def stats(self) -> dict:
+        hits = metrics.get_counter(f"{self.name}.hits")
+        misses = metrics.get_counter(f"{self.name}.misses")
+        total = hits + misses
+        return {
+            "entries": len(self._entries),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
@@ -0,0 +1,87 @@
+"""
+Token-budgeted prompt assembly shared by all AI call sites.
+
+Token counts are estimated locally (no tokenizer round-trip): English prose
+averages roughly four characters per token, and we round up so estimates
+err on the generous side. Grant context is fitted into a per-call budget by
+taking entries in priority order, truncating the last one that only partly
+fits, and dropping the rest.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import Optional, Sequence
+
+from app.utils import metrics
+
+CHARS_PER_TOKEN = 4.0
+MIN_ENTRY_TOKENS = 30  # Don't bother including a stub shorter than this
+
+_SENTENCE_END = re.compile(r"[.!?]\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local estimate of the number of model tokens in ``text``."""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` to about ``max_tokens``, preferring a sentence or word boundary."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    limit = max(int(max_tokens * CHARS_PER_TOKEN) - 1, 0)
+    cut = text[:limit]
+    sentence_ends = [m.end() for m in _SENTENCE_END.finditer(cut)]
+    if sentence_ends and sentence_ends[-1] > limit // 2:
+        return cut[: sentence_ends[-1]].rstrip()
+    space = cut.rfind(" ")
+    if space > limit // 2:
+        cut = cut[:space]
+    return cut.rstrip(" ,;:") + "…"
+
+
+def fit_to_budget(
+    entries: Sequence[str],
+    budget: int,
+    scores: Optional[Sequence[float]] = None,
+    max_entry_tokens: Optional[int] = None,
+) -> list[str]:
+    """
+    Select and trim context entries so their total fits ``budget`` tokens.
+
+    Entries are taken in descending ``scores`` order (ties keep input order;
+    without scores the input order is the priority). Each entry is first
+    capped at ``max_entry_tokens``; the first entry that doesn't fully fit is
+    truncated to the remaining budget, and everything after it is dropped.
+    Returns the chosen entries in priority order.
+    """
+    order = range(len(entries))
+    if scores is not None:
+        order = sorted(order, key=lambda i: -scores[i])
+
+    chosen: list[str] = []
+    remaining = budget
+    for i in order:
+        text = entries[i]
+        if max_entry_tokens is not None:
+            text = truncate_to_tokens(text, max_entry_tokens)
+        cost = estimate_tokens(text) + 1  # + separator
+        if cost <= remaining:
+            chosen.append(text)
+            remaining -= cost
+            continue
+        if remaining >= MIN_ENTRY_TOKENS:
+            chosen.append(truncate_to_tokens(text, remaining - 1))
+        break
+    return chosen
+
+
+def record_prompt(site: str, *parts: Optional[str]) -> int:
+    """Estimate total prompt tokens for one call and record it as a metric."""
+    tokens = sum(estimate_tokens(p or "") for p in parts)
+    metrics.observe(f"ai.prompt_tokens.{site}", tokens)
+    return tokens
@@ -0,0 +1,112 @@
+"""Content-addressed cache for model completions, with request coalescing.
+
+A completion is cached under ``sha256(model + prompt)``. Identical prompts
+arriving while the first one is still in flight wait on that call instead of
+issuing their own, so N concurrent duplicates cost one upstream request.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from app.utils import metrics
+from app.utils.ttl_cache import TTLCache
+
+
+def prompt_key(prompt: str, model: str) -> str:
+    return hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+class PromptCache:
+    """TTL + LRU bounded completion cache keyed by prompt hash.
+
+    Metrics are emitted under ``<name>.hits``, ``<name>.misses``,
+    ``<name>.coalesced``, ``<name>.latency_saved_ms`` (counters) and
+    ``<name>.upstream_ms`` (summary).
+    """
+
+    def __init__(self, name: str, maxsize: int = 2048, ttl: float = 86400.0):
+        self.name = name
+        self._cache: TTLCache[str] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._avg_upstream_ms = 0.0
+
+    def peek(self, prompt: str, model: str) -> Optional[str]:
+        """Return a cached completion without computing; counts as a hit if found."""
+        value = self._cache.get(prompt_key(prompt, model))
+        if value is not None:
+            self._record_hit()
+        return value
+
+    def get_or_compute(self, prompt: str, model: str, compute: Callable[[], str]) -> str:
+        """Return the cached completion, or run ``compute`` exactly once for it."""
+        key = prompt_key(prompt, model)
+        value = self._cache.get(key)
+        if value is not None:
+            self._record_hit()
+            return value
+
+        with self._lock:
+            # A leader stores its result before leaving _inflight, so this
+            # catches one that finished since the lookup above
+            value = self._cache.get(key)
+            future = self._inflight.get(key)
+            leader = value is None and future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if value is not None:
+            self._record_hit()
+            return value
+        if not leader:
+            metrics.incr(f"{self.name}.coalesced")
+            return future.result()
+
+        metrics.incr(f"{self.name}.misses")
+        start = time.perf_counter()
+        try:
+            value = compute()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            metrics.observe(f"{self.name}.upstream_ms", elapsed_ms)
+            # Exponential moving average, used to estimate latency saved by hits
+            self._avg_upstream_ms = (
+                elapsed_ms if not self._avg_upstream_ms
+                else 0.8 * self._avg_upstream_ms + 0.2 * elapsed_ms
+            )
+            self._cache.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        hits = metrics.get_counter(f"{self.name}.hits")
+        misses = metrics.get_counter(f"{self.name}.misses")
+        coalesced = metrics.get_counter(f"{self.name}.coalesced")
+        total = hits + misses + coalesced
+        return {
+            "entries": len(self._cache),
+            "hits": hits,
+            "misses": misses,
+            "coalesced": coalesced,
+            "hit_rate": (hits + coalesced) / total if total else 0.0,
+            "latency_saved_ms": metrics.get_counter(f"{self.name}.latency_saved_ms"),
+        }
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def _record_hit(self) -> None:
+        metrics.incr(f"{self.name}.hits")
+        metrics.incr(f"{self.name}.latency_saved_ms", self._avg_upstream_ms)
@@ -0,0 +1,152 @@
+"""
+In-memory BM25 index over the grant catalogue for chat context retrieval.
+
+Each grant is indexed on its name (weighted), descriptions, amount text and
+Revenue claiming instructions. The index is built once per catalogue version
+and answers top-k queries with a postings-list walk — well under a
+millisecond for the catalogue sizes we have.
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.engine.how_to_claim import HOW_TO_CLAIM
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+NAME_WEIGHT = 3  # Name tokens are counted this many times
+SCAN_BOOST = 0.5  # Score multiplier bonus for grants in the user's latest scan
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from get has have how i if in is it
+its me my of on or so than that the their them then there these they this to up
+was we what when where which who will with you your am im i'm would could should
+""".split())
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens with stopwords removed and plural 's' stripped."""
+    tokens = []
+    for tok in _TOKEN_RE.findall(text.lower()):
+        if tok in STOPWORDS:
+            continue
+        if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+            tok = tok[:-1]
+        tokens.append(tok)
+    return tokens
+
+
+def _grant_tokens(grant: dict) -> list[str]:
+    name = tokenize(grant.get("name") or "")
+    body = " ".join(
+        grant.get(f) or ""
+        for f in ("short_description", "long_description", "amount_description")
+    )
+    body += " " + HOW_TO_CLAIM.get(grant.get("slug", ""), "")
+    return name * NAME_WEIGHT + tokenize(body)
+
+
+@dataclass
+class GrantIndex:
+    """BM25 postings over a fixed list of grant dicts."""
+
+    version: str
+    grants: list[dict]
+    postings: dict[str, list[tuple[int, int]]] = field(default_factory=dict)
+    idf: dict[str, float] = field(default_factory=dict)
+    doc_len: list[int] = field(default_factory=list)
+    avg_len: float = 0.0
+    by_id: dict[str, dict] = field(default_factory=dict)
+    defaults: list[dict] = field(default_factory=list)  # Highest value first
+
+    @classmethod
+    def build(cls, version: str, grants: list[dict]) -> "GrantIndex":
+        index = cls(version=version, grants=list(grants))
+        for doc_id, grant in enumerate(index.grants):
+            tokens = _grant_tokens(grant)
+            index.doc_len.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                index.postings.setdefault(term, []).append((doc_id, tf))
+        n = len(index.grants)
+        index.avg_len = (sum(index.doc_len) / n) if n else 0.0
+        index.idf = {
+            term: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5))
+            for term, p in index.postings.items()
+        }
+        index.by_id = {g["id"]: g for g in index.grants}
+        index.defaults = sorted(index.grants, key=lambda g: (-(g.get("max_amount") or 0), g["name"]))
+        return index
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        boost: Optional[dict[str, float]] = None,
+    ) -> list[dict]:
+        """
+        Return up to ``k`` grant dicts ranked by BM25 relevance to ``query``.
+
+        ``boost`` maps grant id → weight in [0, 1] (e.g. match score / 100 from
+        the user's latest scan); boosted grants score up to ``1 + SCAN_BOOST``
+        times higher. If fewer than ``k`` grants match any query term, the
+        remaining slots are filled with the most strongly boosted grants and
+        then the highest-value ones, so a generic question still gets context.
+        """
+        boost = boost or {}
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf[term]
+            for doc_id, tf in postings:
+                norm = K1 * (1 - B + B * self.doc_len[doc_id] / self.avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+
+        for doc_id in scores:
+            weight = boost.get(self.grants[doc_id]["id"])
+            if weight:
+                scores[doc_id] *= 1 + SCAN_BOOST * weight
+
+        ranked = sorted(scores, key=lambda d: scores[d], reverse=True)[:k]
+        results = [self.grants[d] for d in ranked]
+
+        if len(results) < k:
+            chosen = {g["id"] for g in results}
+            boosted = (
+                self.by_id[i] for i in sorted(boost, key=lambda i: boost[i], reverse=True) if i in self.by_id
+            )
+            for grant in itertools.chain(boosted, self.defaults):
+                if len(results) >= k:
+                    break
+                if grant["id"] not in chosen:
+                    results.append(grant)
+                    chosen.add(grant["id"])
+        return results
+
+
+_lock = threading.Lock()
+_index: Optional[GrantIndex] = None
+
+
+def get_index(catalogue) -> GrantIndex:
+    """Return the index for this catalogue snapshot, rebuilding on version change."""
+    global _index
+    index = _index
+    if index is not None and index.version == catalogue.version:
+        return index
+    with _lock:
+        if _index is None or _index.version != catalogue.version:
+            _index = GrantIndex.build(catalogue.version, catalogue.grants)
+        return _index
@@ -1,9 +1,16 @@
 """AI-generated scan summary using Claude API."""
 
-import anthropic
+from app.ai.client import ai_available, create_message
+from app.ai.prompt_builder import fit_to_budget, record_prompt
 from app.config import get_settings
 
-settings = get_settings()
+SYSTEM_PROMPT = (
+    "You are an Irish grants advisor. Generate a warm, encouraging, "
+    "plain-English summary of the grant scan results. Be specific about "
+    "amounts and categories. Keep it to 3-4 sentences. Use Euro (€) symbol. "
+    "Don't use marketing language or exclamation marks. Be factual but friendly. "
+    "Address the user as 'you'. Write as if speaking to them directly."
+)
 
 
 def generate_scan_summary(user_profile: dict, matched_grants: list) -> str:
@@ -12,41 +19,38 @@ def generate_scan_summary(user_profile: dict, matched_grants: list) -> str:
     Falls back to a templated summary if the Anthropic key is not configured
     or the API call fails.
     """
-    # Build grant list text
-    grants_text = "\n".join(
-        f"- {g['name']} ({g['category']}): up to {g.get('amount_description', 'variable')} — {g['match_type']}"
-        for g in matched_grants[:20]
-    )
+    # Build grant list text, highest match scores first, within the token budget
+    top = matched_grants[:20]
+    grants_text = "\n".join(fit_to_budget(
+        [
+            f"- {g['name']} ({g['category']}): up to {g.get('amount_description', 'variable')} — {g['match_type']}"
+            for g in top
+        ],
+        get_settings().AI_SUMMARY_CONTEXT_TOKENS,
+        scores=[g.get("match_score") or 0 for g in top],
+        max_entry_tokens=80,
+    ))
 
-    if not settings.ANTHROPIC_API_KEY:
+    if not ai_available():
         return _fallback_summary(user_profile, matched_grants)
 
+    content = (
+        f"User profile summary:\n"
+        f"- Age: {user_profile.get('age', 'unknown')}\n"
+        f"- County: {user_profile.get('county', 'unknown')}\n"
+        f"- Home status: {user_profile.get('home_status', 'unknown')}\n"
+        f"- Employment: {user_profile.get('employment_status', 'unknown')}\n"
+        f"\nMatched grants:\n{grants_text}\n\n"
+        "Generate a personalised summary paragraph."
+    )
+    record_prompt("scan_summary", SYSTEM_PROMPT, content)
+
     try:
-        client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-        message = client.messages.create(
+        message = create_message(
             model="claude-sonnet-4-5-20250929",
             max_tokens=500,
-            system=(
-                "You are an Irish grants advisor. Generate a warm, encouraging, "
-                "plain-English summary of the grant scan results. Be specific about "
-                "amounts and categories. Keep it to 3-4 sentences. Use Euro (€) symbol. "
-                "Don't use marketing language or exclamation marks. Be factual but friendly. "
-                "Address the user as 'you'. Write as if speaking to them directly."
-            ),
-            messages=[
-                {
-                    "role": "user",
-                    "content": (
-                        f"User profile summary:\n"
-                        f"- Age: {user_profile.get('age', 'unknown')}\n"
-                        f"- County: {user_profile.get('county', 'unknown')}\n"
-                        f"- Home status: {user_profile.get('home_status', 'unknown')}\n"
-                        f"- Employment: {user_profile.get('employment_status', 'unknown')}\n"
-                        f"\nMatched grants:\n{grants_text}\n\n"
-                        "Generate a personalised summary paragraph."
-                    ),
-                }
-            ],
+            system=SYSTEM_PROMPT,
+            messages=[{"role": "user", "content": content}],
         )
         return message.content[0].text
     except Exception:
@@ -10,6 +10,7 @@ from sqlalchemy import func
 from slugify import slugify
 
 from app.database import get_db
+from app.engine.catalogue import invalidate_catalogue
 from app.models.user import User
 from app.models.grant import Grant, GrantDocument, GrantStep
 from app.models.eligibility_rule import EligibilityRule
@@ -22,6 +23,7 @@ from app.schemas.grant import (
     EligibilityRuleCreate,
     EligibilityRuleResponse,
 )
+from app.utils import metrics
 from app.utils.auth import get_current_user
 
 router = APIRouter(prefix="/api/v1/admin", tags=["Admin"])
@@ -96,6 +98,7 @@ def admin_create_grant(
         new_values=body.model_dump(),
     ))
     db.commit()
+    invalidate_catalogue()
     db.refresh(grant)
 
     return _grant_dict(grant)
@@ -127,6 +130,7 @@ def admin_update_grant(
         new_values=update_data,
     ))
     db.commit()
+    invalidate_catalogue()
     db.refresh(grant)
     return _grant_dict(grant)
 
@@ -149,6 +153,7 @@ def admin_delete_grant(
         change_type="deactivated",
     ))
     db.commit()
+    invalidate_catalogue()
     return {"message": "Grant deactivated"}
 
 
@@ -178,6 +183,7 @@ def admin_add_rule(
     )
     db.add(rule)
     db.commit()
+    invalidate_catalogue()
     db.refresh(rule)
     return {
         "id": str(rule.id),
@@ -200,6 +206,7 @@ def admin_update_rule(
     for field, value in body.model_dump().items():
         setattr(rule, field, value)
     db.commit()
+    invalidate_catalogue()
     return {"message": "Rule updated"}
 
 
@@ -215,6 +222,7 @@ def admin_delete_rule(
         raise HTTPException(404, "Rule not found")
     db.delete(rule)
     db.commit()
+    invalidate_catalogue()
 
 
 # ── Stats ────────────────────────────────────────────────────────────────────
@@ -240,6 +248,25 @@ def admin_stats(
     }
 
 
+@router.get("/metrics")
+def admin_metrics(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    """In-process performance metrics (counters reset on restart)."""
+    _require_admin(user)
+    from app.ai.chat import faq_cache
+    from app.engine.ai_summary import summary_cache
+    from app.mail.outbox import outbox_stats
+    from app.reports.render_pool import render_pool_stats
+    from app.reports.store import get_report_store
+    return {
+        **metrics.snapshot(),
+        "ai_summary_cache": summary_cache.stats(),
+        "chat_faq_cache": faq_cache.stats(),
+        "render_pool": render_pool_stats(),
+        "report_store": get_report_store().stats(),
+        "mail_outbox": outbox_stats(db),
+    }
+
+
 # ── Bulk import ──────────────────────────────────────────────────────────────
 
 @router.post("/grants/import")
@@ -319,6 +346,7 @@ async def admin_import_grants(
         imported += 1
 
     db.commit()
+    invalidate_catalogue()
     return {"imported": imported, "total_in_file": len(grants_data)}
 
 
@@ -1,18 +1,27 @@
 """AI Chat endpoint: ask questions about grants using Claude API."""
 
+import json
+from typing import Iterator
+
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
 from app.database import get_db
 from app.models.user import User
-from app.models.grant import Grant
 from app.models.profile import UserProfile
-from app.ai.chat import answer_grant_question
+from app.models.scan_result import ScanResult
+from app.engine.scan_store import load_matches
+from app.ai.chat import answer_grant_question, stream_grant_answer
+from app.ai.retrieval import get_index
+from app.engine.catalogue import get_catalogue
 from app.utils.auth import get_current_user
 
 router = APIRouter(prefix="/api/v1/chat", tags=["Chat"])
 
+CONTEXT_GRANTS = 5  # Grants sent as context when no grant_slug is given
+
 
 class ChatRequest(BaseModel):
     question: str
@@ -24,12 +33,26 @@ class ChatResponse(BaseModel):
     sources: list[str] = []  # Grant slugs used for context
 
 
-@router.post("", response_model=ChatResponse)
-def chat(
-    body: ChatRequest,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
+def _latest_scan_boost(user: User, db: Session) -> dict[str, float]:
+    """Grant id → match score (0-1) from the user's most recent scan."""
+    scan = (
+        db.query(ScanResult)
+        .filter(ScanResult.user_id == user.id)
+        .order_by(ScanResult.created_at.desc())
+        .first()
+    )
+    if scan is None:
+        return {}
+    return {str(m.grant_id): (m.match_score or 0) / 100 for m in load_matches(db, scan)}
+
+
+def _load_chat_context(
+    body: ChatRequest, user: User, db: Session
+) -> tuple[dict, list[dict], tuple[str, str] | None]:
+    """Premium gate, then load the user's profile and the grants to use as context.
+
+    The third element is the FAQ cache key for grant-scoped questions.
+    """
     if user.plan != "premium":
         raise HTTPException(403, "AI Chat requires a Premium subscription")
 
@@ -43,37 +66,78 @@ def chat(
     profile_dict = profile.to_dict() if profile else {}
 
     # Load relevant grants
+    catalogue = get_catalogue(db)
     if body.grant_slug:
-        grants = (
-            db.query(Grant)
-            .filter(Grant.slug == body.grant_slug, Grant.is_active == True)  # noqa: E712
-            .all()
-        )
+        grant = catalogue.by_slug.get(body.grant_slug)
+        grants = [grant] if grant else []
+        faq_key = (body.grant_slug, catalogue.version) if grant else None
     else:
-        # Use the user's most recent scan results or top grants
-        grants = (
-            db.query(Grant)
-            .filter(Grant.is_active == True)  # noqa: E712
-            .limit(10)
-            .all()
+        # Rank by relevance to the question, biased towards the latest scan
+        grants = get_index(catalogue).search(
+            body.question, k=CONTEXT_GRANTS, boost=_latest_scan_boost(user, db)
         )
+        faq_key = None
 
     grants_data = [
         {
-            "name": g.name,
-            "slug": g.slug,
-            "long_description": g.long_description or g.short_description,
-            "amount_description": g.amount_description,
-            "source_url": g.source_url,
-            "application_url": g.application_url,
+            "name": g["name"],
+            "slug": g["slug"],
+            "long_description": g["long_description"] or g["short_description"],
+            "amount_description": g["amount_description"],
+            "source_url": g["source_url"],
+            "application_url": g["application_url"],
             "notes": "",
         }
         for g in grants
     ]
+    return profile_dict, grants_data, faq_key
+
+
+@router.post("", response_model=ChatResponse)
+def chat(
+    body: ChatRequest,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    profile_dict, grants_data, faq_key = _load_chat_context(body, user, db)
 
-    answer = answer_grant_question(body.question, profile_dict, grants_data)
+    answer = answer_grant_question(body.question, profile_dict, grants_data, faq_key)
 
     return ChatResponse(
         answer=answer,
-        sources=[g.slug for g in grants],
+        sources=[g["slug"] for g in grants_data],
+    )
+
+
+def _sse(data: dict, event: str | None = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+@router.post("/stream")
+def chat_stream(
+    body: ChatRequest,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Same as ``POST /chat`` but relays the answer as server-sent events.
+
+    Events: one ``sources`` event, then ``data: {"text": ...}`` per chunk,
+    then ``done``.
+    """
+    profile_dict, grants_data, faq_key = _load_chat_context(body, user, db)
+    sources = [g["slug"] for g in grants_data]
+
+    def events() -> Iterator[str]:
+        yield _sse({"sources": sources}, event="sources")
+        for chunk in stream_grant_answer(
+            body.question, profile_dict, grants_data, faq_key
+        ):
+            yield _sse({"text": chunk})
+        yield _sse({}, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
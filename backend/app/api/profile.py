@@ -11,6 +11,8 @@ from app.models.user import User
 from app.models.profile import UserProfile
 from app.models.scan_result import ScanResult
 from app.models.alert import GrantAlert
+from app.engine.background_scan import schedule_scan
+from app.engine.scan_store import forget_latest_scan, load_matches
 from app.schemas.profile import ProfileRequest, ProfileResponse
 from app.utils.auth import get_current_user
 
@@ -38,7 +40,10 @@ def create_or_update_profile(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Create or fully update user profile (questionnaire answers)."""
+    """Create or fully update user profile (questionnaire answers).
+
+    Also schedules a background scan so results are ready when asked for.
+    """
     profile = _get_or_create_profile(user, db)
 
     update_data = body.model_dump(exclude_unset=True)
@@ -55,6 +60,8 @@ def create_or_update_profile(
 
     db.commit()
     db.refresh(profile)
+    forget_latest_scan(user.id)  # Savings in /scan/results depend on the profile
+    schedule_scan(user.id)
 
     return _profile_to_response(profile)
 
@@ -99,6 +106,8 @@ def update_profile_partial(
 
     db.commit()
     db.refresh(profile)
+    forget_latest_scan(user.id)  # Savings in /scan/results depend on the profile
+    schedule_scan(user.id)
     return _profile_to_response(profile)
 
 
@@ -169,6 +178,7 @@ def delete_account(
     """Delete the user's account and all associated data (GDPR Article 17 - Right to Erasure)."""
     db.delete(user)
     db.commit()
+    forget_latest_scan(user.id)
     return None
 
 
@@ -196,11 +206,11 @@ def export_user_data(
         matched = [
             {
                 "grant_id": str(mg.grant_id),
-                "match_score": float(mg.match_score) if mg.match_score else None,
+                "match_score": mg.match_score or None,
                 "match_type": mg.match_type,
                 "notes": mg.notes,
             }
-            for mg in sr.matched_grants
+            for mg in load_matches(db, sr)
         ]
         scan_data.append({
             "id": str(sr.id),
@@ -1,29 +1,46 @@
 """PDF report generation, download, and email endpoints — free for all users."""
 
+import uuid
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import Response
-from pydantic import BaseModel, EmailStr
-from sqlalchemy.orm import Session, joinedload
+from pydantic import BaseModel, EmailStr, Field
+from sqlalchemy.orm import Session
 
+from app.config import get_settings
 from app.database import get_db
-from app.models.grant import Grant
+from app.engine.catalogue import get_catalogue
 from app.engine.matcher import GrantMatcher
 from app.engine.savings import calculate_savings
 from app.engine.ai_summary import generate_ai_summary
-from app.engine.how_to_claim import HOW_TO_CLAIM
+from app.engine.summary_archetypes import lookup_summary
+from app.engine.scan_handles import get_handle, ready_summary, report_grant
+from app.mail.outbox import enqueue_email
+from app.mail.providers import get_provider
+from app.models.email_outbox import EmailOutbox
 from app.reports.generator import generate_report_bytes
+from app.reports.render_pool import RenderQueueFull, get_render_pool
+from app.reports.store import get_report_store, report_key
 from app.schemas.scan import AnonymousScanRequest
+from app.utils.deadline import Deadline, DeadlineExceeded
+from app.utils.idempotency import idempotency_key, request_fingerprint, run_idempotent
 
 router = APIRouter(prefix="/api/v1/reports", tags=["Reports"])
+Renderer = Literal["weasyprint", "fast"]
 matcher = GrantMatcher()
 
 
-def _build_report_data(body: AnonymousScanRequest, db: Session) -> tuple[list[dict], dict, float]:
-    """Run scan and build enriched grant data for the report."""
-    profile_dict = body.model_dump(exclude_unset=True)
+def _build_report_data(
+    body: AnonymousScanRequest, db: Session, deadline: Optional[Deadline] = None
+) -> tuple[list[dict], dict, float, str]:
+    """Run scan and build enriched grant data for the report.
+
+    Also returns the catalogue version the matches were computed from.
+    Raises ``DeadlineExceeded`` if ``deadline`` passed before matching.
+    """
+    profile_dict = body.model_dump(exclude_unset=True, exclude={"scan_handle", "renderer"})
 
     # Compute convenience flags
     age = profile_dict.get("age")
@@ -36,13 +53,10 @@ def _build_report_data(body: AnonymousScanRequest, db: Session) -> tuple[list[di
         profile_dict["has_child_under_7"] = youngest < 7
 
     # Run the matcher
-    grants = (
-        db.query(Grant)
-        .filter(Grant.is_active == True)  # noqa: E712
-        .options(joinedload(Grant.eligibility_rules))
-        .all()
-    )
-    results = matcher.match(profile_dict, grants)
+    catalogue = get_catalogue(db)
+    if deadline is not None:
+        deadline.check("match")
+    results = matcher.match(profile_dict, catalogue.grants)
     income_bracket = profile_dict.get("income_bracket")
 
     # Build enriched grant dicts
@@ -55,43 +69,102 @@ def _build_report_data(body: AnonymousScanRequest, db: Session) -> tuple[list[di
             income_bracket=income_bracket,
             profile=profile_dict,
         )
-        matched_grants.append({
-            "name": r.grant_name,
-            "slug": r.slug,
-            "category": r.category,
-            "match_type": r.match_type.value,
-            "match_score": r.match_score,
-            "max_amount": r.max_amount,
-            "amount_description": r.amount_description or "",
-            "short_description": r.short_description,
-            "source_url": r.source_url,
-            "application_url": r.application_url,
-            "notes": r.notes,
-            "estimated_annual_saving": savings["estimated_annual_saving"],
-            "estimated_backdated_saving": savings["estimated_backdated_saving"],
-            "savings_note": savings["savings_note"],
-            "how_to_claim": HOW_TO_CLAIM.get(r.slug, ""),
-        })
+        matched_grants.append(report_grant(r, savings))
 
     total_value = sum(g.get("max_amount") or 0 for g in matched_grants)
 
-    return matched_grants, profile_dict, total_value
+    return matched_grants, profile_dict, total_value, catalogue.version
 
 
-@router.post("/download")
-def download_pdf_report(
-    body: AnonymousScanRequest,
-    db: Session = Depends(get_db),
-):
-    """Generate and download a PDF report. No authentication required."""
-    matched_grants, profile_dict, total_value = _build_report_data(body, db)
+def _report_summary(
+    profile_dict: dict,
+    matched_grants: list[dict],
+    total_value: float,
+    catalogue_version: str,
+    deadline: Deadline,
+) -> str:
+    """Pre-generated archetype summary if there is one, else generate it now.
 
-    # Generate AI summary for the PDF
-    ai_summary = generate_ai_summary(profile_dict, matched_grants, total_value)
+    The AI call only gets the budget left after reserving time for
+    rendering and sending; with too little left it returns the fallback.
+    """
+    pregenerated = lookup_summary(catalogue_version, profile_dict, matched_grants)
+    if pregenerated is not None:
+        return pregenerated
+    return generate_ai_summary(
+        profile_dict,
+        matched_grants,
+        total_value,
+        deadline=deadline.reserve(get_settings().REPORT_RENDER_RESERVE_SECONDS),
+    )
 
-    # Generate the PDF
-    pdf_bytes = generate_report_bytes(matched_grants, ai_summary=ai_summary)
 
+def _report_inputs(
+    profile: AnonymousScanRequest,
+    scan_handle: Optional[str],
+    db: Session,
+    deadline: Deadline,
+) -> tuple[list[dict], float, str, str]:
+    """Grants, total value, catalogue version and summary for a report.
+
+    Reuses the results behind ``scan_handle`` when it is still valid for the
+    current catalogue (and the scan's AI summary if it has finished);
+    otherwise matches ``profile`` from scratch.
+    """
+    if scan_handle:
+        catalogue_version = get_catalogue(db).version
+        scan = get_handle(scan_handle, catalogue_version)
+        if scan is not None:
+            ai_summary = ready_summary(scan)
+            if ai_summary is None:
+                ai_summary = _report_summary(
+                    scan.profile, scan.matched_grants, scan.total_value, catalogue_version, deadline
+                )
+            return scan.matched_grants, scan.total_value, catalogue_version, ai_summary
+
+    matched_grants, profile_dict, total_value, catalogue_version = _build_report_data(profile, db, deadline)
+    ai_summary = _report_summary(
+        profile_dict, matched_grants, total_value, catalogue_version, deadline
+    )
+    return matched_grants, total_value, catalogue_version, ai_summary
+
+
+def _renderer(requested: Optional[str]) -> str:
+    """The renderer a request asked for, else the configured default."""
+    return requested or get_settings().REPORT_RENDERER
+
+
+def _render_pdf(deadline: Deadline, **kwargs) -> bytes:
+    """Cached PDF for these inputs, else render in the worker pool (inline if
+    disabled) waiting until ``deadline``, and cache the result."""
+    store = get_report_store()
+    key = report_key(**kwargs)
+    cached = store.get(key)
+    if cached is not None:
+        return cached
+
+    pdf_bytes = _render_uncached(deadline, **kwargs)
+    store.put(key, pdf_bytes)
+    return pdf_bytes
+
+
+def _render_uncached(deadline: Deadline, **kwargs) -> bytes:
+    deadline.check("render")
+    pool = get_render_pool()
+    if pool is None:
+        return generate_report_bytes(**kwargs)
+    try:
+        return pool.render_sync(timeout=deadline.remaining(), **kwargs)
+    except RenderQueueFull:
+        raise HTTPException(503, "Too many reports are being generated right now. Please try again shortly.")
+    except TimeoutError:
+        deadline.skip("render")
+        raise DeadlineExceeded("Report rendering did not finish within the request budget")
+    except RuntimeError as e:
+        raise HTTPException(500, f"Failed to generate report: {e}")
+
+
+def _pdf_response(pdf_bytes: bytes) -> Response:
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     filename = f"GrantFinder_Report_{timestamp}.pdf"
 
@@ -104,89 +177,242 @@ def download_pdf_report(
     )
 
 
+class ReportRequest(AnonymousScanRequest):
+    """Scan profile, or the ``scan_handle`` from a scan response to reuse its results."""
+    scan_handle: Optional[str] = None
+    renderer: Optional[Renderer] = None  # Defaults to the REPORT_RENDERER setting
+
+
+@router.post("/download")
+def download_pdf_report(
+    body: ReportRequest,
+    db: Session = Depends(get_db),
+):
+    """Generate and download a PDF report. No authentication required."""
+    deadline = Deadline(get_settings().REPORT_REQUEST_BUDGET_SECONDS)
+    matched_grants, total_value, catalogue_version, ai_summary = _report_inputs(
+        body, body.scan_handle, db, deadline
+    )
+
+    # Generate the PDF
+    pdf_bytes = _render_pdf(
+        deadline,
+        matched_grants=matched_grants,
+        ai_summary=ai_summary,
+        catalogue_version=catalogue_version,
+        renderer=_renderer(body.renderer),
+    )
+
+    return _pdf_response(pdf_bytes)
+
+
+class ReportLinkResponse(BaseModel):
+    url: str
+    expires_in: int
+
+
+@router.post("/link", response_model=ReportLinkResponse)
+def report_link(
+    body: ReportRequest,
+    db: Session = Depends(get_db),
+):
+    """Like ``/download`` but returns a presigned S3 URL instead of the bytes."""
+    settings = get_settings()
+    store = get_report_store()
+    if not store.remote:
+        raise HTTPException(503, "Report links are not available. Use /download instead.")
+    deadline = Deadline(settings.REPORT_REQUEST_BUDGET_SECONDS)
+    matched_grants, total_value, catalogue_version, ai_summary = _report_inputs(
+        body, body.scan_handle, db, deadline
+    )
+    render_kwargs = dict(
+        matched_grants=matched_grants,
+        ai_summary=ai_summary,
+        catalogue_version=catalogue_version,
+        renderer=_renderer(body.renderer),
+    )
+    key = report_key(**render_kwargs)
+    url = store.presigned_url(key, expires_in=settings.REPORT_LINK_EXPIRY_SECONDS)
+    if url is None:
+        pdf_bytes = _render_pdf(deadline, **render_kwargs)
+        url = store.presigned_url(key, pdf_bytes, expires_in=settings.REPORT_LINK_EXPIRY_SECONDS)
+    if url is None:
+        raise HTTPException(502, "Could not store the report. Please use /download instead.")
+    return ReportLinkResponse(url=url, expires_in=settings.REPORT_LINK_EXPIRY_SECONDS)
+
+
+# ── Background render jobs ───────────────────────────────────────────────────
+
+
+class ReportJobResponse(BaseModel):
+    job_id: str
+    status: str  # queued, running, done, failed
+    queue_depth: int
+    error: Optional[str] = None
+
+
+def _job_response(job_id: str) -> ReportJobResponse:
+    pool = get_render_pool()
+    job = pool.status(job_id) if pool else None
+    if job is None:
+        raise HTTPException(404, "Report job not found or expired.")
+    return ReportJobResponse(
+        job_id=job_id,
+        status=job["status"],
+        queue_depth=pool.queue_depth,
+        error=job.get("error"),
+    )
+
+
+@router.post("/jobs", response_model=ReportJobResponse, status_code=202)
+def submit_report_job(
+    body: ReportRequest,
+    db: Session = Depends(get_db),
+):
+    """Queue a PDF report for rendering; poll ``/jobs/{job_id}`` then download it.
+
+    A report already in the report cache comes back as a finished job, and
+    rendered jobs are added to the cache.
+    """
+    pool = get_render_pool()
+    if pool is None:
+        raise HTTPException(503, "Background report rendering is disabled.")
+    deadline = Deadline(get_settings().REPORT_REQUEST_BUDGET_SECONDS)
+    matched_grants, total_value, catalogue_version, ai_summary = _report_inputs(
+        body, body.scan_handle, db, deadline
+    )
+    render_kwargs = dict(
+        matched_grants=matched_grants,
+        ai_summary=ai_summary,
+        catalogue_version=catalogue_version,
+        renderer=_renderer(body.renderer),
+    )
+    store = get_report_store()
+    key = report_key(**render_kwargs)
+    cached = store.get(key)
+    if cached is not None:
+        return _job_response(pool.completed(cached))
+    try:
+        job_id = pool.submit(on_done=lambda pdf_bytes: store.put(key, pdf_bytes), **render_kwargs)
+    except RenderQueueFull:
+        raise HTTPException(503, "Too many reports are being generated right now. Please try again shortly.")
+    return _job_response(job_id)
+
+
+@router.get("/jobs/{job_id}", response_model=ReportJobResponse)
+def get_report_job(job_id: str):
+    """Status of a queued report (no auth — the job id is the secret)."""
+    return _job_response(job_id)
+
+
+@router.get("/jobs/{job_id}/download")
+def download_report_job(job_id: str):
+    """Download a finished report."""
+    job = _job_response(job_id)
+    if job.status == "failed":
+        raise HTTPException(500, f"Failed to generate report: {job.error}")
+    pdf_bytes = get_render_pool().result(job_id)
+    if pdf_bytes is None:
+        raise HTTPException(409, "Report is still being generated.")
+    return _pdf_response(pdf_bytes)
+
+
 class EmailReportRequest(BaseModel):
-    profile: AnonymousScanRequest
+    profile: AnonymousScanRequest = Field(default_factory=AnonymousScanRequest)
     email: EmailStr
+    scan_handle: Optional[str] = None
+    renderer: Optional[Renderer] = None
+
 
+class EmailReportResponse(BaseModel):
+    message: str
+    grants_found: int
+    email_id: str
+    status: str  # pending, sending, sent, failed
 
-@router.post("/email")
+
+@router.post("/email", response_model=EmailReportResponse, status_code=202)
 def email_pdf_report(
     body: EmailReportRequest,
+    response: Response,
+    key: Optional[str] = Depends(idempotency_key),
     db: Session = Depends(get_db),
 ):
-    """Generate a PDF report and email it to the user."""
-    matched_grants, profile_dict, total_value = _build_report_data(body.profile, db)
+    """Generate a PDF report and queue it for emailing to the user.
+
+    Returns once the message is in the outbox; poll ``/email/{email_id}``
+    for delivery status. Retries carrying the same ``Idempotency-Key`` get
+    the first response instead of queueing another email.
+    """
+    if get_provider() is None:
+        raise HTTPException(
+            503, "Email service not configured. Please set RESEND_API_KEY, SENDGRID_API_KEY or SMTP_HOST."
+        )
+    deadline = Deadline(get_settings().REPORT_REQUEST_BUDGET_SECONDS)
+    # No account here, so keys are scoped to the recipient: two people who
+    # happen to pick the same key can't see or block each other's reports
+    return run_idempotent(
+        ("reports.email", body.email.lower()),
+        key,
+        request_fingerprint(body.model_dump(mode="json")),
+        response,
+        lambda: _email_report(body, db, deadline),
+        timeout=deadline.remaining(),
+    )
 
-    # Generate AI summary
-    ai_summary = generate_ai_summary(profile_dict, matched_grants, total_value)
+
+def _email_report(body: EmailReportRequest, db: Session, deadline: Deadline) -> EmailReportResponse:
+    matched_grants, total_value, catalogue_version, ai_summary = _report_inputs(
+        body.profile, body.scan_handle, db, deadline
+    )
 
     # Generate the PDF
-    pdf_bytes = generate_report_bytes(
-        matched_grants,
+    pdf_bytes = _render_pdf(
+        deadline,
+        matched_grants=matched_grants,
         user_label=body.email,
         ai_summary=ai_summary,
+        catalogue_version=catalogue_version,
+        renderer=_renderer(body.renderer),
     )
 
-    # Send email
-    try:
-        _send_email(body.email, pdf_bytes, len(matched_grants), total_value)
-    except Exception as e:
-        raise HTTPException(500, f"Failed to send email: {str(e)}")
-
-    return {"message": f"Report sent to {body.email}", "grants_found": len(matched_grants)}
-
-
-def _send_email(to_email: str, pdf_bytes: bytes, grants_count: int, total_value: float):
-    """Send the PDF report via email using Resend."""
-    import base64
-    from app.config import get_settings
+    # Queue the email; the dispatcher sends (and retries) it in the background
+    grants_count = len(matched_grants)
+    outgoing = enqueue_email(
+        db,
+        to_email=body.email,
+        subject=f"Your GrantFinder Report — {grants_count} grants worth €{total_value:,.0f}",
+        html=_email_html(grants_count, total_value),
+        attachment_name="GrantFinder_Report.pdf",
+        attachment=pdf_bytes,
+    )
 
-    settings = get_settings()
+    return EmailReportResponse(
+        message=f"Report for {body.email} is on its way",
+        grants_found=grants_count,
+        email_id=str(outgoing.id),
+        status=outgoing.status,
+    )
 
-    # Try Resend first (preferred - simpler API)
-    resend_key = settings.RESEND_API_KEY if hasattr(settings, 'RESEND_API_KEY') else ""
-
-    if resend_key:
-        import resend
-        resend.api_key = resend_key
-        resend.Emails.send({
-            "from": "GrantFinder <reports@grantfinder.ie>",
-            "to": [to_email],
-            "subject": f"Your GrantFinder Report — {grants_count} grants worth €{total_value:,.0f}",
-            "html": _email_html(grants_count, total_value),
-            "attachments": [{
-                "filename": "GrantFinder_Report.pdf",
-                "content": base64.b64encode(pdf_bytes).decode("utf-8"),
-            }],
-        })
-        return
-
-    # Fall back to SendGrid
-    if settings.SENDGRID_API_KEY:
-        from sendgrid import SendGridAPIClient
-        from sendgrid.helpers.mail import (
-            Mail, Attachment, FileContent, FileName, FileType, Disposition
-        )
-        message = Mail(
-            from_email=settings.FROM_EMAIL,
-            to_emails=to_email,
-            subject=f"Your GrantFinder Report — {grants_count} grants worth €{total_value:,.0f}",
-            html_content=_email_html(grants_count, total_value),
-        )
-        encoded_pdf = base64.b64encode(pdf_bytes).decode("utf-8")
-        attachment = Attachment(
-            FileContent(encoded_pdf),
-            FileName("GrantFinder_Report.pdf"),
-            FileType("application/pdf"),
-            Disposition("attachment"),
-        )
-        message.attachment = attachment
-        sg = SendGridAPIClient(settings.SENDGRID_API_KEY)
-        sg.send(message)
-        return
 
-    raise Exception(
-        "Email service not configured. Please set RESEND_API_KEY or SENDGRID_API_KEY."
+class EmailStatusResponse(BaseModel):
+    email_id: str
+    status: str
+    attempts: int
+    sent_at: Optional[str] = None
+
+
+@router.get("/email/{email_id}", response_model=EmailStatusResponse)
+def get_email_status(email_id: uuid.UUID, db: Session = Depends(get_db)):
+    """Delivery status of a queued report email (no auth — the id is the secret)."""
+    outgoing = db.get(EmailOutbox, email_id)
+    if outgoing is None:
+        raise HTTPException(404, "Email not found.")
+    return EmailStatusResponse(
+        email_id=str(outgoing.id),
+        status=outgoing.status,
+        attempts=outgoing.attempts,
+        sent_at=outgoing.sent_at.isoformat() if outgoing.sent_at else None,
     )
 
 
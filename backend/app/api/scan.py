@@ -1,42 +1,67 @@
 """Scan endpoints: run grant matching, get results, history."""
 
+import json
+import uuid
 from datetime import datetime, timezone
-from typing import Optional
+from typing import AsyncIterator, Callable, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from starlette.requests import ClientDisconnect
 
-from app.database import get_db
+from app.config import get_settings
+from app.database import get_db, SessionLocal
 from app.models.user import User
 from app.models.profile import UserProfile
-from app.models.grant import Grant
-from app.models.scan_result import ScanResult, ScanResultGrant
+from app.models.scan_result import ScanResult
+from app.engine.catalogue import get_catalogue
 from app.engine.matcher import GrantMatcher, MatchResult
 from app.engine.savings import calculate_savings
-from app.engine.ai_summary import generate_ai_summary
+from app.engine.ai_summary import start_ai_summary, get_ai_summary
+from app.engine.summary_archetypes import lookup_summary
+from app.engine.background_scan import is_refreshing, wait_for_scan
+from app.engine.scan_store import (
+    cached_latest_scan, history_page, latest_unchanged_scan, profile_hash, remember_latest_scan,
+    save_scan, stored_results, summary_stored,
+)
+from app.engine.scan_diff import GrantChange, diff_against_results, diff_scans, scan_head
+from app.engine.scan_handles import MaterialisedScan, create_handle, report_grant
 from app.schemas.scan import (
     AnonymousScanRequest,
     ScanResponse,
     CategoryResult,
+    GrantChangeItem,
     GrantMatchResponse,
+    ScanDiffResponse,
     ScanHistoryItem,
+    ScanHistoryResponse,
+    SummaryStatusResponse,
 )
-from app.utils.auth import get_current_user, get_optional_user
+from app.utils.auth import get_current_user, get_current_user_id, get_optional_user
+from app.utils import metrics
+from app.utils.deadline import Deadline
+from app.utils.idempotency import idempotency_key, request_fingerprint, run_idempotent
+from app.utils.json_stream import Item, iter_json_objects
 from app.utils.validators import GRANT_CATEGORIES
 from app.engine.how_to_claim import HOW_TO_CLAIM
 
 router = APIRouter(prefix="/api/v1/scan", tags=["Scan"])
 matcher = GrantMatcher()
 
-def _run_scan(profile_dict: dict, db: Session) -> list[MatchResult]:
-    """Load active grants with rules and run the matcher."""
-    grants = (
-        db.query(Grant)
-        .filter(Grant.is_active == True)  # noqa: E712
-        .options(joinedload(Grant.eligibility_rules))
-        .all()
-    )
-    return matcher.match(profile_dict, grants)
+def _run_scan(
+    profile_dict: dict, db: Session, deadline: Optional[Deadline] = None
+) -> tuple[list[MatchResult], str]:
+    """Run the matcher against the cached active-grant catalogue.
+
+    Returns the results and the catalogue version they were computed from.
+    """
+    catalogue = get_catalogue(db)
+    if deadline is not None:
+        deadline.check("match")
+    return matcher.match(profile_dict, catalogue.grants), catalogue.version
 
 
 def _build_response(
@@ -44,14 +69,27 @@ def _build_response(
     profile_dict: dict,
     scan_id: Optional[str] = None,
     include_ai_summary: bool = True,
+    on_summary_ready: Optional[Callable[[str], None]] = None,
+    catalogue_version: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
+    stored_summary: Optional[str] = None,
 ) -> ScanResponse:
-    """Convert MatchResult list into a ScanResponse grouped by category."""
+    """Convert MatchResult list into a ScanResponse grouped by category.
+
+    ``deadline`` is passed on to the AI summary, which is skipped (template
+    summary only) if the request is already over budget. A
+    ``stored_summary`` (from a saved scan) is returned as is. When
+    ``catalogue_version`` is known the materialised results are also kept
+    behind a ``scan_handle`` for the report endpoints, one per stored scan
+    and catalogue version.
+    """
     category_map = dict(GRANT_CATEGORIES)
     cat_buckets: dict[str, list[GrantMatchResponse]] = {}
     total_value = 0.0
     income_bracket = profile_dict.get("income_bracket")
 
     grant_dicts_for_ai = []
+    report_grants = []
 
     for r in results:
         # Calculate precise savings
@@ -96,6 +134,7 @@ def _build_response(
             "category": r.category,
             "savings_note": savings["savings_note"],
         })
+        report_grants.append(report_grant(r, savings))
 
     categories = [
         CategoryResult(
@@ -109,27 +148,85 @@ def _build_response(
     ]
     categories.sort(key=lambda c: c.total_value, reverse=True)
 
-    # Generate AI summary
+    # Template summary now; the AI version is generated in the background
     summary = ""
-    if include_ai_summary:
-        summary = generate_ai_summary(profile_dict, grant_dicts_for_ai, total_value)
+    summary_token = None
+    final_summary = ""  # Kept on the scan handle; never the template
+    if stored_summary:
+        summary = final_summary = stored_summary
+    elif include_ai_summary:
+        # Common archetypes have a summary pre-generated by the batch job
+        pregenerated = (
+            lookup_summary(catalogue_version, profile_dict, grant_dicts_for_ai)
+            if catalogue_version else None
+        )
+        if pregenerated is not None:
+            summary = final_summary = pregenerated
+            if on_summary_ready is not None:
+                on_summary_ready(pregenerated)
+        else:
+            ready: list[str] = []
+
+            def _on_ready(text: str) -> None:
+                ready.append(text)
+                if on_summary_ready is not None:
+                    on_summary_ready(text)
+
+            summary_token, summary = start_ai_summary(
+                profile_dict,
+                grant_dicts_for_ai,
+                total_value,
+                on_ready=_on_ready,
+                deadline=deadline,
+            )
+            # Without a job the text is the AI summary only if it was cached
+            # (reported synchronously); otherwise it is the template
+            if summary_token is None and ready:
+                final_summary = summary
+
+    scan_handle = None
+    if catalogue_version:
+        scan_handle = create_handle(
+            MaterialisedScan(
+                profile=profile_dict,
+                matched_grants=report_grants,
+                total_value=total_value,
+                catalogue_version=catalogue_version,
+                summary=final_summary,
+                summary_token=summary_token,
+            ),
+            key=(scan_id, catalogue_version) if scan_id else None,
+        )
 
     return ScanResponse(
         scan_id=scan_id,
+        scan_handle=scan_handle,
         total_grants_found=len(results),
         total_potential_value=total_value,
         categories=categories,
         summary=summary,
+        summary_token=summary_token,
         generated_at=datetime.now(timezone.utc).isoformat(),
     )
 
 
+def _persist_summary(scan_id, user_id) -> Callable[[str], None]:
+    """Callback that stores a finished AI summary on the saved ScanResult."""
+    def _save(text: str) -> None:
+        db = SessionLocal()
+        try:
+            db.query(ScanResult).filter(ScanResult.id == scan_id).update({"summary": text})
+            db.commit()
+        finally:
+            db.close()
+        summary_stored(user_id, scan_id)
+    return _save
+
+
 # ── Endpoints ────────────────────────────────────────────────────────────────
 
 
-@router.post("/anonymous", response_model=ScanResponse)
-def anonymous_scan(body: AnonymousScanRequest, db: Session = Depends(get_db)):
-    """Run a grant scan without an account (limited results)."""
+def _anonymous_profile(body: AnonymousScanRequest) -> dict:
     profile_dict = body.model_dump(exclude_unset=True)
 
     # Compute convenience flags
@@ -141,17 +238,138 @@ def anonymous_scan(body: AnonymousScanRequest, db: Session = Depends(get_db)):
     youngest = profile_dict.get("youngest_child_age")
     if youngest is not None:
         profile_dict["has_child_under_7"] = youngest < 7
+    return profile_dict
 
-    results = _run_scan(profile_dict, db)
-    return _build_response(results, profile_dict)
+
+@router.post("/anonymous", response_model=ScanResponse)
+def anonymous_scan(body: AnonymousScanRequest, db: Session = Depends(get_db)):
+    """Run a grant scan without an account (limited results)."""
+    deadline = Deadline(get_settings().SCAN_REQUEST_BUDGET_SECONDS)
+    profile_dict = _anonymous_profile(body)
+    results, catalogue_version = _run_scan(profile_dict, db, deadline)
+    return _build_response(
+        results, profile_dict, catalogue_version=catalogue_version, deadline=deadline
+    )
+
+
+# ── Batch ────────────────────────────────────────────────────────────────────
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse that leaves ``receive`` to the body iterator.
+
+    Under ASGI < 2.4 the stock one listens for disconnects on ``receive``
+    while streaming, which would swallow the request body the iterator is
+    still reading. A disconnect surfaces as ``ClientDisconnect`` from the
+    request stream, or from a reset connection while sending; other errors
+    propagate unchanged.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await self.stream_response(send)
+        except (ConnectionResetError, BrokenPipeError):
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+
+def _scan_batch_chunk(items: list[tuple[int, Item]], grants: list[dict]) -> bytes:
+    """NDJSON result lines for a chunk of parsed batch items."""
+    lines = []
+    for index, item in items:
+        if isinstance(item, ValueError):
+            line = {"index": index, "error": str(item)}
+        else:
+            try:
+                body = AnonymousScanRequest.model_validate(item)
+            except ValidationError as e:
+                line = {
+                    "index": index,
+                    "error": "Invalid profile",
+                    "details": e.errors(include_url=False, include_context=False, include_input=False),
+                }
+            else:
+                profile_dict = _anonymous_profile(body)
+                results = matcher.match(profile_dict, grants)
+                response = _build_response(results, profile_dict, include_ai_summary=False)
+                line = {"index": index, "result": response.model_dump(mode="json")}
+        lines.append(json.dumps(line))
+    return ("\n".join(lines) + "\n").encode()
+
+
+@router.post("/anonymous/batch")
+async def anonymous_scan_batch(
+    request: Request,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Scan many profiles in one request, streaming results as NDJSON.
+
+    The body is NDJSON or a JSON array of ``AnonymousScanRequest`` objects.
+    Every profile is matched against the same catalogue snapshot, in chunks
+    of ``BATCH_SCAN_CHUNK_SIZE``, and each produces one output line in input
+    order: ``{"index": n, "result": <ScanResponse>}`` or
+    ``{"index": n, "error": ...}``. Input is read only as fast as results
+    are sent, so memory stays flat however large the batch is. No AI
+    summaries or scan handles are created.
+    """
+    settings = get_settings()
+    catalogue = await run_in_threadpool(get_catalogue, db)
+
+    async def lines() -> AsyncIterator[bytes]:
+        chunk: list[tuple[int, Item]] = []
+        count = 0
+        async for item in iter_json_objects(request.stream(), settings.BATCH_SCAN_MAX_PROFILE_BYTES):
+            if count >= settings.BATCH_SCAN_MAX_PROFILES:
+                yield (json.dumps({
+                    "error": f"Batch limit of {settings.BATCH_SCAN_MAX_PROFILES} profiles reached; "
+                             "the rest were not scanned"
+                }) + "\n").encode()
+                break
+            chunk.append((count, item))
+            count += 1
+            if len(chunk) >= settings.BATCH_SCAN_CHUNK_SIZE:
+                yield await run_in_threadpool(_scan_batch_chunk, chunk, catalogue.grants)
+                chunk = []
+        if chunk:
+            yield await run_in_threadpool(_scan_batch_chunk, chunk, catalogue.grants)
+        metrics.incr("scans.batch_requests")
+        metrics.observe("scans.batch_profiles", count)
+
+    return _DuplexStreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"X-Catalogue-Version": catalogue.version, "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("", response_model=ScanResponse)
 def run_scan(
+    response: Response,
+    force: bool = Query(False, description="Recompute even if nothing changed since the last scan"),
+    key: Optional[str] = Depends(idempotency_key),
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Run a full grant scan using the authenticated user's profile."""
+    """Run a full grant scan using the authenticated user's profile.
+
+    If neither the profile nor the catalogue changed since the user's last
+    scan, that scan is returned instead of matching and saving a new one.
+    Retries carrying the same ``Idempotency-Key`` get the first response.
+    """
+    deadline = Deadline(get_settings().SCAN_REQUEST_BUDGET_SECONDS)
+    return run_idempotent(
+        ("scan", user.id),
+        key,
+        request_fingerprint(force),
+        response,
+        lambda: _scan_user(user, db, force, deadline),
+        timeout=deadline.remaining(),
+    )
+
+
+def _scan_user(user: User, db: Session, force: bool, deadline: Deadline) -> ScanResponse:
     profile = (
         db.query(UserProfile)
         .filter(UserProfile.user_id == user.id)
@@ -162,126 +380,232 @@ def run_scan(
         raise HTTPException(400, "Please complete your profile first.")
 
     profile_dict = profile.to_dict()
-    results = _run_scan(profile_dict, db)
+    catalogue = get_catalogue(db)
+    digest = profile_hash(profile_dict)
+
+    if not force:
+        # A background scan from the last profile save is probably about to
+        # store exactly this scan
+        if not wait_for_scan(user.id, deadline.remaining() / 2):
+            metrics.incr("scans.background_wait_timeouts")
+        previous = latest_unchanged_scan(db, user.id, profile.id, digest, catalogue.version)
+        results = stored_results(db, previous, catalogue) if previous is not None else None
+        if results is not None:
+            metrics.incr("scans.reused")
+            remember_latest_scan(user.id, previous.id, bool(previous.summary))
+            return _build_response(
+                results,
+                profile_dict,
+                scan_id=str(previous.id),
+                on_summary_ready=_persist_summary(previous.id, user.id),
+                catalogue_version=catalogue.version,
+                deadline=deadline,
+                stored_summary=previous.summary,
+            )
+
+    deadline.check("match")
+    results = matcher.match(profile_dict, catalogue.grants)
 
     # Save scan result (before building response so we have scan_id)
-    total_value = sum(r.max_amount or 0 for r in results)
-    scan = ScanResult(
-        user_id=user.id,
-        profile_id=profile.id,
-        total_grants=len(results),
-        total_value=total_value,
+    scan_id = save_scan(
+        db, user.id, profile.id, results, profile_digest=digest, catalogue_version=catalogue.version
     )
-    db.add(scan)
-    db.flush()
-
-    for idx, r in enumerate(results):
-        db.add(
-            ScanResultGrant(
-                scan_result_id=scan.id,
-                grant_id=r.grant_id,
-                match_score=r.match_score,
-                match_type=r.match_type.value,
-                notes=r.notes,
-                sort_order=idx,
-            )
-        )
-
     user.last_scan_at = datetime.now(timezone.utc)
     db.commit()
-    db.refresh(scan)
+    remember_latest_scan(user.id, scan_id, False)
+
+    return _build_response(
+        results,
+        profile_dict,
+        scan_id=str(scan_id),
+        on_summary_ready=_persist_summary(scan_id, user.id),
+        catalogue_version=catalogue.version,
+        deadline=deadline,
+    )
 
-    return _build_response(results, profile_dict, scan_id=str(scan.id))
 
+@router.get("/summary/{token}", response_model=SummaryStatusResponse)
+def get_summary_status(token: str):
+    """Poll for the AI summary started by a scan (no auth — the token is the secret)."""
+    job = get_ai_summary(token)
+    if job is None:
+        raise HTTPException(404, "Summary not found or expired.")
+    return SummaryStatusResponse(token=token, status=job["status"], summary=job["summary"])
 
-@router.get("/results", response_model=ScanResponse)
-def get_latest_results(
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
-    """Get the latest scan results for the authenticated user."""
-    scan = (
+
+def _latest_scan(user_id: uuid.UUID, db: Session) -> Optional[ScanResult]:
+    return (
         db.query(ScanResult)
-        .filter(ScanResult.user_id == user.id)
+        .filter(ScanResult.user_id == user_id)
         .order_by(ScanResult.created_at.desc())
         .first()
     )
-    if not scan:
-        raise HTTPException(404, "No scan results found. Run a scan first.")
 
-    # Reload the matched grants with their grant details
-    result_grants = (
-        db.query(ScanResultGrant)
-        .filter(ScanResultGrant.scan_result_id == scan.id)
-        .options(joinedload(ScanResultGrant.grant))
-        .order_by(ScanResultGrant.sort_order)
-        .all()
-    )
 
-    category_map = dict(GRANT_CATEGORIES)
-    cat_buckets: dict[str, list[GrantMatchResponse]] = {}
+def _results_etag(scan_id: uuid.UUID, has_summary: bool, catalogue_version: str, refreshing: bool) -> str:
+    # Everything the /results body depends on apart from the profile; profile
+    # saves drop the cached entry instead, so the next request is a full read
+    return f'"{scan_id}-{catalogue_version}-{int(has_summary)}{int(refreshing)}"'
 
-    for rg in result_grants:
-        g = rg.grant
-
-        resp = GrantMatchResponse(
-            grant_id=str(g.id),
-            name=g.name,
-            slug=g.slug,
-            short_description=g.short_description,
-            match_type=rg.match_type,
-            match_score=float(rg.match_score) if rg.match_score else 0,
-            max_amount=float(g.max_amount) if g.max_amount else None,
-            amount_description=g.amount_description or "",
-            source_organisation=g.source_organisation,
-            source_url=g.source_url,
-            application_url=g.application_url,
-            notes=rg.notes or "",
-            is_locked=False,
-            category=g.category,
-        )
-        cat_buckets.setdefault(g.category, []).append(resp)
 
-    categories = [
-        CategoryResult(
-            category=cat,
-            label=category_map.get(cat, cat),
-            count=len(grants_list),
-            total_value=sum(gl.max_amount or 0 for gl in grants_list),
-            grants=grants_list,
-        )
-        for cat, grants_list in cat_buckets.items()
-    ]
-    categories.sort(key=lambda c: c.total_value, reverse=True)
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
 
-    return ScanResponse(
+
+@router.get("/results", response_model=ScanResponse)
+def get_latest_results(
+    request: Request,
+    response: Response,
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: Session = Depends(get_db),
+):
+    """Get the latest scan results for the authenticated user.
+
+    Rebuilt from the catalogue snapshot and the stored matches, in the same
+    shape as ``POST /scan``. Responses carry an ``ETag``; a repeat request
+    with a matching ``If-None-Match`` gets 304 after only the catalogue's
+    freshness check, so grant or rule edits still change the tag.
+
+    While a background scan is in flight the previous results are returned
+    with ``refreshing`` set; with no previous results the request waits for it.
+    """
+    refreshing = is_refreshing(user_id)
+    catalogue = get_catalogue(db)
+    cached = cached_latest_scan(user_id)
+    if cached is not None:
+        etag = _results_etag(*cached, catalogue.version, refreshing)
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            metrics.incr("scan_results.not_modified")
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+    scan = _latest_scan(user_id, db)
+    if not scan and refreshing:
+        wait_for_scan(user_id, get_settings().SCAN_REQUEST_BUDGET_SECONDS)
+        refreshing = is_refreshing(user_id)
+        scan = _latest_scan(user_id, db)
+    if not scan:
+        raise HTTPException(404, "No scan results found. Run a scan first.")
+
+    profile = (
+        db.query(UserProfile)
+        .filter(UserProfile.user_id == user_id)
+        .order_by(UserProfile.updated_at.desc())
+        .first()
+    )
+    # Grants withdrawn since the scan are left out
+    results = stored_results(db, scan, catalogue, skip_missing=True)
+    result = _build_response(
+        results,
+        profile.to_dict() if profile else {},
         scan_id=str(scan.id),
-        total_grants_found=scan.total_grants,
-        total_potential_value=float(scan.total_value) if scan.total_value else 0,
-        categories=categories,
-        summary=scan.summary or "",
-        generated_at=scan.created_at.isoformat(),
+        include_ai_summary=False,
+        catalogue_version=catalogue.version,
+        stored_summary=scan.summary,
     )
+    result.generated_at = scan.created_at.isoformat()
+    result.refreshing = refreshing
+
+    remember_latest_scan(user_id, scan.id, bool(scan.summary))
+    response.headers["ETag"] = _results_etag(scan.id, bool(scan.summary), catalogue.version, refreshing)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return result
 
 
-@router.get("/history", response_model=list[ScanHistoryItem])
+@router.get("/history", response_model=ScanHistoryResponse)
 def get_scan_history(
+    cursor: Optional[str] = None,
+    per_page: int = Query(20, ge=1, le=100),
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get all past scan results for the authenticated user."""
-    scans = (
-        db.query(ScanResult)
-        .filter(ScanResult.user_id == user.id)
-        .order_by(ScanResult.created_at.desc())
-        .all()
+    """Page through the user's past scans, newest first (pass ``next_cursor`` back as ``cursor``)."""
+    try:
+        entries, next_cursor = history_page(db, user.id, per_page, cursor)
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor.")
+    return ScanHistoryResponse(
+        scans=[
+            ScanHistoryItem(
+                id=str(e.id),
+                total_grants=e.total_grants,
+                total_value=e.total_value,
+                created_at=e.created_at.isoformat(),
+                grants_delta=e.grants_delta,
+            )
+            for e in entries
+        ],
+        per_page=per_page,
+        next_cursor=next_cursor,
     )
-    return [
-        ScanHistoryItem(
-            id=str(s.id),
-            total_grants=s.total_grants,
-            total_value=float(s.total_value) if s.total_value else None,
-            created_at=s.created_at.isoformat(),
+
+
+def _change_item(change: GrantChange, by_id: dict[str, dict]) -> GrantChangeItem:
+    g = by_id.get(str(change.grant_id), {})
+    return GrantChangeItem(
+        grant_id=str(change.grant_id),
+        grant_name=g.get("name"),
+        slug=g.get("slug"),
+        match_type_before=change.match_type_before,
+        match_type_after=change.match_type_after,
+        score_before=change.score_before,
+        score_after=change.score_after,
+        max_amount=g.get("max_amount"),
+    )
+
+
+@router.get("/diff", response_model=ScanDiffResponse)
+def get_scan_diff(
+    from_scan: Optional[uuid.UUID] = Query(None, description="Defaults to the scan before to_scan"),
+    to_scan: Optional[uuid.UUID] = Query(None, description="Defaults to the latest scan"),
+    live: bool = Query(False, description="Compare from_scan (default latest) with a fresh, unsaved match"),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """What changed between two of the user's scans.
+
+    Grants newly matched or no longer matched, match types that moved up or
+    down, score changes within the same type, and the change in total value.
+    """
+    catalogue = get_catalogue(db)
+    if live:
+        if to_scan is not None:
+            raise HTTPException(400, "to_scan can't be combined with live.")
+        before = scan_head(db, user.id, from_scan)
+        if before is None:
+            raise HTTPException(404, "Scan not found.")
+        profile = (
+            db.query(UserProfile)
+            .filter(UserProfile.user_id == user.id)
+            .order_by(UserProfile.updated_at.desc())
+            .first()
         )
-        for s in scans
-    ]
+        if not profile:
+            raise HTTPException(400, "Please complete your profile first.")
+        diff = diff_against_results(db, before, matcher.match(profile.to_dict(), catalogue.grants))
+        after = None
+    else:
+        after = scan_head(db, user.id, to_scan)
+        if after is None:
+            raise HTTPException(404, "Scan not found.")
+        before = scan_head(db, user.id, from_scan) if from_scan else scan_head(db, user.id, older_than=after)
+        if before is None:
+            raise HTTPException(404, "Scan not found." if from_scan else "No earlier scan to compare with.")
+        diff = diff_scans(db, before, after)
+
+    metrics.incr("scan_diffs.live" if live else "scan_diffs.stored")
+    return ScanDiffResponse(
+        from_scan_id=str(before.id),
+        to_scan_id=str(after.id) if after else None,
+        added=[_change_item(c, catalogue.by_id) for c in diff.added],
+        removed=[_change_item(c, catalogue.by_id) for c in diff.removed],
+        upgraded=[_change_item(c, catalogue.by_id) for c in diff.upgraded],
+        downgraded=[_change_item(c, catalogue.by_id) for c in diff.downgraded],
+        rescored=[_change_item(c, catalogue.by_id) for c in diff.rescored],
+        unchanged=diff.unchanged,
+        total_value_before=diff.total_value_before,
+        total_value_after=diff.total_value_after,
+        value_delta=diff.value_delta,
+    )
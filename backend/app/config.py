@@ -35,17 +35,95 @@ class Settings(BaseSettings):
 
     # Anthropic (Claude API)
     ANTHROPIC_API_KEY: str = ""
+    ANTHROPIC_BASE_URL: str = ""  # Override to point at a local stub server
+    AI_BACKEND: str = "anthropic"  # anthropic | fake (offline canned responses)
+    AI_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    AI_READ_TIMEOUT_SECONDS: float = 30.0
+    AI_MAX_RETRIES: int = 1
+    AI_MAX_CONNECTIONS: int = 20
+    AI_BREAKER_FAILURE_THRESHOLD: int = 5
+    AI_BREAKER_RESET_SECONDS: float = 30.0
+    AI_SUMMARY_MAX_CONCURRENCY: int = 4
+    AI_SUMMARY_TIMEOUT_SECONDS: float = 20.0
+    AI_SUMMARY_RESULT_TTL_SECONDS: int = 1800
+    AI_CACHE_MAX_ENTRIES: int = 2048
+    AI_CACHE_TTL_SECONDS: int = 86400
+    AI_CHAT_CONTEXT_TOKENS: int = 1500  # Budget for grant context in chat prompts
+    AI_SUMMARY_CONTEXT_TOKENS: int = 600  # Budget for grant lists in summary prompts
+    AI_FAQ_CACHE_MAX_ENTRIES: int = 2000  # Cached answers to grant-scoped chat questions
+
+    # Request budgets — optional stages fall back when time runs short
+    SCAN_REQUEST_BUDGET_SECONDS: float = 5.0
+    REPORT_REQUEST_BUDGET_SECONDS: float = 30.0
+    AI_SUMMARY_MIN_SECONDS: float = 2.0  # Don't start an AI call with less time left
+    REPORT_RENDER_RESERVE_SECONDS: float = 8.0  # Kept back from the AI call for the PDF
+    EMAIL_TIMEOUT_SECONDS: float = 15.0  # Per provider call, in the mail dispatcher
+
+    # Scan results kept in memory for report requests that pass ``scan_handle``
+    SCAN_HANDLE_TTL_SECONDS: int = 900
+    SCAN_HANDLE_MAX_ENTRIES: int = 1000
+
+    # How saved scans store their matches: "rows" (one scan_result_grants row
+    # per match) or "packed" (one compressed column on scan_results)
+    SCAN_RESULT_STORAGE: str = "rows"
+
+    # Latest scan id per user, so /scan/results can answer If-None-Match
+    # without a query
+    LATEST_SCAN_CACHE_ENTRIES: int = 10_000
+    LATEST_SCAN_CACHE_TTL_SECONDS: int = 3600
+
+    # Batch anonymous scans (POST /scan/anonymous/batch)
+    BATCH_SCAN_CHUNK_SIZE: int = 50  # Profiles matched per worker-thread hop
+    BATCH_SCAN_MAX_PROFILES: int = 10_000
+    BATCH_SCAN_MAX_PROFILE_BYTES: int = 64 * 1024
+
+    # Idempotency-Key replays for POST /scan and /reports/email (in-process)
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86_400
+    IDEMPOTENCY_KEY_MAX_ENTRIES: int = 10_000
+
+    # Threads running scans after profile saves (0 = only scan on POST /scan)
+    BACKGROUND_SCAN_WORKERS: int = 1
+
+    # PDF renderer: "weasyprint" (HTML templates) or "fast" (ReportLab, fixed layout)
+    REPORT_RENDERER: str = "weasyprint"
+
+    # PDF rendering worker processes (0 = render inline in the API process)
+    REPORT_RENDER_WORKERS: int = 1
+    REPORT_WORKER_MAX_JOBS: int = 50  # Recycle a worker after this many renders
+    REPORT_WORKER_MAX_RSS_MB: int = 200  # ...or once its peak RSS passes this
+    REPORT_RENDER_MAX_QUEUE: int = 20
+    REPORT_JOB_RESULT_TTL_SECONDS: int = 600
+
+    # Rendered report cache (L1 local disk, L2 S3 when configured)
+    REPORT_CACHE_DIR: str = "./report_cache"
+    REPORT_CACHE_MAX_MB: int = 100
+    REPORT_CACHE_S3_PREFIX: str = "report-cache/"
+    REPORT_LINK_EXPIRY_SECONDS: int = 3600
 
     # AWS S3
     AWS_ACCESS_KEY_ID: str = ""
     AWS_SECRET_ACCESS_KEY: str = ""
     AWS_S3_BUCKET: str = "grantfinder-reports"
     AWS_REGION: str = "eu-west-1"
+    AWS_S3_ENDPOINT_URL: str = ""  # S3-compatible stand-in (MinIO, moto server)
 
     # Email
     SENDGRID_API_KEY: str = ""
     RESEND_API_KEY: str = ""
+    RESEND_API_URL: str = "https://api.resend.com"  # Point at a local HTTP sink for testing
     FROM_EMAIL: str = "hello@grantfinder.ie"
+    SMTP_HOST: str = ""  # Used when no API key is set (e.g. a local SMTP sink)
+    SMTP_PORT: int = 25
+    SMTP_USERNAME: str = ""
+    SMTP_PASSWORD: str = ""
+
+    # Outbound mail queue (email_outbox table, drained by a background dispatcher)
+    EMAIL_DISPATCH_INTERVAL_SECONDS: float = 5.0
+    EMAIL_BATCH_SIZE: int = 50
+    EMAIL_MAX_ATTEMPTS: int = 6
+    EMAIL_RETRY_BASE_SECONDS: float = 30.0  # Doubles after each failed attempt...
+    EMAIL_RETRY_MAX_SECONDS: float = 3600.0  # ...up to this
+    EMAIL_CLAIM_TIMEOUT_SECONDS: float = 600.0  # A message "sending" longer than this is requeued
 
     # Google OAuth
     GOOGLE_CLIENT_ID: str = ""
@@ -2,48 +2,195 @@
 AI-powered personalized summary using Claude.
 
 Generates a tailored narrative based on the user's profile and matched grants.
+Scans use ``start_ai_summary`` so the upstream call runs in a bounded
+background pool and the client polls for the result; reports call
+``generate_ai_summary``, which waits at most a per-call timeout.
 """
 
 from __future__ import annotations
 
 import logging
-from typing import Any
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Optional
 
+from app.ai.client import ai_available, create_message
+from app.ai.prompt_builder import fit_to_budget, record_prompt
+from app.ai.prompt_cache import PromptCache
 from app.config import get_settings
+from app.utils.deadline import Deadline
+from app.utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+SUMMARY_MODEL = "claude-3-5-haiku-latest"
+
+_settings = get_settings()
+
+# Bounded pool for upstream calls; the semaphore also caps queued jobs so a
+# burst of scans can't pile up minutes of work behind a slow API.
+_executor = ThreadPoolExecutor(
+    max_workers=_settings.AI_SUMMARY_MAX_CONCURRENCY,
+    thread_name_prefix="ai-summary",
+)
+_slots = threading.BoundedSemaphore(_settings.AI_SUMMARY_MAX_CONCURRENCY * 4)
+
+# token -> {"status": "pending" | "ready" | "fallback", "summary": str}
+_jobs: TTLCache[dict] = TTLCache(maxsize=10_000, ttl=_settings.AI_SUMMARY_RESULT_TTL_SECONDS)
+
+# Many users render byte-identical prompts, so completions are shared
+summary_cache = PromptCache(
+    "ai_summary.cache",
+    maxsize=_settings.AI_CACHE_MAX_ENTRIES,
+    ttl=_settings.AI_CACHE_TTL_SECONDS,
+)
+
 
 def generate_ai_summary(
     profile: dict[str, Any],
     matched_grants: list[dict],
     total_value: float,
+    timeout: Optional[float] = None,
+    deadline: Optional[Deadline] = None,
 ) -> str:
     """
     Generate a personalised AI summary of the user's grant results.
 
-    Falls back to a template-based summary if the API key is not configured
-    or the API call fails.
+    Blocks for at most ``timeout`` seconds (default
+    ``AI_SUMMARY_TIMEOUT_SECONDS``), further capped by ``deadline``. Falls
+    back to a template-based summary if the API key is not configured, less
+    than ``AI_SUMMARY_MIN_SECONDS`` of the deadline is left, the pool is
+    saturated, or the API call fails or times out.
     """
     settings = get_settings()
+    if not ai_available():
+        return _fallback_summary(profile, matched_grants, total_value)
 
-    if not settings.ANTHROPIC_API_KEY:
+    prompt = build_summary_prompt(profile, matched_grants, total_value)
+    cached = summary_cache.peek(prompt, SUMMARY_MODEL)
+    if cached is not None:
+        return cached
+
+    timeout = settings.AI_SUMMARY_TIMEOUT_SECONDS if timeout is None else timeout
+    if deadline is not None:
+        if not deadline.allows(settings.AI_SUMMARY_MIN_SECONDS):
+            deadline.skip("ai_summary")
+            return _fallback_summary(profile, matched_grants, total_value)
+        timeout = deadline.cap(timeout)
+    if not _slots.acquire(blocking=False):
+        logger.warning("AI summary pool saturated, using fallback")
         return _fallback_summary(profile, matched_grants, total_value)
 
+    future = _executor.submit(_run_in_slot, prompt, timeout)
     try:
-        import anthropic
-        client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        logger.warning(f"AI summary timed out after {timeout:.1f}s")
+    except Exception as e:
+        logger.warning(f"AI summary generation failed: {e}")
+    return _fallback_summary(profile, matched_grants, total_value)
+
+
+def start_ai_summary(
+    profile: dict[str, Any],
+    matched_grants: list[dict],
+    total_value: float,
+    on_ready: Optional[Callable[[str], None]] = None,
+    deadline: Optional[Deadline] = None,
+) -> tuple[Optional[str], str]:
+    """
+    Kick off AI summary generation in the background.
+
+    Returns ``(token, summary)`` immediately: ``summary`` is the template
+    fallback to show now, and ``token`` can be polled with
+    :func:`get_ai_summary`. ``token`` is ``None`` when there is nothing to
+    wait for — either the AI text was already cached (and is returned as
+    ``summary``), or no AI summary will be produced (no API key, or the
+    pool is saturated, or ``deadline`` has already passed). ``on_ready`` is
+    called from the worker thread with the AI text once it is available.
+    """
+    fallback = _fallback_summary(profile, matched_grants, total_value)
+    settings = get_settings()
+    if not ai_available():
+        return None, fallback
+
+    prompt = build_summary_prompt(profile, matched_grants, total_value)
+    cached = summary_cache.peek(prompt, SUMMARY_MODEL)
+    if cached is not None:
+        if on_ready is not None:
+            on_ready(cached)
+        return None, cached
+
+    # The job runs after the response, but a request that is already late
+    # is a sign of overload — don't queue more upstream work behind it
+    if deadline is not None and deadline.expired:
+        deadline.skip("ai_summary")
+        return None, fallback
+
+    if not _slots.acquire(blocking=False):
+        logger.warning("AI summary pool saturated, serving fallback only")
+        return None, fallback
+
+    token = secrets.token_urlsafe(16)
+    _jobs.set(token, {"status": "pending", "summary": fallback})
 
-        # Build a concise profile description
-        profile_desc = _describe_profile(profile)
-        grants_desc = _describe_grants(matched_grants[:10])  # Top 10 only
+    def _job() -> None:
+        try:
+            text = _run_in_slot(prompt, settings.AI_SUMMARY_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"Background AI summary failed: {e}")
+            _jobs.set(token, {"status": "fallback", "summary": fallback})
+            return
+        _jobs.set(token, {"status": "ready", "summary": text})
+        if on_ready is not None:
+            try:
+                on_ready(text)
+            except Exception as e:
+                logger.warning(f"AI summary callback failed: {e}")
 
-        message = client.messages.create(
-            model="claude-3-5-haiku-latest",
-            max_tokens=600,
-            messages=[{
-                "role": "user",
-                "content": f"""You are a friendly Irish grants advisor. Write a personalised 3-4 paragraph summary for this person's grant results. Be warm, specific, and actionable.
+    _executor.submit(_job)
+    return token, fallback
+
+
+def get_ai_summary(token: str) -> Optional[dict]:
+    """Return ``{"status", "summary"}`` for a background job, or None if unknown/expired."""
+    return _jobs.get(token)
+
+
+def _run_in_slot(prompt: str, timeout: float) -> str:
+    """Call the model (via the cache), releasing the submitter's pool slot."""
+    try:
+        return summary_cache.get_or_compute(
+            prompt, SUMMARY_MODEL, lambda: request_summary(prompt, timeout)
+        )
+    finally:
+        _slots.release()
+
+
+def request_summary(prompt: str, timeout: float) -> str:
+    """One uncached summary completion for ``prompt``."""
+    record_prompt("ai_summary", prompt)
+    message = create_message(
+        timeout=timeout,
+        model=SUMMARY_MODEL,
+        max_tokens=600,
+        messages=[{"role": "user", "content": prompt}],
+    )
+    return message.content[0].text.strip()
+
+
+def build_summary_prompt(
+    profile: dict[str, Any],
+    matched_grants: list[dict],
+    total_value: float,
+) -> str:
+    """Render the summary prompt; it depends only on these three inputs."""
+    # Build a concise profile description
+    profile_desc = _describe_profile(profile)
+    grants_desc = _describe_grants(matched_grants[:10])  # Top 10, within token budget
+
+    return f"""You are a friendly Irish grants advisor. Write a personalised 3-4 paragraph summary for this person's grant results. Be warm, specific, and actionable.
 
 PROFILE:
 {profile_desc}
@@ -60,14 +207,6 @@ Write a personalised summary that:
 4. Ends with a clear first step they should take
 
 Keep it under 200 words. Use plain language. Don't use bullet points — write flowing paragraphs. Don't mention GrantFinder by name. Address the reader as "you"."""
-            }],
-        )
-
-        return message.content[0].text.strip()
-
-    except Exception as e:
-        logger.warning(f"AI summary generation failed: {e}")
-        return _fallback_summary(profile, matched_grants, total_value)
 
 
 def _describe_profile(profile: dict) -> str:
@@ -106,14 +245,21 @@ def _describe_profile(profile: dict) -> str:
 
 
 def _describe_grants(grants: list[dict]) -> str:
-    """Build a readable grants list for the AI prompt."""
-    lines = []
+    """Build a readable grants list for the AI prompt, fitted to the token budget."""
+    entries = []
     for g in grants:
         amount = g.get("amount_description") or (f"€{g.get('max_amount', 0):,.0f}" if g.get("max_amount") else "Variable")
-        lines.append(f"- {g['name']} ({g['match_type']}): {amount}")
+        entry = f"- {g['name']} ({g['match_type']}): {amount}"
         if g.get("savings_note"):
-            lines.append(f"  Savings: {g['savings_note']}")
-    return "\n".join(lines)
+            entry += f"\n  Savings: {g['savings_note']}"
+        entries.append(entry)
+    scores = [g.get("match_score") or 0 for g in grants] if any("match_score" in g for g in grants) else None
+    return "\n".join(fit_to_budget(
+        entries,
+        get_settings().AI_SUMMARY_CONTEXT_TOKENS,
+        scores=scores,
+        max_entry_tokens=120,
+    ))
 
 
 def _fallback_summary(
@@ -0,0 +1,148 @@
+"""
+Eager scans after profile saves.
+
+Saving the questionnaire schedules a scan for the user on a small background
+pool, so by the time the client asks for ``/scan/results`` the matches are
+usually already stored. Results are served stale-while-revalidate: while a
+newer scan is in flight the endpoints return the latest stored one flagged
+``refreshing``, and only wait when there is nothing stored yet.
+
+There is at most one job per user. A save that arrives while the user's job
+is still queued is absorbed by it (the job reads the profile when it starts);
+one that arrives mid-run makes the job run again once it finishes.
+
+Background scans save matches only: summaries, and their AI calls, are left
+to ``POST /scan``, which reuses the stored scan as long as nothing changed.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.engine.catalogue import get_catalogue
+from app.engine.matcher import GrantMatcher
+from app.engine.scan_store import (
+    latest_unchanged_scan, profile_hash, remember_latest_scan, save_scan,
+)
+from app.models.profile import UserProfile
+from app.models.user import User
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+_settings = get_settings()
+_matcher = GrantMatcher()
+_executor = ThreadPoolExecutor(
+    max_workers=max(_settings.BACKGROUND_SCAN_WORKERS, 1),
+    thread_name_prefix="background-scan",
+)
+
+
+class _Job:
+    def __init__(self) -> None:
+        self.started = False
+        self.rerun = False
+        self.done = threading.Event()
+
+
+_lock = threading.Lock()
+_jobs: dict[uuid.UUID, _Job] = {}
+
+
+def refresh_scan(db: Session, user_id: uuid.UUID) -> Optional[uuid.UUID]:
+    """Bring the user's latest scan up to date with their profile and the catalogue.
+
+    Returns the id of the current scan (reused or newly saved), or None if
+    the user has no profile.
+    """
+    profile = (
+        db.query(UserProfile)
+        .filter(UserProfile.user_id == user_id)
+        .order_by(UserProfile.updated_at.desc())
+        .first()
+    )
+    if profile is None:
+        return None
+    profile_dict = profile.to_dict()
+    catalogue = get_catalogue(db)
+    digest = profile_hash(profile_dict)
+
+    previous = latest_unchanged_scan(db, user_id, profile.id, digest, catalogue.version)
+    if previous is not None:
+        remember_latest_scan(user_id, previous.id, bool(previous.summary))
+        return previous.id
+
+    results = _matcher.match(profile_dict, catalogue.grants)
+    scan_id = save_scan(
+        db, user_id, profile.id, results, profile_digest=digest, catalogue_version=catalogue.version
+    )
+    db.query(User).filter(User.id == user_id).update({"last_scan_at": datetime.now(timezone.utc)})
+    db.commit()
+    remember_latest_scan(user_id, scan_id, False)
+    metrics.incr("background_scans.saved")
+    return scan_id
+
+
+def _refresh(user_id: uuid.UUID) -> None:
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        refresh_scan(db, user_id)
+    finally:
+        db.close()
+
+
+def _run(user_id: uuid.UUID, job: _Job) -> None:
+    while True:
+        with _lock:
+            job.started = True
+            job.rerun = False
+        try:
+            _refresh(user_id)
+        except Exception as e:
+            metrics.incr("background_scans.failed")
+            logger.warning(f"Background scan for user {user_id} failed: {e}")
+        with _lock:
+            if not job.rerun:
+                del _jobs[user_id]
+                job.done.set()
+                return
+
+
+def schedule_scan(user_id: uuid.UUID) -> bool:
+    """Queue a scan for the user; False if background scans are disabled."""
+    if _settings.BACKGROUND_SCAN_WORKERS <= 0:
+        return False
+    with _lock:
+        job = _jobs.get(user_id)
+        if job is not None:
+            # A queued job will read the new profile anyway; a running one
+            # may already have read the old one
+            job.rerun = job.rerun or job.started
+            return True
+        job = _jobs[user_id] = _Job()
+    metrics.incr("background_scans.scheduled")
+    _executor.submit(_run, user_id, job)
+    return True
+
+
+def is_refreshing(user_id: uuid.UUID) -> bool:
+    """Whether a background scan for the user is queued or running."""
+    return user_id in _jobs
+
+
+def wait_for_scan(user_id: uuid.UUID, timeout: float) -> bool:
+    """Wait up to ``timeout`` seconds for the user's background scan; True if none is left."""
+    job = _jobs.get(user_id)
+    if job is None:
+        return True
+    return job.done.wait(max(timeout, 0))
@@ -0,0 +1,258 @@
+"""
+Benchmark scan persistence: per-row ORM inserts against the bulk path.
+
+Each run saves a scan with N matches and commits, timing the whole write.
+``orm`` is the previous unit-of-work path (one ``ScanResultGrant`` per match,
+flush, commit, refresh); ``bulk`` is ``scan_store.save_scan`` writing rows
+and ``packed`` the same with ``SCAN_RESULT_STORAGE=packed``::
+
+    python -m app.engine.benchmark --matches 50 200 1000 --repeat 5
+    python -m app.engine.benchmark --database-url postgresql://localhost/grantfinder_bench
+
+``--reads`` instead compares the two storage layouts for a user with a long
+scan history: the time to load the latest scan's matches with their grants
+(``rows`` with the previous ``joinedload`` query, ``packed`` rebuilt from the
+catalogue snapshot as ``/scan/results`` does now) and, on SQLite, the bytes
+used by the scan tables and their indexes::
+
+    python -m app.engine.benchmark --reads --matches 200 --scans 100
+
+Without ``--database-url`` a throwaway SQLite file (WAL, as in the app) is
+used. Against another database the benchmark creates its own tables, so
+point it at an empty scratch database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from typing import Callable, Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session, joinedload, sessionmaker
+
+from app.database import Base
+from app.engine.matcher import MatchResult, MatchType
+from app.engine.catalogue import get_catalogue, invalidate_catalogue
+from app.engine.scan_store import save_scan, stored_results
+from app.models.grant import Grant
+from app.models.profile import UserProfile
+from app.models.scan_result import ScanResult, ScanResultGrant
+from app.models.user import User
+
+
+def _engine(url: Optional[str]):
+    if url is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="scan-bench-"), "bench.db")
+        url = f"sqlite:///{path}"
+    engine = create_engine(url, connect_args={"check_same_thread": False} if url.startswith("sqlite") else {})
+    if url.startswith("sqlite"):
+        @event.listens_for(engine, "connect")
+        def _pragma(dbapi_conn, _):
+            cursor = dbapi_conn.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def _fixtures(db: Session, n: int) -> tuple[User, UserProfile, list[MatchResult]]:
+    """A user, a profile and ``n`` match results pointing at real grant rows."""
+    run = uuid.uuid4().hex[:8]
+    user = User(email=f"bench-{run}@example.com")
+    db.add(user)
+    db.flush()
+    profile = UserProfile(user_id=user.id)
+    grants = [
+        Grant(
+            name=f"Bench grant {i}", slug=f"bench-{run}-{i}", short_description="Benchmark grant",
+            category="other", amount_type="fixed", max_amount=100 + i,
+            source_organisation="Bench", source_url="https://example.com",
+        )
+        for i in range(n)
+    ]
+    db.add(profile)
+    db.add_all(grants)
+    db.commit()
+    types = list(MatchType)
+    results = [
+        MatchResult(
+            grant_id=str(g.id), grant_name=g.name, match_type=types[i % len(types)],
+            match_score=100.0 - i % 50, max_amount=float(g.max_amount), amount_description=None,
+            category=g.category, source_organisation=g.source_organisation, source_url=g.source_url,
+            application_url=None, short_description=g.short_description, slug=g.slug,
+            notes="Some rules need checking" if i % 3 == 0 else "",
+        )
+        for i, g in enumerate(grants)
+    ]
+    return user, profile, results
+
+
+def _save_orm(db: Session, user: User, profile: UserProfile, results: list[MatchResult]) -> None:
+    scan = ScanResult(
+        user_id=user.id,
+        profile_id=profile.id,
+        total_grants=len(results),
+        total_value=sum(r.max_amount or 0 for r in results),
+    )
+    db.add(scan)
+    db.flush()
+    for idx, r in enumerate(results):
+        db.add(ScanResultGrant(
+            scan_result_id=scan.id,
+            grant_id=uuid.UUID(r.grant_id),
+            match_score=r.match_score,
+            match_type=r.match_type.value,
+            notes=r.notes,
+            sort_order=idx,
+        ))
+    db.commit()
+    db.refresh(scan)
+
+
+def _save_bulk(db: Session, user: User, profile: UserProfile, results: list[MatchResult]) -> None:
+    save_scan(db, user.id, profile.id, results, packed=False)
+    db.commit()
+
+
+def _save_packed(db: Session, user: User, profile: UserProfile, results: list[MatchResult]) -> None:
+    save_scan(db, user.id, profile.id, results, packed=True)
+    db.commit()
+
+
+METHODS: dict[str, Callable[..., None]] = {"orm": _save_orm, "bulk": _save_bulk, "packed": _save_packed}
+
+
+def run(sizes: list[int], repeat: int = 5, database_url: Optional[str] = None) -> list[dict]:
+    """Median and min commit-inclusive write time per method and match count."""
+    engine = _engine(database_url)
+    factory = sessionmaker(bind=engine)
+    rows = []
+    try:
+        for n in sizes:
+            with factory() as db:
+                user, profile, results = _fixtures(db, n)
+                user_id, profile_id = user.id, profile.id
+            for name, save in METHODS.items():
+                timings = []
+                for i in range(repeat + 1):
+                    with factory() as db:
+                        user_row, profile_row = db.get(User, user_id), db.get(UserProfile, profile_id)
+                        start = time.perf_counter()
+                        save(db, user_row, profile_row, results)
+                        elapsed = (time.perf_counter() - start) * 1000
+                    if i:  # First run warms up statement caches
+                        timings.append(elapsed)
+                rows.append({
+                    "method": name,
+                    "matches": n,
+                    "median_ms": round(statistics.median(timings), 2),
+                    "min_ms": round(min(timings), 2),
+                })
+    finally:
+        engine.dispose()
+    return rows
+
+
+def _read_rows(db: Session, scan: ScanResult) -> int:
+    rows = (
+        db.query(ScanResultGrant)
+        .filter(ScanResultGrant.scan_result_id == scan.id)
+        .options(joinedload(ScanResultGrant.grant))
+        .order_by(ScanResultGrant.sort_order)
+        .all()
+    )
+    return len([rg.grant.name for rg in rows])
+
+
+def _read_packed(db: Session, scan: ScanResult) -> int:
+    return len(stored_results(db, scan, get_catalogue(db), skip_missing=True))
+
+
+def _scan_storage_bytes(db: Session) -> Optional[int]:
+    """Pages used by the scan tables and their indexes (SQLite ``dbstat``)."""
+    if db.get_bind().dialect.name != "sqlite":
+        return None
+    return db.execute(text(
+        "SELECT SUM(pgsize) FROM dbstat WHERE name LIKE '%scan_result%'"
+    )).scalar()
+
+
+def run_reads(sizes: list[int], scans: int = 100, repeat: int = 20) -> list[dict]:
+    """Latest-scan read time and scan storage per layout, after ``scans`` saves.
+
+    Always uses throwaway SQLite files, one per layout and size.
+    """
+    rows = []
+    for n in sizes:
+        for name, packed, read in (("rows", False, _read_rows), ("packed", True, _read_packed)):
+            engine = _engine(None)
+            factory = sessionmaker(bind=engine)
+            invalidate_catalogue()
+            try:
+                with factory() as db:
+                    user, profile, results = _fixtures(db, n)
+                    for _ in range(scans):
+                        save_scan(db, user.id, profile.id, results, packed=packed)
+                    db.commit()
+                    user_id = user.id
+                timings = []
+                for i in range(repeat + 1):
+                    with factory() as db:
+                        start = time.perf_counter()
+                        scan = (
+                            db.query(ScanResult)
+                            .filter(ScanResult.user_id == user_id)
+                            .order_by(ScanResult.created_at.desc())
+                            .first()
+                        )
+                        assert read(db, scan) == n
+                        elapsed = (time.perf_counter() - start) * 1000
+                    if i:
+                        timings.append(elapsed)
+                with factory() as db:
+                    storage = _scan_storage_bytes(db)
+            finally:
+                engine.dispose()
+                invalidate_catalogue()
+            rows.append({
+                "method": name,
+                "matches": n,
+                "median_ms": round(statistics.median(timings), 2),
+                "min_ms": round(min(timings), 2),
+                "storage_kb": round(storage / 1024) if storage else None,
+            })
+    return rows
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--matches", type=int, nargs="+", default=[50, 200, 1000], help="Matches per scan")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed writes per size and method")
+    parser.add_argument("--database-url", help="Scratch database (default: temporary SQLite file)")
+    parser.add_argument("--reads", action="store_true", help="Compare read time and storage per layout")
+    parser.add_argument("--scans", type=int, default=100, help="Saved scans per user with --reads")
+    args = parser.parse_args(argv)
+
+    if args.reads:
+        for row in run_reads(args.matches, args.scans, max(args.repeat, 20)):
+            print(
+                f"{row['method']:>6}  {row['matches']:>5} matches  "
+                f"median {row['median_ms']:>8.2f} ms  min {row['min_ms']:>8.2f} ms  "
+                f"scan storage {row['storage_kb']} KB"
+            )
+        return
+    for row in run(args.matches, args.repeat, args.database_url):
+        print(
+            f"{row['method']:>6}  {row['matches']:>5} matches  "
+            f"median {row['median_ms']:>8.2f} ms  min {row['min_ms']:>8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
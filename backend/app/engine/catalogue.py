@@ -0,0 +1,146 @@
+"""
+In-memory snapshot of the active grant catalogue.
+
+Every scan, report and chat request evaluates against the same set of active
+grants. Instead of re-loading grants and rules with ``joinedload`` each time,
+we keep a plain-dict snapshot per process and rebuild it only when a cheap
+fingerprint query says the tables changed (or an admin write invalidates it).
+
+``CatalogueSnapshot.version`` hashes the grant content together with the
+savings rules version, so anything cached against it (scan results, AI
+summaries, report fragments) is invalidated when either side changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
+
+from app.engine.savings import get_registry
+from app.models.eligibility_rule import EligibilityRule
+from app.models.grant import Grant
+
+
+@dataclass(frozen=True)
+class CatalogueSnapshot:
+    """Immutable, matcher-ready view of all active grants."""
+
+    version: str
+    content_hash: str
+    savings_version: str
+    grants: list[dict] = field(default_factory=list)
+    by_id: dict[str, dict] = field(default_factory=dict)
+    by_slug: dict[str, dict] = field(default_factory=dict)
+
+
+def _grant_to_dict(g: Grant) -> dict[str, Any]:
+    return {
+        "id": str(g.id),
+        "name": g.name,
+        "slug": g.slug,
+        "short_description": g.short_description,
+        "long_description": g.long_description,
+        "category": g.category,
+        "max_amount": float(g.max_amount) if g.max_amount else None,
+        "amount_description": g.amount_description,
+        "source_organisation": g.source_organisation,
+        "source_url": g.source_url,
+        "application_url": g.application_url,
+        "eligibility_rules": [
+            {
+                "rule_group": r.rule_group,
+                "field": r.field,
+                "operator": r.operator,
+                "value": r.value,
+                "description": r.description,
+                "is_mandatory": r.is_mandatory,
+            }
+            for r in sorted(
+                g.eligibility_rules,
+                key=lambda r: (r.rule_group, r.sort_order or 0, r.field, r.operator, r.value),
+            )
+        ],
+    }
+
+
+def _combine_version(content_hash: str, savings_version: str) -> str:
+    return hashlib.sha256(f"{content_hash}:{savings_version}".encode()).hexdigest()[:16]
+
+
+def _fingerprint(db: Session) -> tuple:
+    """Cheap aggregate that changes whenever grants or rules are written."""
+    grant_count, last_updated = db.query(func.count(Grant.id), func.max(Grant.updated_at)).one()
+    rule_count, rules_updated = db.query(
+        func.count(EligibilityRule.id), func.max(EligibilityRule.updated_at)
+    ).one()
+    return (grant_count, str(last_updated), rule_count, str(rules_updated))
+
+
+def _load(db: Session, savings_version: str) -> CatalogueSnapshot:
+    grants = (
+        db.query(Grant)
+        .filter(Grant.is_active == True)  # noqa: E712
+        .options(joinedload(Grant.eligibility_rules))
+        .all()
+    )
+    grant_dicts = [_grant_to_dict(g) for g in grants]
+    content_hash = hashlib.sha256(
+        json.dumps(sorted(grant_dicts, key=lambda g: g["id"]), sort_keys=True, default=str).encode()
+    ).hexdigest()[:16]
+    return CatalogueSnapshot(
+        version=_combine_version(content_hash, savings_version),
+        content_hash=content_hash,
+        savings_version=savings_version,
+        grants=grant_dicts,
+        by_id={g["id"]: g for g in grant_dicts},
+        by_slug={g["slug"]: g for g in grant_dicts},
+    )
+
+
+_lock = threading.Lock()
+_snapshot: Optional[CatalogueSnapshot] = None
+_snapshot_fingerprint: Optional[tuple] = None
+
+
+def get_catalogue(db: Session) -> CatalogueSnapshot:
+    """Return the current catalogue snapshot, rebuilding it if stale."""
+    global _snapshot, _snapshot_fingerprint
+
+    fingerprint = _fingerprint(db)
+    savings_version = get_registry().version
+    snap = _snapshot
+    if snap is not None and fingerprint == _snapshot_fingerprint:
+        if snap.savings_version == savings_version:
+            return snap
+
+    with _lock:
+        snap = _snapshot
+        if snap is None or fingerprint != _snapshot_fingerprint:
+            snap = _load(db, savings_version)
+            _snapshot_fingerprint = fingerprint
+        elif snap.savings_version != savings_version:
+            # Savings rules changed but grants didn't — only the version moves
+            snap = CatalogueSnapshot(
+                version=_combine_version(snap.content_hash, savings_version),
+                content_hash=snap.content_hash,
+                savings_version=savings_version,
+                grants=snap.grants,
+                by_id=snap.by_id,
+                by_slug=snap.by_slug,
+            )
+        _snapshot = snap
+        return snap
+
+
+def invalidate_catalogue() -> None:
+    """Drop the cached snapshot so the next request reloads from the DB."""
+    global _snapshot, _snapshot_fingerprint
+    with _lock:
+        _snapshot = None
+        _snapshot_fingerprint = None
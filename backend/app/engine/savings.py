@@ -3,52 +3,244 @@ Precise savings calculator for Irish tax credits and grants.
 
 Calculates actual estimated annual savings and backdated claim amounts
 based on the user's income bracket and tax rate.
+
+The tax bands, backdating windows and per-credit special cases live in
+``data/savings_rules.json``. That file is compiled into a registry with an
+O(1) slug → calculator dispatch table, and is reloaded atomically when it
+changes on disk — adding a credit is a data change, not a new ``elif``.
 """
 
 from __future__ import annotations
-from typing import Any, Optional
-
-
-# Irish tax bands 2025/2026
-# Single: 20% on first €42,000, 40% on the rest
-# Married (one earner): 20% on first €51,000, 40% on the rest
-INCOME_TAX_RATES = {
-    "<20k": {"marginal_rate": 0.20, "effective_rate": 0.20},
-    "20-40k": {"marginal_rate": 0.20, "effective_rate": 0.20},
-    "40-60k": {"marginal_rate": 0.40, "effective_rate": 0.30},
-    "60-80k": {"marginal_rate": 0.40, "effective_rate": 0.35},
-    "80k+": {"marginal_rate": 0.40, "effective_rate": 0.38},
-}
 
-# Grants that can be backdated (up to 4 years)
-BACKDATABLE_SLUGS = {
-    "dependent-relative-tax-credit": 4,
-    "age-tax-credit": 4,
-    "blind-persons-tax-credit": 4,
-    "widowed-person-tax-credit": 4,
-    "widowed-parent-tax-credit": 4,  # 5 years but decreasing
-    "incapacitated-child-tax-credit": 4,
-    "paye-tax-credit": 4,
-    "earned-income-tax-credit": 4,
-    "rent-tax-credit": 4,  # available 2022-2028
-    "home-carer-tax-credit": 4,
-    "single-person-child-carer-credit": 4,
-    "medical-expenses-tax-relief": 4,
-    "nursing-home-expenses-tax-relief": 4,
-    "remote-working-tax-relief": 4,
-    "mortgage-interest-tax-credit": 3,  # 2023-2026 only
-}
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+SAVINGS_RULES_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "savings_rules.json"
+)
+
+# How often (seconds) get_registry() stats the rules file for changes
+RELOAD_CHECK_INTERVAL = 5.0
+
+# (max_amount, amount_description, rates, profile) -> (annual_saving, savings_note)
+Calculator = Callable[[Optional[float], str, dict, dict], tuple[Optional[float], str]]
+
+
+# ── Calculator kinds ─────────────────────────────────────────────────────────
+# Each factory takes the rule spec from the data file and returns a Calculator.
+
+
+def _fixed(spec: dict) -> Calculator:
+    """Fixed annual credit, e.g. blind person's credit."""
+    amount = float(spec["amount"])
+    note = spec["note"]
+
+    def calc(max_amount, amount_description, rates, profile):
+        return amount, note
+
+    return calc
+
+
+def _per_unit(spec: dict) -> Calculator:
+    """Amount multiplied by a profile count, e.g. child benefit per child."""
+    unit_amount = float(spec["unit_amount"])
+    count_field = spec["count_field"]
+    plural_suffix = spec.get("plural_suffix", "s")
+    note = spec["note"]
+
+    def calc(max_amount, amount_description, rates, profile):
+        count = profile.get(count_field, 1) or 1
+        total = unit_amount * count
+        plural = plural_suffix if count > 1 else ""
+        return total, note.format(count=count, plural=plural, total=total)
+
+    return calc
+
+
+def _by_marital_status(spec: dict) -> Calculator:
+    """Married couples get a different (usually double) credit."""
+    married = (float(spec["married"]["amount"]), spec["married"]["note"])
+    default = (float(spec["default"]["amount"]), spec["default"]["note"])
+
+    def calc(max_amount, amount_description, rates, profile):
+        marital = profile.get("marital_status", "single")
+        return married if marital == "married" else default
+
+    return calc
+
+
+def _relief_at_rate(spec: dict) -> Calculator:
+    """Relief on spending — can't calculate without expense figures."""
+    rate = spec["rate"]
+
+    def calc(max_amount, amount_description, rates, profile):
+        if rate == "marginal":
+            rate_val = rates["marginal_rate"]
+            return None, f"Tax relief at your marginal rate ({rate_val:.0%}) on qualifying expenses"
+        return None, f"Tax relief at {rate:.0%} on qualifying expenses"
+
+    return calc
+
+
+def _default(spec: dict) -> Calculator:
+    """Fall back to the grant's own max_amount."""
+    threshold = float(spec.get("direct_credit_threshold", 10000))
+
+    def calc(max_amount, amount_description, rates, profile):
+        # Fixed-amount tax credits — saving = credit amount
+        if max_amount and max_amount < threshold:
+            return max_amount, f"€{max_amount:,.0f}/year direct tax reduction"
+        # For grants (not tax credits) — the grant amount itself
+        if max_amount:
+            return max_amount, amount_description or f"Up to €{max_amount:,.0f}"
+        return None, ""
+
+    return calc
+
 
-# Tax credits where saving = credit amount (direct reduction)
-# vs. tax reliefs where saving depends on tax rate
-RELIEF_AT_RATE_SLUGS = {
-    "medical-expenses-tax-relief": 0.20,  # Always at standard rate
-    "nursing-home-expenses-tax-relief": "marginal",  # At marginal rate
-    "remote-working-tax-relief": 0.30,  # 30% of costs
-    "tuition-fees-tax-relief": 0.20,  # At standard rate
+CALCULATOR_KINDS: dict[str, Callable[[dict], Calculator]] = {
+    "fixed": _fixed,
+    "per_unit": _per_unit,
+    "by_marital_status": _by_marital_status,
+    "relief_at_rate": _relief_at_rate,
 }
 
 
+# ── Registry ─────────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class SavingsRegistry:
+    """Compiled, immutable view of ``savings_rules.json``."""
+
+    version: str
+    income_tax_rates: dict[str, dict[str, float]]
+    default_income_bracket: str
+    calculators: dict[str, Calculator]
+    backdate_years: dict[str, int]
+    default_calculator: Calculator
+
+    def calculate(
+        self,
+        slug: str,
+        max_amount: Optional[float],
+        amount_description: str,
+        income_bracket: Optional[str],
+        profile: dict[str, Any],
+    ) -> dict:
+        default_rates = self.income_tax_rates[self.default_income_bracket]
+        rates = self.income_tax_rates.get(income_bracket or self.default_income_bracket, default_rates)
+
+        calc = self.calculators.get(slug, self.default_calculator)
+        annual_saving, savings_note = calc(max_amount, amount_description, rates, profile)
+
+        # Calculate backdated amount
+        backdated_saving: Optional[float] = None
+        backdate_years = self.backdate_years.get(slug)
+        if backdate_years and annual_saving:
+            backdated_saving = annual_saving * backdate_years
+            savings_note += f" — can be backdated {backdate_years} years (up to €{backdated_saving:,.0f} total)"
+
+        return {
+            "estimated_annual_saving": annual_saving,
+            "estimated_backdated_saving": backdated_saving,
+            "savings_note": savings_note,
+        }
+
+
+def compile_registry(data: dict, version: str) -> SavingsRegistry:
+    """Compile the raw rules document into a dispatch table.
+
+    Raises ``ValueError`` for unknown calculator kinds or a missing default
+    income bracket, so a bad edit is rejected before it replaces a good one.
+    """
+    rates = {
+        bracket: {k: float(v) for k, v in r.items()}
+        for bracket, r in data["income_tax_rates"].items()
+    }
+    default_bracket = data.get("default_income_bracket", "40-60k")
+    if default_bracket not in rates:
+        raise ValueError(f"Default income bracket '{default_bracket}' has no tax rates")
+
+    calculators: dict[str, Calculator] = {}
+    backdate_years: dict[str, int] = {}
+    for slug, spec in data.get("rules", {}).items():
+        kind = spec.get("kind")
+        if kind is not None:
+            factory = CALCULATOR_KINDS.get(kind)
+            if factory is None:
+                raise ValueError(f"Unknown savings rule kind '{kind}' for '{slug}'")
+            calculators[slug] = factory(spec)
+        if spec.get("backdate_years"):
+            backdate_years[slug] = int(spec["backdate_years"])
+
+    return SavingsRegistry(
+        version=version,
+        income_tax_rates=rates,
+        default_income_bracket=default_bracket,
+        calculators=calculators,
+        backdate_years=backdate_years,
+        default_calculator=_default(data),
+    )
+
+
+def load_registry(path: str = SAVINGS_RULES_FILE) -> SavingsRegistry:
+    """Read and compile a rules file; the version is a hash of its bytes."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    version = hashlib.sha256(raw).hexdigest()[:12]
+    return compile_registry(json.loads(raw), version)
+
+
+_lock = threading.Lock()
+_registry: Optional[SavingsRegistry] = None
+_registry_mtime: float = 0.0
+_last_check: float = 0.0
+
+
+def get_registry() -> SavingsRegistry:
+    """Return the current registry, reloading it if the rules file changed.
+
+    The file is stat-ed at most every ``RELOAD_CHECK_INTERVAL`` seconds.
+    A reload builds a complete new registry and swaps the reference, so
+    callers never see a half-updated table. If the new file fails to
+    compile the previous registry stays in place.
+    """
+    global _registry, _registry_mtime, _last_check
+
+    now = time.monotonic()
+    if _registry is not None and now - _last_check < RELOAD_CHECK_INTERVAL:
+        return _registry
+
+    with _lock:
+        if _registry is not None and now - _last_check < RELOAD_CHECK_INTERVAL:
+            return _registry
+        _last_check = now
+        try:
+            mtime = os.path.getmtime(SAVINGS_RULES_FILE)
+        except OSError:
+            if _registry is None:
+                raise
+            return _registry
+        if _registry is None or mtime != _registry_mtime:
+            try:
+                _registry = load_registry(SAVINGS_RULES_FILE)
+                _registry_mtime = mtime
+            except (OSError, ValueError, KeyError) as e:
+                if _registry is None:
+                    raise
+                logger.warning(f"Keeping savings rules {_registry.version}, reload failed: {e}")
+        return _registry
+
+
 def calculate_savings(
     slug: str,
     max_amount: Optional[float],
@@ -64,93 +256,4 @@ def calculate_savings(
     - estimated_backdated_saving: float or None
     - savings_note: str explaining the calculation
     """
-    rates = INCOME_TAX_RATES.get(income_bracket or "40-60k", INCOME_TAX_RATES["40-60k"])
-    annual_saving: Optional[float] = None
-    backdated_saving: Optional[float] = None
-    savings_note = ""
-
-    # For dependent relative credit, multiply by number of relatives
-    if slug == "dependent-relative-tax-credit":
-        num_relatives = profile.get("num_dependent_relatives", 1) or 1
-        annual_saving = 305.0 * num_relatives
-        savings_note = f"€305 x {num_relatives} dependent relative{'s' if num_relatives > 1 else ''} = €{annual_saving:,.0f}/year"
-
-    # For personal tax credit — married couples get double
-    elif slug == "personal-tax-credit":
-        marital = profile.get("marital_status", "single")
-        if marital == "married":
-            annual_saving = 4000.0
-            savings_note = "€4,000/year (married couple)"
-        else:
-            annual_saving = 2000.0
-            savings_note = "€2,000/year"
-
-    # Age tax credit — married couples get double
-    elif slug == "age-tax-credit":
-        marital = profile.get("marital_status", "single")
-        if marital == "married":
-            annual_saving = 490.0
-            savings_note = "€490/year (married couple)"
-        else:
-            annual_saving = 245.0
-            savings_note = "€245/year"
-
-    # Blind person's credit
-    elif slug == "blind-persons-tax-credit":
-        annual_saving = 1950.0
-        savings_note = "€1,950/year direct tax reduction"
-
-    # Rent tax credit — couples get double
-    elif slug == "rent-tax-credit":
-        marital = profile.get("marital_status", "single")
-        if marital == "married":
-            annual_saving = 2000.0
-            savings_note = "€2,000/year (jointly assessed couple)"
-        else:
-            annual_saving = 1000.0
-            savings_note = "€1,000/year (20% of rent up to this max)"
-
-    # Child benefit — per child
-    elif slug == "child-benefit":
-        num = profile.get("num_children", 1) or 1
-        annual_saving = 1680.0 * num
-        savings_note = f"€140/month x {num} child{'ren' if num > 1 else ''} = €{annual_saving:,.0f}/year"
-
-    # Incapacitated child — per child
-    elif slug == "incapacitated-child-tax-credit":
-        annual_saving = 3800.0
-        savings_note = "€3,800/year per qualifying child"
-
-    # Reliefs where the amount depends on spending
-    elif slug in RELIEF_AT_RATE_SLUGS:
-        rate = RELIEF_AT_RATE_SLUGS[slug]
-        if rate == "marginal":
-            rate_val = rates["marginal_rate"]
-            savings_note = f"Tax relief at your marginal rate ({rate_val:.0%}) on qualifying expenses"
-        else:
-            savings_note = f"Tax relief at {rate:.0%} on qualifying expenses"
-        # Can't calculate exact amount without expense figures
-        annual_saving = None
-
-    # Fixed-amount tax credits — saving = credit amount
-    elif max_amount and max_amount < 10000:
-        # Likely a tax credit — direct reduction
-        annual_saving = max_amount
-        savings_note = f"€{max_amount:,.0f}/year direct tax reduction"
-
-    # For grants (not tax credits) — the grant amount itself
-    elif max_amount:
-        annual_saving = max_amount
-        savings_note = amount_description or f"Up to €{max_amount:,.0f}"
-
-    # Calculate backdated amount
-    backdate_years = BACKDATABLE_SLUGS.get(slug)
-    if backdate_years and annual_saving:
-        backdated_saving = annual_saving * backdate_years
-        savings_note += f" — can be backdated {backdate_years} years (up to €{backdated_saving:,.0f} total)"
-
-    return {
-        "estimated_annual_saving": annual_saving,
-        "estimated_backdated_saving": backdated_saving,
-        "savings_note": savings_note,
-    }
+    return get_registry().calculate(slug, max_amount, amount_description, income_bracket, profile)
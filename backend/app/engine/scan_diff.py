@@ -0,0 +1,176 @@
+"""
+What changed between two scans.
+
+A scan is reduced to a vector of ``(grant id, match rank, score)`` sorted by
+grant id, built straight from the stored outcome (packed blob or plain
+column rows; scans are looked up as column tuples, never ORM objects) or
+from fresh ``MatchResult`` objects. Two vectors are compared in a single
+merge pass:
+
+- ``added`` / ``removed``: grants matched in only one of the scans;
+- ``upgraded`` / ``downgraded``: the match type moved (eligible > likely >
+  possible > not eligible);
+- ``rescored``: same match type, different score;
+- the change in total potential value.
+
+``diff_scans`` and ``diff_against_results`` are the entry points for
+notifications; ``GET /scan/diff`` exposes the same thing to users.
+"""
+
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, NamedTuple, Optional, Union
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from app.engine.matcher import MatchResult
+from app.engine.scan_store import MATCH_TYPES, StoredMatch, load_matches
+from app.models.scan_result import ScanResult
+
+
+class ScanHead(NamedTuple):
+    """The columns of a ``ScanResult`` a diff needs; enough for ``load_matches``."""
+
+    id: uuid.UUID
+    created_at: datetime
+    total_value: Optional[float]
+    packed_matches: Optional[bytes]
+
+
+class VectorEntry(NamedTuple):
+    grant_id: uuid.UUID
+    rank: int  # Index into MATCH_TYPES: lower is better
+    score: float
+
+
+@dataclass(frozen=True)
+class GrantChange:
+    grant_id: uuid.UUID
+    match_type_before: Optional[str]
+    match_type_after: Optional[str]
+    score_before: Optional[float]
+    score_after: Optional[float]
+
+
+@dataclass
+class ScanDiff:
+    added: list[GrantChange] = field(default_factory=list)
+    removed: list[GrantChange] = field(default_factory=list)
+    upgraded: list[GrantChange] = field(default_factory=list)
+    downgraded: list[GrantChange] = field(default_factory=list)
+    rescored: list[GrantChange] = field(default_factory=list)
+    unchanged: int = 0
+    total_value_before: float = 0.0
+    total_value_after: float = 0.0
+
+    @property
+    def value_delta(self) -> float:
+        return self.total_value_after - self.total_value_before
+
+    @property
+    def has_changes(self) -> bool:
+        """Whether any grant was added, removed or changed match type."""
+        return bool(self.added or self.removed or self.upgraded or self.downgraded)
+
+
+def match_vector(matches: Iterable[Union[StoredMatch, MatchResult]]) -> list[VectorEntry]:
+    """Sorted ``(grant id, rank, score)`` vector from stored or fresh matches."""
+    vector = []
+    for m in matches:
+        match_type = m.match_type if isinstance(m.match_type, str) else m.match_type.value
+        grant_id = m.grant_id if isinstance(m.grant_id, uuid.UUID) else uuid.UUID(m.grant_id)
+        # Scores are stored to two decimals; compare fresh ones at that precision
+        score = round(float(m.match_score or 0), 2)
+        vector.append(VectorEntry(grant_id, MATCH_TYPES.index(match_type), score))
+    vector.sort()
+    return vector
+
+
+def _change(before: Optional[VectorEntry], after: Optional[VectorEntry]) -> GrantChange:
+    return GrantChange(
+        grant_id=(after or before).grant_id,
+        match_type_before=MATCH_TYPES[before.rank] if before else None,
+        match_type_after=MATCH_TYPES[after.rank] if after else None,
+        score_before=before.score if before else None,
+        score_after=after.score if after else None,
+    )
+
+
+def diff_vectors(
+    before: list[VectorEntry],
+    after: list[VectorEntry],
+    total_value_before: float = 0.0,
+    total_value_after: float = 0.0,
+) -> ScanDiff:
+    """Merge two sorted vectors into a ``ScanDiff``; O(len(before) + len(after))."""
+    diff = ScanDiff(total_value_before=total_value_before, total_value_after=total_value_after)
+    i = j = 0
+    while i < len(before) or j < len(after):
+        b = before[i] if i < len(before) else None
+        a = after[j] if j < len(after) else None
+        if a is None or (b is not None and b.grant_id < a.grant_id):
+            diff.removed.append(_change(b, None))
+            i += 1
+        elif b is None or a.grant_id < b.grant_id:
+            diff.added.append(_change(None, a))
+            j += 1
+        else:
+            if a.rank < b.rank:
+                diff.upgraded.append(_change(b, a))
+            elif a.rank > b.rank:
+                diff.downgraded.append(_change(b, a))
+            elif a.score != b.score:
+                diff.rescored.append(_change(b, a))
+            else:
+                diff.unchanged += 1
+            i += 1
+            j += 1
+    return diff
+
+
+def scan_head(
+    db: Session,
+    user_id: uuid.UUID,
+    scan_id: Optional[uuid.UUID] = None,
+    older_than: Optional[ScanHead] = None,
+) -> Optional[ScanHead]:
+    """One of the user's scans: ``scan_id``, else the latest (older than ``older_than``)."""
+    query = db.query(
+        ScanResult.id, ScanResult.created_at, ScanResult.total_value, ScanResult.packed_matches
+    ).filter(ScanResult.user_id == user_id)
+    if scan_id is not None:
+        query = query.filter(ScanResult.id == scan_id)
+    if older_than is not None:
+        query = query.filter(
+            tuple_(ScanResult.created_at, ScanResult.id) < (older_than.created_at, older_than.id)
+        )
+    row = query.order_by(ScanResult.created_at.desc(), ScanResult.id.desc()).first()
+    return ScanHead(*row) if row is not None else None
+
+
+def _total_value(scan: ScanHead) -> float:
+    return float(scan.total_value) if scan.total_value else 0.0
+
+
+def diff_scans(db: Session, before: ScanHead, after: ScanHead) -> ScanDiff:
+    """Diff two saved scans."""
+    return diff_vectors(
+        match_vector(load_matches(db, before)),
+        match_vector(load_matches(db, after)),
+        _total_value(before),
+        _total_value(after),
+    )
+
+
+def diff_against_results(db: Session, before: ScanHead, results: list[MatchResult]) -> ScanDiff:
+    """Diff a saved scan against a fresh match (e.g. after a catalogue update)."""
+    return diff_vectors(
+        match_vector(load_matches(db, before)),
+        match_vector(results),
+        _total_value(before),
+        sum(r.max_amount or 0 for r in results),
+    )
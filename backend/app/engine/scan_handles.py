@@ -0,0 +1,114 @@
+"""
+Short-lived handles to materialised scan results.
+
+A scan already runs the matcher, works out savings and starts the AI
+summary; the report endpoints need exactly the same data. Each scan response
+carries a ``scan_handle`` pointing at those results in memory, and a report
+request that passes it back skips matching, savings and the summary call.
+
+Handles expire after ``SCAN_HANDLE_TTL_SECONDS`` and are ignored once the
+catalogue has changed, in which case the report recomputes from the profile.
+"""
+
+from __future__ import annotations
+
+import secrets
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from app.config import get_settings
+from app.engine.ai_summary import get_ai_summary
+from app.engine.how_to_claim import HOW_TO_CLAIM
+from app.engine.matcher import MatchResult
+from app.utils import metrics
+from app.utils.ttl_cache import TTLCache
+
+_settings = get_settings()
+
+
+@dataclass(frozen=True)
+class MaterialisedScan:
+    profile: dict[str, Any]
+    matched_grants: list[dict]  # In the shape the PDF report expects
+    total_value: float
+    catalogue_version: str
+    summary: str = ""  # Stored, pre-generated or cached AI summary; never the template
+    summary_token: Optional[str] = None  # Background AI summary, if one was started
+
+
+_handles: TTLCache[MaterialisedScan] = TTLCache(
+    maxsize=_settings.SCAN_HANDLE_MAX_ENTRIES, ttl=_settings.SCAN_HANDLE_TTL_SECONDS
+)
+# (scan id, catalogue version) -> handle, so re-reads of a stored scan share one
+_keyed: TTLCache[str] = TTLCache(
+    maxsize=_settings.SCAN_HANDLE_MAX_ENTRIES, ttl=_settings.SCAN_HANDLE_TTL_SECONDS
+)
+
+
+def report_grant(r: MatchResult, savings: dict) -> dict:
+    """Grant dict for the PDF report from a match and its ``calculate_savings`` result."""
+    return {
+        "name": r.grant_name,
+        "slug": r.slug,
+        "category": r.category,
+        "match_type": r.match_type.value,
+        "match_score": r.match_score,
+        "max_amount": r.max_amount,
+        "amount_description": r.amount_description or "",
+        "short_description": r.short_description,
+        "source_url": r.source_url,
+        "application_url": r.application_url,
+        "notes": r.notes,
+        "estimated_annual_saving": savings["estimated_annual_saving"],
+        "estimated_backdated_saving": savings["estimated_backdated_saving"],
+        "savings_note": savings["savings_note"],
+        "how_to_claim": HOW_TO_CLAIM.get(r.slug, ""),
+    }
+
+
+def create_handle(scan: MaterialisedScan, key: Optional[tuple] = None) -> str:
+    """Keep ``scan`` behind a new handle, or behind the live one already minted for ``key``.
+
+    Reusing the handle stops clients that poll a stored scan from filling the
+    cache and evicting other callers' handles. The entry is only replaced
+    when this copy has a final summary and the existing one doesn't.
+    """
+    if key is not None:
+        handle = _keyed.get(key)
+        existing = _handles.get(handle) if handle is not None else None
+        if existing is not None:
+            if scan.summary and ready_summary(existing) is None:
+                _handles.set(handle, scan)
+            metrics.incr("scan_handles.reused")
+            return handle
+    handle = secrets.token_urlsafe(16)
+    _handles.set(handle, scan)
+    if key is not None:
+        _keyed.set(key, handle)
+    return handle
+
+
+def get_handle(handle: str, catalogue_version: str) -> Optional[MaterialisedScan]:
+    """The scan behind ``handle``, or None if unknown, expired or from an older catalogue."""
+    scan = _handles.get(handle)
+    if scan is None or scan.catalogue_version != catalogue_version:
+        metrics.incr("scan_handles.misses")
+        return None
+    metrics.incr("scan_handles.hits")
+    return scan
+
+
+def ready_summary(scan: MaterialisedScan) -> Optional[str]:
+    """The scan's final summary if there is one yet.
+
+    That is the background AI summary once it is ready, or the summary the
+    scan already had (stored, pre-generated or cached; such scans never start
+    a job). Returns None while the job is pending, or if the scan only had
+    the template fallback.
+    """
+    if scan.summary_token is None:
+        return scan.summary or None
+    job = get_ai_summary(scan.summary_token)
+    if job is not None and job["status"] == "ready":
+        return job["summary"]
+    return None
@@ -0,0 +1,425 @@
+"""
+Bulk persistence of scan outcomes.
+
+A scan can match hundreds of grants. Rather than building one ORM object per
+match and letting the unit of work flush them row by row, the scan and its
+matches are written with Core ``INSERT`` statements: ids are generated
+client side, so nothing needs to be read back, and the match rows go out as
+a single executemany (batched into multi-row ``VALUES`` on both SQLite and
+PostgreSQL).
+
+Each scan records a hash of the profile it was computed from and the
+catalogue version; ``latest_unchanged_scan`` finds the
+previous scan a repeat request can reuse, and ``stored_results`` turns its
+matches back into ``MatchResult`` objects without running the matcher.
+Each user's latest scan id is also kept in memory (``remember_latest_scan``)
+for conditional ``/scan/results`` requests.
+
+With ``SCAN_RESULT_STORAGE=packed`` the matches aren't written to
+``scan_result_grants`` at all: the ranked list is packed into one compressed
+``ScanResult.packed_matches`` value instead (see ``pack_matches``). Readers go
+through ``load_matches``, which handles both layouts, so the two can coexist
+while ``python -m app.engine.scan_store --backfill`` converts old scans.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import struct
+import uuid
+import zlib
+from datetime import datetime
+from typing import Any, Iterable, NamedTuple, Optional
+
+from sqlalchemy import insert, tuple_
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.engine.catalogue import CatalogueSnapshot
+from app.engine.matcher import MatchResult, MatchType
+from app.models.scan_result import ScanResult, ScanResultGrant
+from app.utils.ttl_cache import TTLCache
+
+_settings = get_settings()
+
+# ── Packed format ────────────────────────────────────────────────────────────
+#
+# byte 0: format version, then zlib of:
+#   u16 note count, then per note: u16 length + UTF-8 bytes
+#   u32 match count, then per match (in rank order):
+#     16-byte grant UUID, u16 score x 100, u8 match type, u16 note index + 1 (0 = none)
+#
+# Notes are interned: the matcher produces the same few sentences for many
+# grants, so each distinct note is stored once.
+
+FORMAT_VERSION = 1
+MATCH_TYPES = tuple(t.value for t in MatchType)  # Append only: codes are stored
+_RECORD = struct.Struct(">16sHBH")
+_U16 = struct.Struct(">H")
+_U32 = struct.Struct(">I")
+
+
+class StoredMatch(NamedTuple):
+    grant_id: uuid.UUID
+    match_score: Optional[float]
+    match_type: str
+    notes: Optional[str]
+    sort_order: int
+
+
+def pack_matches(matches: Iterable[StoredMatch]) -> bytes:
+    """Pack ranked matches into the compact ``packed_matches`` format."""
+    notes: dict[str, int] = {}
+    records = []
+    count = 0
+    for m in matches:
+        note_ref = 0
+        if m.notes:
+            note_ref = notes.setdefault(m.notes, len(notes)) + 1
+        score = round((m.match_score or 0) * 100)
+        records.append(_RECORD.pack(m.grant_id.bytes, score, MATCH_TYPES.index(m.match_type), note_ref))
+        count += 1
+    parts = [_U16.pack(len(notes))]
+    for note in notes:
+        data = note.encode("utf-8")
+        parts.append(_U16.pack(len(data)) + data)
+    parts.append(_U32.pack(count))
+    parts.extend(records)
+    return bytes([FORMAT_VERSION]) + zlib.compress(b"".join(parts), 6)
+
+
+def unpack_matches(blob: bytes) -> list[StoredMatch]:
+    if blob[0] != FORMAT_VERSION:
+        raise ValueError(f"Unknown packed match format {blob[0]}")
+    data = zlib.decompress(blob[1:])
+    (n_notes,) = _U16.unpack_from(data, 0)
+    offset = _U16.size
+    notes = []
+    for _ in range(n_notes):
+        (length,) = _U16.unpack_from(data, offset)
+        offset += _U16.size
+        notes.append(data[offset:offset + length].decode("utf-8"))
+        offset += length
+    (count,) = _U32.unpack_from(data, offset)
+    offset += _U32.size
+    matches = []
+    for i in range(count):
+        grant_bytes, score, type_code, note_ref = _RECORD.unpack_from(data, offset + i * _RECORD.size)
+        matches.append(StoredMatch(
+            grant_id=uuid.UUID(bytes=grant_bytes),
+            match_score=score / 100,
+            match_type=MATCH_TYPES[type_code],
+            notes=notes[note_ref - 1] if note_ref else None,
+            sort_order=i,
+        ))
+    return matches
+
+
+# ── Writes ───────────────────────────────────────────────────────────────────
+
+
+def _use_packed(packed: Optional[bool]) -> bool:
+    if packed is not None:
+        return packed
+    return _settings.SCAN_RESULT_STORAGE == "packed"
+
+
+def profile_hash(profile_dict: dict[str, Any]) -> str:
+    """Stable hash of the matcher input built from a profile."""
+    payload = json.dumps(profile_dict, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def save_scan(
+    db: Session,
+    user_id: uuid.UUID,
+    profile_id: Optional[uuid.UUID],
+    results: list[MatchResult],
+    packed: Optional[bool] = None,
+    profile_digest: Optional[str] = None,
+    catalogue_version: Optional[str] = None,
+) -> uuid.UUID:
+    """Insert a ScanResult and its matches in the current transaction.
+
+    ``packed`` overrides the ``SCAN_RESULT_STORAGE`` setting. Returns the
+    new scan id; the caller commits.
+    """
+    scan_id = uuid.uuid4()
+    stored = [
+        StoredMatch(uuid.UUID(str(r.grant_id)), r.match_score, r.match_type.value, r.notes, idx)
+        for idx, r in enumerate(results)
+    ]
+    use_packed = _use_packed(packed)
+    db.execute(
+        insert(ScanResult.__table__).values(
+            id=scan_id,
+            user_id=user_id,
+            profile_id=profile_id,
+            total_grants=len(results),
+            total_value=sum(r.max_amount or 0 for r in results),
+            packed_matches=pack_matches(stored) if use_packed else None,
+            profile_hash=profile_digest,
+            catalogue_version=catalogue_version,
+            created_at=datetime.utcnow(),
+        )
+    )
+    if stored and not use_packed:
+        db.execute(
+            insert(ScanResultGrant.__table__),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "scan_result_id": scan_id,
+                    "grant_id": m.grant_id,
+                    "match_score": m.match_score,
+                    "match_type": m.match_type,
+                    "notes": m.notes,
+                    "sort_order": m.sort_order,
+                }
+                for m in stored
+            ],
+        )
+    return scan_id
+
+
+# ── Reads ────────────────────────────────────────────────────────────────────
+
+
+def load_matches(db: Session, scan: ScanResult) -> list[StoredMatch]:
+    """A scan's matches in rank order, from whichever layout it was saved in."""
+    if scan.packed_matches is not None:
+        return unpack_matches(scan.packed_matches)
+    rows = (
+        db.query(
+            ScanResultGrant.grant_id,
+            ScanResultGrant.match_score,
+            ScanResultGrant.match_type,
+            ScanResultGrant.notes,
+            ScanResultGrant.sort_order,
+        )
+        .filter(ScanResultGrant.scan_result_id == scan.id)
+        .order_by(ScanResultGrant.sort_order)
+        .all()
+    )
+    return [
+        StoredMatch(
+            grant_id,
+            float(score) if score is not None else None,
+            match_type,
+            notes or None,  # Packed scans don't distinguish "" from no note
+            sort_order,
+        )
+        for grant_id, score, match_type, notes, sort_order in rows
+    ]
+
+
+def latest_unchanged_scan(
+    db: Session,
+    user_id: uuid.UUID,
+    profile_id: uuid.UUID,
+    profile_digest: str,
+    catalogue_version: str,
+) -> Optional[ScanResult]:
+    """The user's latest scan if it was computed from the same profile and catalogue."""
+    latest = (
+        db.query(ScanResult)
+        .filter(ScanResult.user_id == user_id)
+        .order_by(ScanResult.created_at.desc())
+        .first()
+    )
+    if (
+        latest is not None
+        and latest.profile_id == profile_id
+        and latest.profile_hash == profile_digest
+        and latest.catalogue_version == catalogue_version
+    ):
+        return latest
+    return None
+
+
+def stored_results(
+    db: Session, scan: ScanResult, catalogue: CatalogueSnapshot, skip_missing: bool = False
+) -> Optional[list[MatchResult]]:
+    """Rebuild a scan's ``MatchResult`` list from the catalogue snapshot.
+
+    Returns None if any matched grant is no longer in the catalogue, in
+    which case the scan should be recomputed, unless ``skip_missing`` is
+    set, in which case those matches are left out.
+    """
+    results = []
+    for m in load_matches(db, scan):
+        g = catalogue.by_id.get(str(m.grant_id))
+        if g is None:
+            if skip_missing:
+                continue
+            return None
+        results.append(MatchResult(
+            grant_id=g["id"],
+            grant_name=g["name"],
+            match_type=MatchType(m.match_type),
+            match_score=m.match_score or 0,
+            max_amount=g["max_amount"],
+            amount_description=g["amount_description"],
+            category=g["category"],
+            source_organisation=g["source_organisation"],
+            source_url=g["source_url"],
+            application_url=g["application_url"],
+            short_description=g["short_description"],
+            slug=g["slug"],
+            notes=m.notes or "",
+        ))
+    return results
+
+
+# ── History ──────────────────────────────────────────────────────────────────
+
+
+class HistoryEntry(NamedTuple):
+    id: uuid.UUID
+    created_at: datetime
+    total_grants: int
+    total_value: Optional[float]
+    grants_delta: Optional[int]  # Change since the scan before it; None for the first scan
+
+
+def encode_cursor(created_at: datetime, scan_id: uuid.UUID) -> str:
+    raw = f"{created_at.isoformat()}|{scan_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Raises ValueError for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, scan_id = raw.split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(scan_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def history_page(
+    db: Session, user_id: uuid.UUID, limit: int, cursor: Optional[str] = None
+) -> tuple[list[HistoryEntry], Optional[str]]:
+    """One page of the user's scans, newest first, and the cursor for the next.
+
+    Seeks on ``(user_id, created_at, id)`` past ``cursor`` and reads only
+    columns in ``ix_scan_results_user_history``, so a page costs the same
+    however long the history is. One extra row is fetched: it tells whether
+    there's a next page and gives the last entry's delta.
+    """
+    query = (
+        db.query(ScanResult.id, ScanResult.created_at, ScanResult.total_grants, ScanResult.total_value)
+        .filter(ScanResult.user_id == user_id)
+    )
+    if cursor is not None:
+        created_at, scan_id = decode_cursor(cursor)
+        query = query.filter(tuple_(ScanResult.created_at, ScanResult.id) < (created_at, scan_id))
+    rows = (
+        query.order_by(ScanResult.created_at.desc(), ScanResult.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    entries = [
+        HistoryEntry(
+            id=row.id,
+            created_at=row.created_at,
+            total_grants=row.total_grants,
+            total_value=float(row.total_value) if row.total_value is not None else None,
+            grants_delta=row.total_grants - rows[i + 1].total_grants if i + 1 < len(rows) else None,
+        )
+        for i, row in enumerate(rows[:limit])
+    ]
+    next_cursor = None
+    if len(rows) > limit:
+        last = entries[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return entries, next_cursor
+
+
+# ── Latest scan per user ─────────────────────────────────────────────────────
+#
+# Updated whenever a scan is saved or reused and on every full /scan/results
+# read, so a conditional request can be answered without a query.
+
+# user id -> (scan id, whether its summary is stored)
+_latest_scans: TTLCache[tuple[uuid.UUID, bool]] = TTLCache(
+    maxsize=_settings.LATEST_SCAN_CACHE_ENTRIES, ttl=_settings.LATEST_SCAN_CACHE_TTL_SECONDS
+)
+
+
+def remember_latest_scan(user_id: uuid.UUID, scan_id: uuid.UUID, has_summary: bool) -> None:
+    _latest_scans.set(user_id, (scan_id, has_summary))
+
+
+def cached_latest_scan(user_id: uuid.UUID) -> Optional[tuple[uuid.UUID, bool]]:
+    return _latest_scans.get(user_id)
+
+
+def summary_stored(user_id: uuid.UUID, scan_id: uuid.UUID) -> None:
+    """Record that ``scan_id`` now has its summary, if it's the user's cached latest."""
+    cached = _latest_scans.get(user_id)
+    if cached is not None and cached[0] == scan_id:
+        _latest_scans.set(user_id, (scan_id, True))
+
+
+def forget_latest_scan(user_id: uuid.UUID) -> None:
+    _latest_scans.pop(user_id)
+
+
+# ── Backfill ─────────────────────────────────────────────────────────────────
+
+
+def backfill_packed(db: Session, batch_size: int = 500) -> dict[str, int]:
+    """Pack row-stored scans into ``packed_matches`` and delete their rows.
+
+    Works in batches, committing after each, so it can be stopped and
+    re-run at any point.
+    """
+    scans = rows = 0
+    while True:
+        batch = (
+            db.query(ScanResult)
+            .filter(ScanResult.packed_matches.is_(None))
+            .order_by(ScanResult.created_at)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        ids = []
+        for scan in batch:
+            matches = load_matches(db, scan)
+            scan.packed_matches = pack_matches(matches)
+            rows += len(matches)
+            ids.append(scan.id)
+        db.query(ScanResultGrant).filter(
+            ScanResultGrant.scan_result_id.in_(ids)
+        ).delete(synchronize_session=False)
+        db.commit()
+        scans += len(batch)
+    return {"scans": scans, "rows_packed": rows}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backfill", action="store_true", help="Pack row-stored scans into packed_matches")
+    parser.add_argument("--batch-size", type=int, default=500, help="Scans per transaction")
+    args = parser.parse_args(argv)
+    if not args.backfill:
+        parser.error("nothing to do (pass --backfill)")
+
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        stats = backfill_packed(db, args.batch_size)
+    finally:
+        db.close()
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+Pre-generated AI summaries for common scan profile archetypes.
+
+Most scans fall into a few hundred archetypes: the same coarse profile
+(age band, household, employment, housing, ...) matching the same grants
+with the same savings. A batch job clusters recent scan inputs by that
+archetype key, generates one summary per popular archetype with bounded
+concurrency, and stores it against the catalogue version. Scans whose key
+matches get the personalised summary straight from memory.
+
+Run the batch job with::
+
+    python -m app.engine.summary_archetypes --days 30 --top 300
+
+Set ``AI_BACKEND=fake`` to exercise it without an API key.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from sqlalchemy.orm import Session
+
+from app.ai.client import ai_available
+from app.engine.ai_summary import build_summary_prompt, request_summary
+from app.engine.catalogue import CatalogueSnapshot, get_catalogue
+from app.engine.matcher import GrantMatcher
+from app.engine.savings import calculate_savings
+from app.models.profile import UserProfile
+from app.models.scan_result import ScanResult
+from app.models.summary_archetype import SummaryArchetype
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+RELOAD_CHECK_INTERVAL = 60.0  # Seconds between checks for a newer batch run
+
+# Profile fields copied into the archetype as-is (everything else that
+# ``_describe_profile`` prints, apart from age and county, which are coarsened)
+ARCHETYPE_FIELDS = (
+    "marital_status",
+    "employment_status",
+    "income_bracket",
+    "home_status",
+    "has_children",
+    "is_carer",
+    "has_dependent_relatives",
+    "works_from_home",
+    "has_medical_expenses",
+    "has_mortgage",
+    "has_nursing_home_expenses",
+    "is_student",
+)
+
+AGE_BANDS = ((0, 24), (25, 34), (35, 44), (45, 54), (55, 65), (66, 74), (75, 200))
+MAX_CHILDREN = 4  # Larger families share the "4+" archetype
+
+
+def _age_band(age: Any) -> Optional[str]:
+    if age is None:
+        return None
+    for low, high in AGE_BANDS:
+        if low <= int(age) <= high:
+            return f"{low}-{high}" if high < 200 else f"{low}+"
+    return None
+
+
+def archetype_profile(profile: dict[str, Any]) -> dict[str, Any]:
+    """Coarse profile used both as the cluster key and to render the prompt.
+
+    County is dropped and age is banded, so the generated text never states
+    a detail that differs between members of the archetype.
+    """
+    coarse = {f: profile[f] for f in ARCHETYPE_FIELDS if profile.get(f)}
+    band = _age_band(profile.get("age"))
+    if band:
+        coarse["age"] = band
+    if profile.get("has_children") and profile.get("num_children"):
+        n = int(profile["num_children"])
+        coarse["num_children"] = f"{MAX_CHILDREN}+" if n >= MAX_CHILDREN else n
+    if profile.get("has_dependent_relatives"):
+        coarse["num_dependent_relatives"] = profile.get("num_dependent_relatives", 1)
+    return coarse
+
+
+def archetype_key(profile: dict[str, Any], matched_grants: list[dict]) -> str:
+    """Hash of the coarse profile and the parts of each match the summary uses.
+
+    ``matched_grants`` may be either the scan's or the report's grant dicts;
+    only ``name``, ``match_type``, ``max_amount`` and ``savings_note`` are
+    read, and their order doesn't matter.
+    """
+    grants = sorted(
+        (g["name"], g.get("match_type"), g.get("max_amount") or 0, g.get("savings_note") or "")
+        for g in matched_grants
+    )
+    payload = json.dumps([archetype_profile(profile), grants], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ── Lookup ───────────────────────────────────────────────────────────────────
+
+
+class _Store:
+    """Summaries for one catalogue version, reloaded from the DB periodically.
+
+    Reloads run on a background thread so request threads never query:
+    while one is in flight lookups keep using the copy already loaded, and
+    before the first load for a catalogue version they simply miss.
+    """
+
+    def __init__(self):
+        self.version: Optional[str] = None
+        self.summaries: dict[str, str] = {}
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+        self.pending: Optional[Future] = None
+        self._generation = 0  # Bumped by clear() so older reloads are dropped
+
+    def get(self, catalogue_version: str) -> dict[str, str]:
+        if self.version != catalogue_version:
+            self._reload(catalogue_version)
+            return {}
+        if time.monotonic() - self.checked_at >= RELOAD_CHECK_INTERVAL:
+            self._reload(catalogue_version)
+        return self.summaries
+
+    def _reload(self, catalogue_version: str) -> None:
+        with self.lock:
+            if self.pending is not None and not self.pending.done():
+                return
+            self.pending = _reloader.submit(self._load, catalogue_version, self._generation)
+
+    def _load(self, catalogue_version: str, generation: int) -> None:
+        summaries = _load_summaries(catalogue_version)
+        with self.lock:
+            if generation != self._generation:
+                return
+            # On a failed load keep serving what we had, and retry after the interval
+            if summaries is not None or self.version != catalogue_version:
+                self.summaries = summaries or {}
+                self.version = catalogue_version
+            self.checked_at = time.monotonic()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.version = None
+            self.summaries = {}
+            self.checked_at = 0.0
+            self.pending = None
+            self._generation += 1
+
+
+_reloader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="archetype-reload")
+_store = _Store()
+
+
+def _load_summaries(catalogue_version: str) -> Optional[dict[str, str]]:
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(SummaryArchetype.archetype_key, SummaryArchetype.summary)
+            .filter(SummaryArchetype.catalogue_version == catalogue_version)
+            .all()
+        )
+    except Exception as e:
+        logger.warning(f"Could not load summary archetypes: {e}")
+        return None
+    finally:
+        db.close()
+    return dict(rows)
+
+
+def lookup_summary(
+    catalogue_version: str, profile: dict[str, Any], matched_grants: list[dict]
+) -> Optional[str]:
+    """Return the pre-generated summary for this scan's archetype, if any."""
+    summaries = _store.get(catalogue_version)
+    if not summaries:
+        return None
+    text = summaries.get(archetype_key(profile, matched_grants))
+    metrics.incr("ai_summary.archetype.hits" if text else "ai_summary.archetype.misses")
+    return text
+
+
+def invalidate_summaries() -> None:
+    """Drop the loaded summaries; the next lookup misses and starts a reload."""
+    _store.clear()
+
+
+# ── Batch job ────────────────────────────────────────────────────────────────
+
+
+@dataclass
+class Archetype:
+    key: str
+    profile: dict[str, Any]  # Coarse profile used to render the prompt
+    matched_grants: list[dict]
+    total_value: float
+    scan_count: int
+
+
+def summary_inputs(
+    profile: dict[str, Any], catalogue: CatalogueSnapshot, matcher: GrantMatcher
+) -> tuple[list[dict], float]:
+    """Match ``profile`` and build the grant dicts a scan passes to the summary."""
+    income_bracket = profile.get("income_bracket")
+    grants = []
+    for r in matcher.match(profile, catalogue.grants):
+        savings = calculate_savings(
+            slug=r.slug,
+            max_amount=r.max_amount,
+            amount_description=r.amount_description or "",
+            income_bracket=income_bracket,
+            profile=profile,
+        )
+        grants.append({
+            "name": r.grant_name,
+            "match_type": r.match_type.value,
+            "max_amount": r.max_amount,
+            "amount_description": r.amount_description or "",
+            "category": r.category,
+            "savings_note": savings["savings_note"],
+        })
+    return grants, sum(g["max_amount"] or 0 for g in grants)
+
+
+def recent_scan_profiles(db: Session, days: int = 30, limit: int = 50_000) -> list[dict]:
+    """Profile dicts behind scans saved in the last ``days`` days (one per scan)."""
+    since = datetime.utcnow() - timedelta(days=days)
+    rows = (
+        db.query(UserProfile, ScanResult.id)
+        .join(ScanResult, ScanResult.profile_id == UserProfile.id)
+        .filter(ScanResult.created_at >= since)
+        .order_by(ScanResult.created_at.desc())
+        .limit(limit)
+        .all()
+    )
+    return [profile.to_dict() for profile, _ in rows]
+
+
+def cluster_profiles(
+    profiles: list[dict],
+    catalogue: CatalogueSnapshot,
+    top: int = 300,
+    min_count: int = 2,
+) -> list[Archetype]:
+    """Group profiles by archetype key; return the ``top`` most common clusters."""
+    matcher = GrantMatcher()
+    counts: Counter[str] = Counter()
+    examples: dict[str, Archetype] = {}
+    for profile in profiles:
+        grants, total_value = summary_inputs(profile, catalogue, matcher)
+        key = archetype_key(profile, grants)
+        counts[key] += 1
+        if key not in examples:
+            examples[key] = Archetype(key, archetype_profile(profile), grants, total_value, 0)
+
+    clusters = []
+    for key, count in counts.most_common(top):
+        if count < min_count:
+            break
+        examples[key].scan_count = count
+        clusters.append(examples[key])
+    return clusters
+
+
+def pregenerate(
+    db: Session,
+    days: int = 30,
+    top: int = 300,
+    min_count: int = 2,
+    concurrency: int = 4,
+    timeout: float = 60.0,
+) -> dict[str, int]:
+    """Generate and store summaries for the most common recent archetypes.
+
+    Archetypes already stored for the current catalogue version are skipped,
+    so re-running after a partial failure only fills the gaps.
+    """
+    if not ai_available():
+        raise RuntimeError("AI backend unavailable (set ANTHROPIC_API_KEY or AI_BACKEND=fake)")
+
+    catalogue = get_catalogue(db)
+    clusters = cluster_profiles(recent_scan_profiles(db, days), catalogue, top, min_count)
+    existing = {
+        k for (k,) in db.query(SummaryArchetype.archetype_key)
+        .filter(SummaryArchetype.catalogue_version == catalogue.version)
+    }
+    todo = [a for a in clusters if a.key not in existing]
+
+    def _generate(a: Archetype) -> Optional[str]:
+        prompt = build_summary_prompt(a.profile, a.matched_grants, a.total_value)
+        try:
+            return request_summary(prompt, timeout)
+        except Exception as e:
+            logger.warning(f"Archetype summary failed: {e}")
+            return None
+
+    # Bounded concurrency; results are written from this thread only
+    generated = failed = 0
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="archetype") as pool:
+        for archetype, text in zip(todo, pool.map(_generate, todo)):
+            if text is None:
+                failed += 1
+                continue
+            db.add(SummaryArchetype(
+                catalogue_version=catalogue.version,
+                archetype_key=archetype.key,
+                summary=text,
+                scan_count=archetype.scan_count,
+            ))
+            generated += 1
+    db.commit()
+    invalidate_summaries()
+
+    return {
+        "archetypes": len(clusters),
+        "existing": len(clusters) - len(todo),
+        "generated": generated,
+        "failed": failed,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=30, help="Look back this many days of scans")
+    parser.add_argument("--top", type=int, default=300, help="Maximum archetypes to generate")
+    parser.add_argument("--min-count", type=int, default=2, help="Skip archetypes seen fewer times")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel AI requests")
+    args = parser.parse_args(argv)
+
+    from app.database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        stats = pregenerate(
+            db,
+            days=args.days,
+            top=args.top,
+            min_count=args.min_count,
+            concurrency=args.concurrency,
+        )
+    finally:
+        db.close()
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
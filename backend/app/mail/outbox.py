@@ -0,0 +1,277 @@
+"""
+Outbound mail queue.
+
+Endpoints call ``enqueue_email``, which writes the message to the
+``email_outbox`` table and returns immediately. A background dispatcher
+thread drains due messages in batches through the configured provider:
+
+- sent messages are marked ``sent`` and their attachment is dropped;
+- transient failures are retried with exponential backoff
+  (``EMAIL_RETRY_BASE_SECONDS`` doubling up to ``EMAIL_RETRY_MAX_SECONDS``);
+- permanent failures (rejected address, bad request) and messages out of
+  attempts are marked ``failed`` with the provider's error.
+
+Each batch is claimed with a token, and only the rows whose claim succeeded
+are sent, so several dispatcher processes can share the table. Messages left
+``sending`` for longer than ``EMAIL_CLAIM_TIMEOUT_SECONDS`` (their dispatcher
+crashed) are requeued, on start and whenever the queue is idle.
+For local testing point ``SMTP_HOST`` at an SMTP sink, or ``RESEND_API_URL``
+at an HTTP one.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import secrets
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.mail.providers import MailProvider, OutgoingEmail, SendError, get_provider
+from app.models.email_outbox import EmailOutbox
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def backoff_seconds(attempts: int, base: float, cap: float) -> float:
+    """Delay before retry number ``attempts`` (1-based), with ±10% jitter."""
+    delay = min(base * 2 ** (attempts - 1), cap)
+    return delay * random.uniform(0.9, 1.1)
+
+
+def enqueue_email(
+    db: Session,
+    to_email: str,
+    subject: str,
+    html: str,
+    attachment_name: Optional[str] = None,
+    attachment: Optional[bytes] = None,
+    kind: str = "report",
+) -> EmailOutbox:
+    """Store a message for delivery and nudge the dispatcher."""
+    row = EmailOutbox(
+        kind=kind,
+        to_email=to_email,
+        subject=subject,
+        html=html,
+        attachment_name=attachment_name,
+        attachment=attachment,
+    )
+    db.add(row)
+    db.commit()
+    metrics.incr("mail.enqueued")
+    wake_dispatcher()
+    return row
+
+
+def outbox_stats(db: Session) -> dict:
+    """Message counts by status and the age of the oldest pending one."""
+    counts = dict(db.query(EmailOutbox.status, func.count()).group_by(EmailOutbox.status).all())
+    oldest = (
+        db.query(func.min(EmailOutbox.created_at))
+        .filter(EmailOutbox.status.in_(("pending", "sending")))
+        .scalar()
+    )
+    return {
+        "by_status": counts,
+        "oldest_pending_seconds": (datetime.utcnow() - oldest).total_seconds() if oldest else None,
+    }
+
+
+class MailDispatcher:
+    """Background thread sending due outbox messages in batches."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        provider_factory: Callable[[], Optional[MailProvider]] = get_provider,
+        batch_size: int = 50,
+        max_attempts: int = 6,
+        retry_base: float = 30.0,
+        retry_max: float = 3600.0,
+        interval: float = 5.0,
+        claim_timeout: float = 600.0,
+    ):
+        self.session_factory = session_factory
+        self.provider_factory = provider_factory
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.interval = interval
+        self.claim_timeout = claim_timeout
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.recover()
+        self._thread = threading.Thread(target=self._loop, name="mail-dispatcher", daemon=True)
+        self._thread.start()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def recover(self) -> int:
+        """Requeue messages claimed more than ``claim_timeout`` ago and never finished."""
+        stale = datetime.utcnow() - timedelta(seconds=self.claim_timeout)
+        db = self.session_factory()
+        try:
+            n = (
+                db.query(EmailOutbox)
+                .filter(
+                    EmailOutbox.status == "sending",
+                    or_(EmailOutbox.claimed_at.is_(None), EmailOutbox.claimed_at < stale),
+                )
+                .update({"status": "pending", "claim_token": None}, synchronize_session=False)
+            )
+            db.commit()
+        finally:
+            db.close()
+        if n:
+            logger.warning(f"Requeued {n} emails left mid-send")
+        return n
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()  # Before the query, so an enqueue during it isn't missed
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                logger.warning(f"Mail dispatch failed: {e}")
+                processed = 0
+            if processed < self.batch_size:
+                # Queue drained (or provider missing): sleep until woken or the
+                # next retry might be due
+                try:
+                    self.recover()
+                except Exception as e:
+                    logger.warning(f"Mail recovery failed: {e}")
+                self._wake.wait(self.interval)
+
+    def run_once(self) -> int:
+        """Send one batch of due messages; returns how many were attempted."""
+        provider = self.provider_factory()
+        if provider is None:
+            return 0
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            due_ids = [
+                row_id for (row_id,) in db.query(EmailOutbox.id)
+                .filter(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+                .order_by(EmailOutbox.next_attempt_at)
+                .limit(self.batch_size)
+            ]
+            if not due_ids:
+                return 0
+            # Another dispatcher may claim some of the same rows; only the
+            # ones this update actually moved to "sending" are ours
+            token = secrets.token_hex(16)
+            db.query(EmailOutbox).filter(
+                EmailOutbox.id.in_(due_ids), EmailOutbox.status == "pending"
+            ).update(
+                {"status": "sending", "claim_token": token, "claimed_at": now}, synchronize_session=False
+            )
+            db.commit()
+            due = (
+                db.query(EmailOutbox)
+                .filter(EmailOutbox.claim_token == token, EmailOutbox.status == "sending")
+                .order_by(EmailOutbox.next_attempt_at)
+                .all()
+            )
+            if not due:
+                metrics.incr("mail.claims_lost")
+                return 0
+            messages = [
+                OutgoingEmail(str(r.id), r.to_email, r.subject, r.html, r.attachment_name, r.attachment)
+                for r in due
+            ]
+
+            try:
+                results = provider.send(messages)
+            except Exception as e:
+                results = [SendError(f"{type(e).__name__}: {e}")] * len(messages)
+            metrics.incr("mail.batches")
+
+            finished_at = datetime.utcnow()
+            for row, error in zip(due, results):
+                # A send slower than claim_timeout may have been requeued and
+                # claimed by another dispatcher; its state wins over ours
+                written = db.query(EmailOutbox).filter(
+                    EmailOutbox.id == row.id, EmailOutbox.claim_token == token
+                ).update(self._record(row, error, finished_at), synchronize_session=False)
+                if not written:
+                    metrics.incr("mail.claims_lost")
+                    logger.warning(f"Email {row.id} was reclaimed while sending; its result was not recorded")
+            db.commit()
+            return len(due)
+        finally:
+            db.close()
+
+    def _record(self, row: EmailOutbox, error: Optional[SendError], now: datetime) -> dict:
+        """Column values for ``row`` after this attempt."""
+        attempts = (row.attempts or 0) + 1
+        values = {"attempts": attempts, "claim_token": None}
+        if error is None:
+            metrics.incr("mail.sent")
+            metrics.observe("mail.delivery_ms", (now - row.created_at).total_seconds() * 1000)
+            return {**values, "status": "sent", "sent_at": now, "attachment": None, "last_error": None}
+        values["last_error"] = error.message[:2000]
+        if not error.retryable or attempts >= self.max_attempts:
+            metrics.incr("mail.failed")
+            logger.warning(f"Email {row.id} to {row.to_email} failed after {attempts} attempts: {error.message}")
+            return {**values, "status": "failed"}
+        metrics.incr("mail.retried")
+        return {
+            **values,
+            "status": "pending",
+            "next_attempt_at": now + timedelta(seconds=backoff_seconds(attempts, self.retry_base, self.retry_max)),
+        }
+
+
+_dispatcher: Optional[MailDispatcher] = None
+
+
+def start_mail_dispatcher() -> MailDispatcher:
+    """Start the process-wide dispatcher from settings (idempotent)."""
+    global _dispatcher
+    if _dispatcher is None:
+        from app.config import get_settings
+        from app.database import SessionLocal
+
+        settings = get_settings()
+        _dispatcher = MailDispatcher(
+            SessionLocal,
+            batch_size=settings.EMAIL_BATCH_SIZE,
+            max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+            retry_base=settings.EMAIL_RETRY_BASE_SECONDS,
+            retry_max=settings.EMAIL_RETRY_MAX_SECONDS,
+            interval=settings.EMAIL_DISPATCH_INTERVAL_SECONDS,
+            claim_timeout=settings.EMAIL_CLAIM_TIMEOUT_SECONDS,
+        )
+        _dispatcher.start()
+    return _dispatcher
+
+
+def wake_dispatcher() -> None:
+    if _dispatcher is not None:
+        _dispatcher.wake()
+
+
+def shutdown_mail_dispatcher() -> None:
+    global _dispatcher
+    if _dispatcher is not None:
+        _dispatcher.stop()
+        _dispatcher = None
@@ -0,0 +1,223 @@
+"""
+Email provider backends used by the outbox dispatcher.
+
+Each provider takes a batch of messages and reports a result per message,
+so one bad address doesn't fail its neighbours. Resend's batch endpoint is
+used for messages without attachments (it doesn't accept them); everything
+else is sent one message at a time.
+"""
+
+from __future__ import annotations
+
+import base64
+import logging
+import smtplib
+from dataclasses import dataclass
+from email.message import EmailMessage
+from typing import Optional
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+RESEND_BATCH_LIMIT = 100  # Messages per /emails/batch call
+
+
+@dataclass
+class OutgoingEmail:
+    id: str
+    to: str
+    subject: str
+    html: str
+    attachment_name: Optional[str] = None
+    attachment: Optional[bytes] = None
+
+
+@dataclass
+class SendError:
+    message: str
+    retryable: bool = True
+
+
+def _send_error(e: Exception) -> SendError:
+    """Classify a provider exception; 4xx other than 408/429 won't succeed on retry."""
+    status = getattr(e, "status_code", None) or getattr(e, "code", None)
+    try:
+        status = int(status)
+    except (TypeError, ValueError):
+        status = None
+    permanent = isinstance(e, smtplib.SMTPRecipientsRefused) or (
+        status is not None and 400 <= status < 500 and status not in (408, 429)
+    )
+    return SendError(f"{type(e).__name__}: {e}", retryable=not permanent)
+
+
+class MailProvider:
+    name = "none"
+
+    def send(self, messages: list[OutgoingEmail]) -> list[Optional[SendError]]:
+        """Send ``messages``; returns None (sent) or a ``SendError`` for each."""
+        raise NotImplementedError
+
+
+class ResendProvider(MailProvider):
+    name = "resend"
+
+    def __init__(self, api_key: str, api_url: str, from_email: str, timeout: float):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.from_email = from_email
+        self.timeout = timeout
+
+    def _params(self, m: OutgoingEmail) -> dict:
+        params = {"from": self.from_email, "to": [m.to], "subject": m.subject, "html": m.html}
+        if m.attachment is not None:
+            params["attachments"] = [{
+                "filename": m.attachment_name or "attachment",
+                "content": base64.b64encode(m.attachment).decode("ascii"),
+            }]
+        return params
+
+    def send(self, messages: list[OutgoingEmail]) -> list[Optional[SendError]]:
+        import resend
+
+        resend.api_key = self.api_key
+        resend.api_url = self.api_url
+        resend.default_http_client = resend.RequestsClient(timeout=self.timeout)
+
+        results: dict[str, Optional[SendError]] = {}
+        plain = [m for m in messages if m.attachment is None]
+        for i in range(0, len(plain), RESEND_BATCH_LIMIT):
+            chunk = plain[i:i + RESEND_BATCH_LIMIT]
+            if len(chunk) == 1:
+                continue  # Sent singly below
+            try:
+                resend.Batch.send([self._params(m) for m in chunk])
+                results.update((m.id, None) for m in chunk)
+            except Exception as e:
+                # Strict batches are all-or-nothing
+                logger.warning(f"Resend batch of {len(chunk)} failed: {e}")
+                results.update((m.id, _send_error(e)) for m in chunk)
+
+        for m in messages:
+            if m.id in results:
+                continue
+            try:
+                resend.Emails.send(self._params(m))
+                results[m.id] = None
+            except Exception as e:
+                results[m.id] = _send_error(e)
+        return [results[m.id] for m in messages]
+
+
+class SendGridProvider(MailProvider):
+    name = "sendgrid"
+
+    def __init__(self, api_key: str, from_email: str, timeout: float):
+        self.api_key = api_key
+        self.from_email = from_email
+        self.timeout = timeout
+
+    def send(self, messages: list[OutgoingEmail]) -> list[Optional[SendError]]:
+        from sendgrid import SendGridAPIClient
+        from sendgrid.helpers.mail import (
+            Mail, Attachment, FileContent, FileName, FileType, Disposition
+        )
+
+        sg = SendGridAPIClient(self.api_key)
+        sg.client.timeout = self.timeout
+        results: list[Optional[SendError]] = []
+        for m in messages:
+            message = Mail(
+                from_email=self.from_email,
+                to_emails=m.to,
+                subject=m.subject,
+                html_content=m.html,
+            )
+            if m.attachment is not None:
+                message.attachment = Attachment(
+                    FileContent(base64.b64encode(m.attachment).decode("ascii")),
+                    FileName(m.attachment_name or "attachment"),
+                    FileType("application/pdf"),
+                    Disposition("attachment"),
+                )
+            try:
+                sg.send(message)
+                results.append(None)
+            except Exception as e:
+                results.append(_send_error(e))
+        return results
+
+
+class SMTPProvider(MailProvider):
+    """Plain SMTP over one connection per batch — also what local sinks speak."""
+
+    name = "smtp"
+
+    def __init__(self, host: str, port: int, from_email: str, timeout: float,
+                 username: str = "", password: str = ""):
+        self.host = host
+        self.port = port
+        self.from_email = from_email
+        self.timeout = timeout
+        self.username = username
+        self.password = password
+
+    def _message(self, m: OutgoingEmail) -> EmailMessage:
+        msg = EmailMessage()
+        msg["From"] = self.from_email
+        msg["To"] = m.to
+        msg["Subject"] = m.subject
+        msg.set_content("This email is best viewed in an HTML-capable client.")
+        msg.add_alternative(m.html, subtype="html")
+        if m.attachment is not None:
+            msg.add_attachment(
+                m.attachment, maintype="application", subtype="pdf",
+                filename=m.attachment_name or "attachment",
+            )
+        return msg
+
+    def send(self, messages: list[OutgoingEmail]) -> list[Optional[SendError]]:
+        try:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        except Exception as e:
+            return [_send_error(e)] * len(messages)
+        results: list[Optional[SendError]] = []
+        with smtp:
+            if self.username:
+                try:
+                    smtp.starttls()
+                    smtp.login(self.username, self.password)
+                except Exception as e:
+                    return [_send_error(e)] * len(messages)
+            for m in messages:
+                try:
+                    smtp.send_message(self._message(m))
+                    results.append(None)
+                except Exception as e:
+                    results.append(_send_error(e))
+        return results
+
+
+def get_provider() -> Optional[MailProvider]:
+    """The configured provider (Resend, then SendGrid, then SMTP), or None."""
+    settings = get_settings()
+    if settings.RESEND_API_KEY:
+        return ResendProvider(
+            settings.RESEND_API_KEY,
+            settings.RESEND_API_URL,
+            "GrantFinder <reports@grantfinder.ie>",
+            settings.EMAIL_TIMEOUT_SECONDS,
+        )
+    if settings.SENDGRID_API_KEY:
+        return SendGridProvider(settings.SENDGRID_API_KEY, settings.FROM_EMAIL, settings.EMAIL_TIMEOUT_SECONDS)
+    if settings.SMTP_HOST:
+        return SMTPProvider(
+            settings.SMTP_HOST,
+            settings.SMTP_PORT,
+            settings.FROM_EMAIL,
+            settings.EMAIL_TIMEOUT_SECONDS,
+            settings.SMTP_USERNAME,
+            settings.SMTP_PASSWORD,
+        )
+    return None
@@ -1,12 +1,14 @@
 """FastAPI application entry point for GrantFinder Ireland."""
 
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.config import get_settings
 from app.database import engine, Base
 from app.api import auth, profile, grants, scan, reports, payments, alerts, chat, admin
+from app.utils.deadline import DeadlineExceeded
 
 settings = get_settings()
 
@@ -24,7 +26,14 @@ async def lifespan(app: FastAPI):
         seed_grants(db)
     finally:
         db.close()
+    # Deliver queued emails in the background
+    from app.mail.outbox import start_mail_dispatcher, shutdown_mail_dispatcher
+    start_mail_dispatcher()
     yield
+    shutdown_mail_dispatcher()
+    # Stop PDF render worker processes
+    from app.reports.render_pool import shutdown_render_pool
+    shutdown_render_pool()
 
 
 app = FastAPI(
@@ -45,6 +54,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "The server is busy and couldn't finish in time. Please try again."},
+        headers={"Retry-After": "5"},
+    )
+
+
 # Register routers
 app.include_router(auth.router)
 app.include_router(profile.router)
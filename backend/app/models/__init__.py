@@ -7,6 +7,8 @@ from app.models.eligibility_rule import EligibilityRule
 from app.models.scan_result import ScanResult, ScanResultGrant
 from app.models.alert import GrantAlert
 from app.models.audit import GrantAuditLog
+from app.models.summary_archetype import SummaryArchetype
+from app.models.email_outbox import EmailOutbox
 
 __all__ = [
     "User",
@@ -19,4 +21,6 @@ __all__ = [
     "ScanResultGrant",
     "GrantAlert",
     "GrantAuditLog",
+    "SummaryArchetype",
+    "EmailOutbox",
 ]
@@ -1,7 +1,8 @@
 """EligibilityRule model — conditions that determine grant eligibility."""
 
 import uuid
-from sqlalchemy import String, Integer, Boolean, Text, ForeignKey
+from datetime import datetime
+from sqlalchemy import String, Integer, Boolean, Text, ForeignKey, DateTime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
@@ -23,6 +24,9 @@ class EligibilityRule(Base):
     description: Mapped[str | None] = mapped_column(Text)
     is_mandatory: Mapped[bool] = mapped_column(Boolean, default=True)
     sort_order: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
 
     # Relationship
     grant: Mapped["Grant"] = relationship(back_populates="eligibility_rules")  # noqa: F821
@@ -0,0 +1,33 @@
+"""EmailOutbox model — outbound emails waiting for (or done with) delivery."""
+
+import uuid
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, Integer, Text, DateTime, LargeBinary, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_due", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    kind: Mapped[str] = mapped_column(String(20), default="report")  # report, alert
+    to_email: Mapped[str] = mapped_column(String(255), nullable=False)
+    subject: Mapped[str] = mapped_column(String(500), nullable=False)
+    html: Mapped[str] = mapped_column(Text, nullable=False)
+    attachment_name: Mapped[Optional[str]] = mapped_column(String(255))
+    attachment: Mapped[Optional[bytes]] = mapped_column(LargeBinary)  # Raw bytes; cleared once sent
+    status: Mapped[str] = mapped_column(
+        String(20), default="pending"
+    )  # pending, sending, sent, failed
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+    claim_token: Mapped[Optional[str]] = mapped_column(String(32))  # Dispatcher run that is sending it
+    claimed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
@@ -2,17 +2,26 @@
 
 import uuid
 from datetime import datetime
-from sqlalchemy import String, Integer, Numeric, Text, DateTime, ForeignKey
+from sqlalchemy import String, Integer, Numeric, Text, DateTime, ForeignKey, Index, LargeBinary
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
 
 class ScanResult(Base):
     __tablename__ = "scan_results"
+    __table_args__ = (
+        # History pages seek on (user_id, created_at, id); the totals make it
+        # covering for them (as key columns: SQLite has no INCLUDE). Also
+        # serves every other lookup by user_id.
+        Index(
+            "ix_scan_results_user_history",
+            "user_id", "created_at", "id", "total_grants", "total_value",
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("users.id", ondelete="CASCADE"), index=True
+        ForeignKey("users.id", ondelete="CASCADE")
     )
     profile_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("user_profiles.id")
@@ -21,6 +30,13 @@ class ScanResult(Base):
     total_value: Mapped[float | None] = mapped_column(Numeric(12, 2))
     report_url: Mapped[str | None] = mapped_column(Text)
     summary: Mapped[str | None] = mapped_column(Text)
+    # What the scan was computed from; a repeat scan with both unchanged
+    # returns this one instead of saving a copy
+    profile_hash: Mapped[str | None] = mapped_column(String(64))
+    catalogue_version: Mapped[str | None] = mapped_column(String(32))
+    # Ranked matches packed by app.engine.scan_store when SCAN_RESULT_STORAGE
+    # is "packed"; those scans have no scan_result_grants rows
+    packed_matches: Mapped[bytes | None] = mapped_column(LargeBinary)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     # Relationships
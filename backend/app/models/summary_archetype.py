@@ -0,0 +1,21 @@
+"""SummaryArchetype model — pre-generated AI summaries for common scan profiles."""
+
+import uuid
+from datetime import datetime
+from sqlalchemy import String, Integer, Text, DateTime, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+
+class SummaryArchetype(Base):
+    __tablename__ = "summary_archetypes"
+    __table_args__ = (
+        UniqueConstraint("catalogue_version", "archetype_key", name="uq_summary_archetype"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    catalogue_version: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
+    archetype_key: Mapped[str] = mapped_column(String(64), nullable=False)
+    summary: Mapped[str] = mapped_column(Text, nullable=False)
+    scan_count: Mapped[int] = mapped_column(Integer, default=0)  # Scans in the cluster
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
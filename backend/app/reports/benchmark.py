@@ -0,0 +1,130 @@
+"""
+Benchmark the PDF renderers on synthetic reports.
+
+Builds reports of 10, 50 and 200 grants from the seed catalogue (cycled
+with numbered names past its size, so every card is distinct) and times
+each renderer end to end — HTML + layout for WeasyPrint, drawing for the
+ReportLab fast path::
+
+    python -m app.reports.benchmark --sizes 10 50 200 --repeat 5
+
+Renderers whose libraries aren't available are reported as skipped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import time
+from typing import Callable, Optional
+
+from app.engine.how_to_claim import HOW_TO_CLAIM
+
+SEED_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "grants_seed.json"
+)
+
+SUMMARY = (
+    "Based on your profile you may qualify for a wide range of grants and tax credits.\n\n"
+    "Start with the backdated tax credits: they are refunds of tax you have already paid, "
+    "and can be claimed for the previous four years through Revenue myAccount.\n\n"
+    "The home energy grants need an application before any work starts, so check the "
+    "scheme rules and get quotes from registered contractors first."
+)
+
+
+def sample_grants(n: int) -> list[dict]:
+    """``n`` report grant dicts built from the seed catalogue."""
+    with open(SEED_FILE, "r") as f:
+        seed = json.load(f)
+    match_types = ("eligible", "likely", "possible")
+    grants = []
+    for i in range(n):
+        s = seed[i % len(seed)]
+        cycle = i // len(seed)
+        annual = float(s.get("max_amount") or 0) if s.get("category") == "tax_relief" else 0.0
+        grants.append({
+            "name": s["name"] if cycle == 0 else f"{s['name']} ({cycle + 1})",
+            "slug": s["slug"] if cycle == 0 else f"{s['slug']}-{cycle + 1}",
+            "category": s.get("category", "other"),
+            "match_type": match_types[i % 3],
+            "match_score": 100 - (i % 40),
+            "max_amount": s.get("max_amount"),
+            "amount_description": s.get("amount_description") or "",
+            "short_description": s.get("short_description"),
+            "source_url": s.get("source_url"),
+            "application_url": s.get("application_url"),
+            "notes": "Some rules may depend on details not in your profile." if i % 4 == 0 else "",
+            "estimated_annual_saving": annual or None,
+            "estimated_backdated_saving": annual * 4 or None,
+            "savings_note": f"Worth up to €{annual:,.0f} a year" if annual else "",
+            "how_to_claim": HOW_TO_CLAIM.get(s["slug"], ""),
+        })
+    return grants
+
+
+def _renderers() -> dict[str, Callable[..., bytes]]:
+    from app.reports.generator import render_report_html
+
+    def weasyprint(**kwargs) -> bytes:
+        from weasyprint import HTML
+
+        return HTML(string=render_report_html(**kwargs)).write_pdf()
+
+    def fast(**kwargs) -> bytes:
+        from app.reports.fast_renderer import generate_report_bytes_fast
+
+        return generate_report_bytes_fast(**kwargs)
+
+    return {"weasyprint": weasyprint, "fast": fast}
+
+
+def run(sizes: list[int], repeat: int = 3, renderers: Optional[list[str]] = None) -> list[dict]:
+    """Median wall time and output size for each renderer and report size."""
+    available = _renderers()
+    rows = []
+    for name in renderers or list(available):
+        render = available[name]
+        for n in sizes:
+            kwargs = dict(matched_grants=sample_grants(n), user_label="bench@example.com", ai_summary=SUMMARY)
+            try:
+                render(**kwargs)  # Warm-up: imports, font loading, template compilation
+            except (ImportError, OSError) as e:
+                rows.append({"renderer": name, "grants": n, "skipped": f"{type(e).__name__}: {e}"})
+                continue
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                pdf = render(**kwargs)
+                timings.append((time.perf_counter() - start) * 1000)
+            rows.append({
+                "renderer": name,
+                "grants": n,
+                "median_ms": round(statistics.median(timings), 1),
+                "min_ms": round(min(timings), 1),
+                "pdf_kb": round(len(pdf) / 1024, 1),
+            })
+    return rows
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200], help="Grants per report")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed renders per size")
+    parser.add_argument("--renderer", action="append", choices=["weasyprint", "fast"], help="Limit to these")
+    args = parser.parse_args(argv)
+
+    for row in run(args.sizes, args.repeat, args.renderer):
+        if "skipped" in row:
+            print(f"{row['renderer']:>10}  {row['grants']:>4} grants  skipped ({row['skipped']})")
+        else:
+            print(
+                f"{row['renderer']:>10}  {row['grants']:>4} grants  "
+                f"median {row['median_ms']:>8.1f} ms  min {row['min_ms']:>8.1f} ms  {row['pdf_kb']:>7.1f} KB"
+            )
+
+
+if __name__ == "__main__":
+    main()
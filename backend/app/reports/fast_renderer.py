@@ -0,0 +1,552 @@
+"""
+Fast-path PDF renderer drawing the report directly with ReportLab.
+
+The report is a fixed layout — cover page, executive summary, backdated
+claims table, grant cards by category, claim instructions and next steps —
+so instead of laying out HTML/CSS with WeasyPrint this module draws the same
+sections straight onto a ReportLab canvas with the standard Helvetica fonts.
+The document mirrors ``templates/grant_report.html`` (colours, sizes, section
+order); it doesn't share the templates, so changes to one should be made to
+both.
+
+Select it with ``REPORT_RENDERER=fast`` or ``"renderer": "fast"`` on a report
+request. Compare the two with ``python -m app.reports.benchmark``.
+"""
+
+from __future__ import annotations
+
+import io
+from datetime import datetime
+from typing import Optional
+
+from reportlab.lib.colors import HexColor
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
+
+from app.utils.validators import GRANT_CATEGORIES
+
+PAGE_WIDTH, PAGE_HEIGHT = A4
+MARGIN = 2 * cm
+CONTENT_WIDTH = PAGE_WIDTH - 2 * MARGIN
+
+REGULAR = "Helvetica"
+BOLD = "Helvetica-Bold"
+ITALIC = "Helvetica-Oblique"
+
+GREEN = HexColor("#16a34a")
+INK = HexColor("#1a1a2e")
+SLATE_700 = HexColor("#334155")
+SLATE_600 = HexColor("#475569")
+SLATE_500 = HexColor("#64748b")
+SLATE_400 = HexColor("#94a3b8")
+BORDER = HexColor("#e2e8f0")
+BLUE = HexColor("#1e40af")
+LINK = HexColor("#2563eb")
+AMBER_TEXT = HexColor("#92400e")
+AMBER_BORDER = HexColor("#f59e0b")
+AMBER_BG = HexColor("#fef3c7")
+SUMMARY_BG = HexColor("#f8fafc")
+STAT_BG = HexColor("#f0fdf4")
+STAT_BORDER = HexColor("#bbf7d0")
+STAT_AMBER_BG = HexColor("#fffbeb")
+STAT_AMBER_BORDER = HexColor("#fde68a")
+
+BADGES = {
+    "eligible": (HexColor("#dcfce7"), HexColor("#166534")),
+    "likely": (HexColor("#dbeafe"), HexColor("#1e40af")),
+}
+BADGE_DEFAULT = (AMBER_BG, AMBER_TEXT)
+
+NEXT_STEPS = [
+    ("Start with backdated claims", "these are refunds for money you've already overpaid in tax"),
+    ("Claim your tax credits", "log in to Revenue myAccount and follow the instructions above"),
+    ("Apply for grants", "use the application links provided for each grant"),
+    ("Keep receipts", "retain all medical, rent, and expense receipts for 6 years"),
+    ("Review annually", "run a new scan each year to catch new schemes and changes"),
+]
+
+DISCLAIMER = (
+    "Disclaimer: This report is for informational purposes only and does not constitute "
+    "financial, tax, or legal advice. Grant eligibility is determined by the issuing body and may be "
+    "subject to additional criteria not captured in this assessment. GrantFinder.ie is not affiliated "
+    "with any Irish government department or agency. We recommend verifying eligibility directly with "
+    "the relevant organisation before applying. Information is accurate as of {date}."
+)
+
+# The standard fonts only cover cp1252; map the few other characters our
+# content uses and let anything else degrade to "?"
+_SUBSTITUTES = str.maketrans({"→": "»", "≥": ">=", "≤": "<=", "✓": "-"})
+
+
+def _clean(text) -> str:
+    text = str(text or "").translate(_SUBSTITUTES)
+    return text.encode("cp1252", errors="replace").decode("cp1252")
+
+
+def _euro(value) -> str:
+    return f"€{value or 0:,.0f}"
+
+
+class _Page:
+    """Canvas plus a top-down cursor that starts a new page when content won't fit."""
+
+    def __init__(self, buf: io.BytesIO):
+        self.c = Canvas(buf, pagesize=A4, pageCompression=1)
+        self.c.setTitle("Your Personalised Grant Report — GrantFinder.ie")
+        self.c.setAuthor("GrantFinder.ie")
+        self.y = PAGE_HEIGHT - MARGIN
+        self.blank = True  # Nothing drawn on the current page yet
+
+    def new_page(self) -> None:
+        if not self.blank:
+            self.c.showPage()
+        self.y = PAGE_HEIGHT - MARGIN
+        self.blank = True
+
+    def ensure(self, height: float) -> None:
+        if self.y - height < MARGIN and not self.blank:
+            self.new_page()
+
+    def space(self, height: float) -> None:
+        self.y -= height
+
+    # ── Text ────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def wrap(text: str, font: str, size: float, width: float) -> list[str]:
+        lines: list[str] = []
+        for para in _clean(text).split("\n"):
+            lines.extend(simpleSplit(para, font, size, width) or [""])
+        return lines
+
+    def lines(
+        self,
+        lines: list[str],
+        font: str,
+        size: float,
+        color,
+        leading: Optional[float] = None,
+        x: float = MARGIN,
+        align: str = "left",
+        width: float = CONTENT_WIDTH,
+    ) -> None:
+        """Draw pre-wrapped lines, breaking pages between lines as needed."""
+        leading = leading or size * 1.4
+        self.c.setFont(font, size)
+        self.c.setFillColor(color)
+        for line in lines:
+            if self.y - leading < MARGIN:
+                self.new_page()
+                self.c.setFont(font, size)
+                self.c.setFillColor(color)
+            self.y -= leading
+            baseline = self.y + (leading - size) / 2 + size * 0.22
+            if align == "center":
+                self.c.drawCentredString(x + width / 2, baseline, line)
+            elif align == "right":
+                self.c.drawRightString(x + width, baseline, line)
+            else:
+                self.c.drawString(x, baseline, line)
+            self.blank = False
+
+    def text(
+        self,
+        text: str,
+        font: str = REGULAR,
+        size: float = 11,
+        color=INK,
+        leading: Optional[float] = None,
+        x: float = MARGIN,
+        width: float = CONTENT_WIDTH,
+        align: str = "left",
+    ) -> None:
+        self.lines(self.wrap(text, font, size, width), font, size, color, leading, x, align, width)
+
+    def rule(self, color=BORDER, weight: float = 1) -> None:
+        self.c.setStrokeColor(color)
+        self.c.setLineWidth(weight)
+        self.c.line(MARGIN, self.y, PAGE_WIDTH - MARGIN, self.y)
+
+    def section_title(self, title: str) -> None:
+        self.ensure(60)
+        self.space(12 if not self.blank else 0)
+        self.text(title, BOLD, 18, GREEN, leading=24)
+        self.space(6)
+        self.rule(weight=2)
+        self.space(10)
+
+    def subsection(self, title: str, color=SLATE_700, size: float = 14) -> None:
+        self.ensure(40)
+        self.space(10)
+        self.text(title, BOLD, size, color, leading=size * 1.3)
+        self.space(4)
+
+
+# ── Sections ─────────────────────────────────────────────────────────────────
+
+
+def _cover(p: _Page, ctx: dict) -> None:
+    p.space(80)
+    p.text("GrantFinder.ie", BOLD, 20, GREEN, align="center")
+    p.space(24)
+    p.text("Your Personalised Grant Report", BOLD, 28, GREEN, leading=34, align="center")
+    p.space(8)
+    p.text(
+        "A comprehensive guide to every grant, scheme, and tax credit you may qualify for in Ireland",
+        REGULAR, 13, SLATE_600, width=CONTENT_WIDTH - 80, x=MARGIN + 40, align="center",
+    )
+    p.space(36)
+    p.text("You could be entitled to up to", REGULAR, 12, SLATE_500, align="center")
+    p.space(10)
+    p.text(ctx["total_value"], BOLD, 40, GREEN, leading=48, align="center")
+    p.space(10)
+    p.text(f"across {ctx['total_grants']} grants and schemes", REGULAR, 12, SLATE_500, align="center")
+
+    if ctx["total_backdated"]:
+        box_width = 300
+        x = (PAGE_WIDTH - box_width) / 2
+        label = (
+            f"potentially owed from previous years "
+            f"({ctx['backdatable_count']} credits can be backdated)"
+        )
+        label_lines = p.wrap(label, REGULAR, 10, box_width - 40)
+        height = 16 + 14 + 30 + len(label_lines) * 14 + 16
+        p.space(30)
+        p.c.setFillColor(AMBER_BG)
+        p.c.setStrokeColor(AMBER_BORDER)
+        p.c.setLineWidth(2)
+        p.c.roundRect(x, p.y - height, box_width, height, 10, stroke=1, fill=1)
+        p.space(16)
+        p.lines(["BACKDATED CLAIMS OPPORTUNITY"], REGULAR, 10, AMBER_TEXT, 14, x, "center", box_width)
+        p.lines([ctx["total_backdated"]], BOLD, 22, AMBER_TEXT, 30, x, "center", box_width)
+        p.lines(label_lines, REGULAR, 10, AMBER_TEXT, 14, x, "center", box_width)
+        p.space(16)
+
+    p.space(30)
+    p.text(f"Prepared for: {ctx['user_label']}", REGULAR, 11, SLATE_500, align="center")
+    p.space(4)
+    p.text(f"Generated on {ctx['generated_date']}", REGULAR, 10, SLATE_400, align="center")
+    p.new_page()
+
+
+def _stats(p: _Page, ctx: dict) -> None:
+    boxes = [(str(ctx["total_grants"]), "GRANTS FOUND", False), (ctx["total_value"], "POTENTIAL VALUE", False)]
+    if ctx["total_annual_saving"]:
+        boxes.append((ctx["total_annual_saving"], "EST. ANNUAL SAVING", False))
+    if ctx["total_backdated"]:
+        boxes.append((ctx["total_backdated"], "BACKDATED CLAIMS", True))
+
+    gap, height = 12, 62
+    width = (CONTENT_WIDTH - gap * (len(boxes) - 1)) / len(boxes)
+    p.ensure(height + 24)
+    p.space(8)
+    top = p.y
+    for i, (number, label, amber) in enumerate(boxes):
+        x = MARGIN + i * (width + gap)
+        p.c.setFillColor(STAT_AMBER_BG if amber else STAT_BG)
+        p.c.setStrokeColor(STAT_AMBER_BORDER if amber else STAT_BORDER)
+        p.c.setLineWidth(1)
+        p.c.roundRect(x, top - height, width, height, 6, stroke=1, fill=1)
+        size = 22
+        while size > 10 and stringWidth(number, BOLD, size) > width - 12:
+            size -= 1
+        p.c.setFont(BOLD, size)
+        p.c.setFillColor(AMBER_TEXT if amber else GREEN)
+        p.c.drawCentredString(x + width / 2, top - 34, number)
+        p.c.setFont(REGULAR, 7.5)
+        p.c.setFillColor(SLATE_500)
+        p.c.drawCentredString(x + width / 2, top - 50, label)
+    p.blank = False
+    p.y = top - height - 16
+
+
+def _summary(p: _Page, ai_summary: str) -> None:
+    p.subsection("Your Personalised Analysis")
+    inset = 20
+    width = CONTENT_WIDTH - inset - 16
+    for paragraph in ai_summary.split("\n\n"):
+        lines = p.wrap(paragraph, REGULAR, 10.5, width)
+        leading = 10.5 * 1.7
+        # Shade and bar each paragraph as it is drawn, so long summaries can
+        # flow across pages
+        while lines:
+            p.ensure(leading)
+            fit = max(1, min(len(lines), int((p.y - MARGIN) // leading)))
+            chunk, lines = lines[:fit], lines[fit:]
+            height = len(chunk) * leading + 8
+            p.c.setFillColor(SUMMARY_BG)
+            p.c.rect(MARGIN, p.y - height, CONTENT_WIDTH, height, stroke=0, fill=1)
+            p.c.setFillColor(GREEN)
+            p.c.rect(MARGIN, p.y - height, 4, height, stroke=0, fill=1)
+            p.space(4)
+            p.lines(chunk, REGULAR, 10.5, SLATE_700, leading, MARGIN + inset, width=width)
+            p.space(4)
+    p.space(8)
+
+
+def _badge(p: _Page, x: float, baseline: float, match_type: str) -> float:
+    """Draw the match-type badge at ``x``; returns its width."""
+    label = _clean(match_type).upper()
+    bg, fg = BADGES.get(match_type, BADGE_DEFAULT)
+    width = stringWidth(label, BOLD, 7) + 10
+    p.c.setFillColor(bg)
+    p.c.roundRect(x, baseline - 2.5, width, 10.5, 3, stroke=0, fill=1)
+    p.c.setFillColor(fg)
+    p.c.setFont(BOLD, 7)
+    p.c.drawString(x + 5, baseline, label)
+    return width
+
+
+def _top_grants(p: _Page, grants: list[dict]) -> None:
+    p.subsection("Top Grants by Value")
+    for g in grants[:5]:
+        line = f"{_clean(g.get('name'))} — {_clean(g.get('amount_description') or 'Variable amount')}"
+        if g.get("savings_note"):
+            line += f" ({_clean(g['savings_note'])})"
+        lines = p.wrap(line, REGULAR, 10, CONTENT_WIDTH - 70)
+        p.lines(lines, REGULAR, 10, INK, 15)
+        last_width = stringWidth(lines[-1], REGULAR, 10)
+        _badge(p, MARGIN + last_width + 6, p.y + 4.5, g.get("match_type") or "")
+        p.space(2)
+
+
+def _backdated(p: _Page, ctx: dict, grants: list[dict]) -> None:
+    p.new_page()
+    p.section_title("Backdated Claims — Money You May Be Owed")
+    p.text(
+        "Many Irish tax credits can be claimed retrospectively for up to 4 previous years. "
+        "If you haven't been claiming these credits, you could be owed a significant refund. "
+        "Below is a summary of what you may be able to backdate.",
+        REGULAR, 10, SLATE_600,
+    )
+    p.space(12)
+
+    name_width = CONTENT_WIDTH * 0.55
+    annual_x = MARGIN + name_width + 10
+    row = 20
+
+    def header() -> None:
+        p.c.setFillColor(SUMMARY_BG)
+        p.c.rect(MARGIN, p.y - row - 4, CONTENT_WIDTH, row + 4, stroke=0, fill=1)
+        p.c.setFont(BOLD, 9.5)
+        p.c.setFillColor(SLATE_700)
+        baseline = p.y - row + 3
+        p.c.drawString(MARGIN + 10, baseline, "Tax Credit / Relief")
+        p.c.drawString(annual_x, baseline, "Annual Value")
+        p.c.drawRightString(PAGE_WIDTH - MARGIN - 10, baseline, "Backdated (est.)")
+        p.space(row + 4)
+        p.rule(weight=2)
+        p.blank = False
+
+    p.ensure(row * 3)
+    header()
+    for g in grants:
+        if not g.get("estimated_backdated_saving"):
+            continue
+        names = p.wrap(g.get("name"), REGULAR, 9.5, name_width - 10)
+        height = max(row, len(names) * 12 + 8)
+        if p.y - height < MARGIN:
+            p.new_page()
+            header()
+        top = p.y
+        p.c.setFont(REGULAR, 9.5)
+        p.c.setFillColor(SLATE_600)
+        for i, name in enumerate(names):
+            p.c.drawString(MARGIN + 10, top - 14 - i * 12, name)
+        p.c.drawString(annual_x, top - 14, f"€{g.get('estimated_annual_saving') or 0:.0f}")
+        p.c.setFont(BOLD, 9.5)
+        p.c.setFillColor(GREEN)
+        p.c.drawRightString(PAGE_WIDTH - MARGIN - 10, top - 14, f"€{g['estimated_backdated_saving']:.0f}")
+        p.y = top - height
+        p.rule(HexColor("#f1f5f9"))
+
+    p.ensure(row + 40)
+    p.rule(weight=2)
+    p.c.setFont(BOLD, 9.5)
+    p.c.setFillColor(INK)
+    p.c.drawString(MARGIN + 10, p.y - 14, "Total potential backdated refund")
+    p.c.setFillColor(GREEN)
+    p.c.drawRightString(PAGE_WIDTH - MARGIN - 10, p.y - 14, ctx["total_backdated"])
+    p.space(row + 8)
+    p.text(
+        "To claim backdated credits, log in to Revenue myAccount and submit an Income Tax Return "
+        "for each year you want to claim. Revenue will process refunds directly to your bank account.",
+        ITALIC, 9, SLATE_500,
+    )
+
+
+def _grant_card(p: _Page, g: dict) -> None:
+    pad = 12
+    inner = CONTENT_WIDTH - 2 * pad
+    amount = _clean(g.get("amount_description") or "Variable")
+    amount_width = min(stringWidth(amount, BOLD, 11.5), inner * 0.4)
+    amount_lines = p.wrap(amount, BOLD, 11.5, amount_width + 1)
+    name_lines = p.wrap(g.get("name"), BOLD, 11.5, inner - amount_width - 70)
+    desc = p.wrap(g.get("short_description"), REGULAR, 9.5, inner) if g.get("short_description") else []
+    savings = p.wrap(g["savings_note"], BOLD, 9.5, inner) if g.get("savings_note") else []
+    notes = p.wrap(g["notes"], ITALIC, 9, inner) if g.get("notes") else []
+    has_links = bool(g.get("source_url") or g.get("application_url"))
+
+    height = (
+        pad * 2
+        + max(len(name_lines), len(amount_lines)) * 15
+        + len(desc) * 13.5 + len(savings) * 13.5 + len(notes) * 12.5
+        + (14 if has_links else 0) + 4
+    )
+    p.ensure(height + 10)  # Cards never split across pages (unless taller than one)
+    top = p.y
+    p.c.setStrokeColor(BORDER)
+    p.c.setLineWidth(1)
+    p.c.roundRect(MARGIN, top - height, CONTENT_WIDTH, height, 6, stroke=1, fill=0)
+
+    x = MARGIN + pad
+    p.y = top - pad + 2
+    header_top = p.y
+    p.lines(name_lines, BOLD, 11.5, INK, 15, x, width=inner)
+    _badge(p, x + stringWidth(name_lines[-1], BOLD, 11.5) + 6, p.y + 4, g.get("match_type") or "")
+    p.y = header_top
+    p.lines(amount_lines, BOLD, 11.5, GREEN, 15, x, "right", inner)
+    p.y = header_top - max(len(name_lines), len(amount_lines)) * 15 - 4
+
+    if desc:
+        p.lines(desc, REGULAR, 9.5, SLATE_600, 13.5, x, width=inner)
+    if savings:
+        p.lines(savings, BOLD, 9.5, GREEN, 13.5, x, width=inner)
+    if notes:
+        p.lines(notes, ITALIC, 9, SLATE_500, 12.5, x, width=inner)
+    if has_links:
+        baseline = p.y - 11
+        p.c.setFont(REGULAR, 8.5)
+        p.c.setFillColor(LINK)
+        link_x = x
+        for label, url in (("Official information »", g.get("source_url")), ("Apply here »", g.get("application_url"))):
+            if not url:
+                continue
+            if link_x > x:
+                p.c.setFillColor(SLATE_400)
+                p.c.drawString(link_x, baseline, "|")
+                p.c.setFillColor(LINK)
+                link_x += 12
+            width = stringWidth(label, REGULAR, 8.5)
+            p.c.drawString(link_x, baseline, label)
+            p.c.linkURL(url, (link_x, baseline - 2, link_x + width, baseline + 9), relative=0)
+            link_x += width + 12
+    p.y = top - height - 10
+
+
+def _grant_details(p: _Page, grants: list[dict]) -> None:
+    p.new_page()
+    p.section_title("Detailed Grant Results")
+    labels = dict(GRANT_CATEGORIES)
+    by_category: dict[str, list[dict]] = {}
+    for g in grants:
+        by_category.setdefault(g.get("category", "other"), []).append(g)
+    for cat, cat_grants in by_category.items():
+        p.ensure(100)
+        p.space(8)
+        p.text(labels.get(cat, cat), BOLD, 15, BLUE, leading=20)
+        p.space(4)
+        p.rule()
+        p.space(10)
+        for g in cat_grants:
+            _grant_card(p, g)
+
+
+def _claim_card(p: _Page, g: dict) -> None:
+    inset = 16
+    inner = CONTENT_WIDTH - inset - 12
+    title = _clean(g.get("name"))
+    if g.get("estimated_annual_saving"):
+        title += f" — saves €{g['estimated_annual_saving']:.0f}/year"
+    title_lines = p.wrap(title, BOLD, 11, inner)
+    steps = p.wrap(g.get("how_to_claim"), REGULAR, 9.5, inner)
+    height = 24 + len(title_lines) * 14 + 6 + len(steps) * 15.2
+
+    p.ensure(height + 10)
+    top = p.y
+    p.c.setStrokeColor(BORDER)
+    p.c.setLineWidth(1)
+    p.c.roundRect(MARGIN, top - height, CONTENT_WIDTH, height, 6, stroke=1, fill=0)
+    p.c.setFillColor(GREEN)
+    p.c.rect(MARGIN, top - height, 4, height, stroke=0, fill=1)
+    p.y = top - 12
+    p.lines(title_lines, BOLD, 11, GREEN, 14, MARGIN + inset, width=inner)
+    p.space(6)
+    p.lines(steps, REGULAR, 9.5, SLATE_700, 15.2, MARGIN + inset, width=inner)
+    p.y = min(p.y, top - height) - 10
+
+
+def _claim_guide(p: _Page, claimable: list[dict]) -> None:
+    p.new_page()
+    p.section_title("How to Claim — Revenue myAccount Guide")
+    p.text(
+        "Below are step-by-step instructions for claiming each tax credit and relief on "
+        "Revenue myAccount (revenue.ie). Log in with your PPSN and password, "
+        "or register if you haven't already.",
+        REGULAR, 10, SLATE_600,
+    )
+    p.space(16)
+    for g in claimable:
+        _claim_card(p, g)
+
+
+def _footer(p: _Page, generated_date: str) -> None:
+    p.ensure(200)
+    p.space(20)
+    p.rule(weight=2)
+    p.space(16)
+    p.text("Recommended Next Steps", BOLD, 13, SLATE_700, leading=18)
+    p.space(6)
+    for i, (lead, rest) in enumerate(NEXT_STEPS, start=1):
+        p.text(f"{i}. {lead} — {rest}", REGULAR, 10, SLATE_600, leading=18, x=MARGIN + 10, width=CONTENT_WIDTH - 10)
+    p.space(14)
+    p.text(DISCLAIMER.format(date=generated_date), REGULAR, 8, SLATE_400, leading=11.2)
+
+
+def generate_report_bytes_fast(
+    matched_grants: list[dict],
+    user_label: str = "GrantFinder User",
+    ai_summary: str = "",
+    catalogue_version: Optional[str] = None,
+) -> bytes:
+    """Render the report PDF with ReportLab.
+
+    Takes the same arguments as ``generator.generate_report_bytes``;
+    ``catalogue_version`` is accepted for symmetry but unused, as drawing a
+    card is cheaper than caching it.
+    """
+    total_value = sum(g.get("max_amount") or 0 for g in matched_grants)
+    total_annual_saving = sum(g.get("estimated_annual_saving") or 0 for g in matched_grants)
+    total_backdated = sum(g.get("estimated_backdated_saving") or 0 for g in matched_grants)
+    generated_date = datetime.now().strftime("%d %B %Y")
+    ctx = {
+        "user_label": _clean(user_label),
+        "generated_date": generated_date,
+        "total_grants": len(matched_grants),
+        "total_value": _euro(total_value),
+        "total_annual_saving": _euro(total_annual_saving) if total_annual_saving else None,
+        "total_backdated": _euro(total_backdated) if total_backdated else None,
+        "backdatable_count": sum(1 for g in matched_grants if g.get("estimated_backdated_saving")),
+    }
+
+    buf = io.BytesIO()
+    p = _Page(buf)
+    _cover(p, ctx)
+    p.section_title("Executive Summary")
+    _stats(p, ctx)
+    if ai_summary:
+        _summary(p, ai_summary)
+    _top_grants(p, matched_grants)
+    if ctx["total_backdated"]:
+        _backdated(p, ctx, matched_grants)
+    _grant_details(p, matched_grants)
+    claimable = [g for g in matched_grants if g.get("how_to_claim")]
+    if claimable:
+        _claim_guide(p, claimable)
+    _footer(p, generated_date)
+    p.c.showPage()
+    p.c.save()
+    return buf.getvalue()
@@ -1,49 +1,78 @@
-"""PDF report generation using WeasyPrint + Jinja2 templates."""
+"""PDF report generation using WeasyPrint + Jinja2 templates.
+
+The Jinja environment is built once per process. Grant cards and claim
+cards are rendered from their own partial templates and cached per
+catalogue version, so a report only renders the per-user totals and
+summary and stitches in the cached fragments.
+"""
 
 import os
 from datetime import datetime
+from typing import Optional
 
 from jinja2 import Environment, FileSystemLoader
 
+from app.config import get_settings
+from app.utils import metrics
+from app.utils.ttl_cache import TTLCache
 from app.utils.validators import GRANT_CATEGORIES
 
 TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
 
+FRAGMENT_CACHE_SIZE = 4096
+FRAGMENT_CACHE_TTL = 24 * 3600.0  # Keys include the catalogue version; this just bounds staleness
 
-def generate_report_bytes(
-    matched_grants: list[dict],
-    user_label: str = "GrantFinder User",
-    ai_summary: str = "",
-) -> bytes:
-    """
-    Generate a PDF report and return it as bytes.
+# Templates are compiled on first use and kept for the life of the process
+_env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), auto_reload=False)
+_fragments: TTLCache[str] = TTLCache(maxsize=FRAGMENT_CACHE_SIZE, ttl=FRAGMENT_CACHE_TTL)
 
-    Parameters
-    ----------
-    matched_grants : list[dict]
-        Each dict should have: name, category, match_type, match_score,
-        max_amount, amount_description, short_description, source_url,
-        application_url, notes, slug, estimated_annual_saving,
-        estimated_backdated_saving, savings_note, how_to_claim.
-    user_label : str
-        Label to show on the cover page.
-    ai_summary : str
-        AI-generated personalised summary text.
 
-    Returns
-    -------
-    bytes
-        The PDF file content.
+def _fragment(template_name: str, g: dict, key: tuple, catalogue_version: Optional[str]) -> str:
+    """Render ``template_name`` for grant ``g``, cached on (version, slug, *key).
+
+    Everything the partial reads that isn't in ``key`` must be fixed for a
+    given slug and catalogue version.
     """
-    env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
-    template = env.get_template("grant_report.html")
+    template = _env.get_template(template_name)
+    slug = g.get("slug")
+    if catalogue_version is None or not slug:
+        return template.render(g=g)
+    cache_key = (template_name, catalogue_version, slug, *key)
+    html = _fragments.get(cache_key)
+    if html is None:
+        metrics.incr("report.fragments.misses")
+        html = template.render(g=g)
+        _fragments.set(cache_key, html)
+    else:
+        metrics.incr("report.fragments.hits")
+    return html
+
+
+def _grant_card(g: dict, catalogue_version: Optional[str]) -> str:
+    key = (g.get("match_type"), g.get("savings_note") or "", g.get("notes") or "")
+    return _fragment("_grant_card.html", g, key, catalogue_version)
+
+
+def _claim_card(g: dict, catalogue_version: Optional[str]) -> str:
+    key = (round(g.get("estimated_annual_saving") or 0),)
+    return _fragment("_claim_card.html", g, key, catalogue_version)
+
+
+def render_report_html(
+    matched_grants: list[dict],
+    user_label: str = "GrantFinder User",
+    ai_summary: str = "",
+    catalogue_version: Optional[str] = None,
+) -> str:
+    """Render the report HTML (see ``generate_report_bytes`` for the arguments)."""
+    template = _env.get_template("grant_report.html")
 
-    # Group grants by category
+    # Group grant cards by category
     category_map = dict(GRANT_CATEGORIES)
-    categories: dict[str, list] = {}
+    category_cards: dict[str, list[str]] = {}
     for g in matched_grants:
         cat = g.get("category", "other")
-        categories.setdefault(cat, []).append(g)
+        category_cards.setdefault(cat, []).append(_grant_card(g, catalogue_version))
 
     total_value = sum(g.get("max_amount") or 0 for g in matched_grants)
 
@@ -53,7 +82,7 @@ def generate_report_bytes(
     backdatable_grants = [g for g in matched_grants if g.get("estimated_backdated_saving")]
     claimable_grants = [g for g in matched_grants if g.get("how_to_claim")]
 
-    html_content = template.render(
+    return template.render(
         user_email=user_label,
         generated_date=datetime.now().strftime("%d %B %Y"),
         total_grants=len(matched_grants),
@@ -61,13 +90,55 @@ def generate_report_bytes(
         total_annual_saving=f"€{total_annual_saving:,.0f}" if total_annual_saving else None,
         total_backdated=f"€{total_backdated:,.0f}" if total_backdated else None,
         backdatable_count=len(backdatable_grants),
-        categories=categories,
+        category_cards=category_cards,
         category_labels=category_map,
         grants=matched_grants,
         ai_summary=ai_summary,
         claimable_grants=claimable_grants,
+        claim_cards=[_claim_card(g, catalogue_version) for g in claimable_grants],
     )
 
+
+def generate_report_bytes(
+    matched_grants: list[dict],
+    user_label: str = "GrantFinder User",
+    ai_summary: str = "",
+    catalogue_version: Optional[str] = None,
+    renderer: Optional[str] = None,
+) -> bytes:
+    """
+    Generate a PDF report and return it as bytes.
+
+    Parameters
+    ----------
+    matched_grants : list[dict]
+        Each dict should have: name, category, match_type, match_score,
+        max_amount, amount_description, short_description, source_url,
+        application_url, notes, slug, estimated_annual_saving,
+        estimated_backdated_saving, savings_note, how_to_claim.
+    user_label : str
+        Label to show on the cover page.
+    ai_summary : str
+        AI-generated personalised summary text.
+    catalogue_version : str, optional
+        Version of the catalogue the grants came from. When given, grant
+        fragments are served from the per-version cache.
+    renderer : str, optional
+        ``"weasyprint"`` or ``"fast"`` (see ``fast_renderer``); defaults to
+        the ``REPORT_RENDERER`` setting.
+
+    Returns
+    -------
+    bytes
+        The PDF file content.
+    """
+    if (renderer or get_settings().REPORT_RENDERER) == "fast":
+        from app.reports.fast_renderer import generate_report_bytes_fast
+
+        return generate_report_bytes_fast(matched_grants, user_label, ai_summary, catalogue_version)
+
+    html_content = render_report_html(matched_grants, user_label, ai_summary, catalogue_version)
+
     try:
         from weasyprint import HTML
         pdf_bytes = HTML(string=html_content).write_pdf()
@@ -0,0 +1,393 @@
+"""
+Out-of-process PDF rendering.
+
+WeasyPrint is CPU-bound, holds the GIL for the whole render and can grow a
+process by a hundred megabytes or more, so reports are rendered in a small
+pool of worker processes instead of the API process:
+
+- jobs wait in a queue in the API process and are handed to idle workers;
+- a worker exits after ``max_jobs`` renders, or as soon as its peak RSS
+  passes ``max_rss_mb``, and the pool starts a fresh one in its place;
+- a worker that dies mid-job (e.g. killed by the OOM killer) fails that job
+  instead of leaving it pending forever;
+- ``queue_depth`` (jobs submitted but not yet handed out) is reported in
+  ``stats`` and bounded by ``max_queue``.
+
+Jobs from ``submit`` keep their result in memory for ``result_ttl`` seconds
+so clients can poll the job id and download the PDF once it is ready.
+``render_sync`` jobs hand the bytes straight to the waiting caller and keep
+nothing; if the caller gives up, a job still queued is cancelled and one
+already rendering has its result discarded.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing as mp
+import secrets
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Optional
+
+from app.utils import metrics
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.5  # Seconds between liveness checks while idle
+
+
+class RenderQueueFull(Exception):
+    """Raised by ``submit`` when ``max_queue`` jobs are already waiting."""
+
+
+def _peak_rss_bytes() -> int:
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+
+def _worker_main(
+    render: Callable[..., bytes],
+    conn: Connection,
+    max_jobs: int,
+    max_rss_bytes: int,
+) -> None:
+    """Worker process loop: render jobs until told to stop or due for recycling."""
+    done = 0
+    while True:
+        task = conn.recv()
+        if task is None:
+            return
+        job_id, kwargs = task
+        try:
+            kind, payload = "done", render(**kwargs)
+        except Exception as e:
+            kind, payload = "failed", f"{type(e).__name__}: {e}"
+        done += 1
+        rss = _peak_rss_bytes()
+        # Decide before replying, so the pool never dispatches to a worker
+        # that is about to exit
+        retire = f"jobs={done} peak_rss_mb={rss // 2**20}" if done >= max_jobs or rss > max_rss_bytes else None
+        conn.send((kind, job_id, payload, retire))
+        if retire:
+            return
+
+
+@dataclass
+class _Worker:
+    proc: Any
+    conn: Connection
+    job_id: Optional[str] = None  # Job currently being rendered
+    started_at: float = 0.0
+    retiring: bool = False  # Said it will exit; replaced once it's gone
+
+
+class RenderPool:
+    """Fixed-size pool of render processes with a job-id API.
+
+    Jobs are dispatched by the parent over a pipe per worker, so the pool
+    always knows which job a worker holds — even if the worker is killed.
+    """
+
+    def __init__(
+        self,
+        render: Callable[..., bytes],
+        workers: int = 1,
+        max_jobs: int = 50,
+        max_rss_mb: int = 200,
+        max_queue: int = 20,
+        result_ttl: float = 600.0,
+        start_method: str = "spawn",
+    ):
+        self.render = render
+        self.size = workers
+        self.max_jobs = max_jobs
+        self.max_rss_bytes = max_rss_mb * 2**20
+        self.max_queue = max_queue
+        self._ctx = mp.get_context(start_method)
+        self._jobs: TTLCache[dict] = TTLCache(maxsize=1000, ttl=result_ttl)
+        self._futures: dict[str, Future] = {}
+        self._callbacks: dict[str, Callable[[bytes], None]] = {}
+        self._ready_callbacks: list[tuple[Callable[[bytes], None], bytes]] = []  # Run outside the lock
+        self._pending: deque[tuple[str, dict]] = deque()
+        self._workers: list[_Worker] = []
+        self._recycled = 0
+        self._lock = threading.RLock()
+        self._closed = False
+        for _ in range(workers):
+            self._spawn()
+        self._collector = threading.Thread(
+            target=self._collect, name="render-pool-collector", daemon=True
+        )
+        self._collector.start()
+
+    # ── Public API ──────────────────────────────────────────────────────────
+
+    def submit(self, on_done: Optional[Callable[[bytes], None]] = None, **kwargs: Any) -> str:
+        """Queue a render of ``render(**kwargs)``; returns the job id.
+
+        The job's status and result stay available for ``result_ttl`` seconds.
+        ``on_done`` is called with the bytes once the render succeeds, on the
+        pool's collector thread.
+        """
+        job_id, _ = self._submit(kwargs, keep=True)
+        if on_done is not None:
+            with self._lock:
+                self._callbacks[job_id] = on_done
+        return job_id
+
+    def completed(self, data: bytes) -> str:
+        """Register an already-rendered result as a done job; returns its id."""
+        job_id = secrets.token_urlsafe(16)
+        now = time.time()
+        self._jobs.set(job_id, {
+            "status": "done", "submitted_at": now, "finished_at": now, "result": data, "size": len(data),
+        })
+        metrics.incr("render_pool.precomputed")
+        return job_id
+
+    def status(self, job_id: str) -> Optional[dict]:
+        """``{"status": queued|running|done|failed, ...}`` without the PDF bytes."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        return {k: v for k, v in job.items() if k != "result"}
+
+    def result(self, job_id: str) -> Optional[bytes]:
+        """The rendered bytes once the job is done, else None."""
+        job = self._jobs.get(job_id)
+        return job.get("result") if job else None
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> bytes:
+        """Block until the job finishes; raises ``TimeoutError`` or ``RuntimeError``."""
+        future = self._futures.get(job_id)
+        if future is not None:
+            return future.result(timeout=timeout)
+        # Already finished (the future is dropped once it resolves)
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        if job["status"] == "failed":
+            raise RuntimeError(job.get("error", "Render failed"))
+        return job["result"]
+
+    def render_sync(self, timeout: Optional[float] = None, **kwargs: Any) -> bytes:
+        """Render and wait — for endpoints that return the PDF directly.
+
+        Nothing is kept once the bytes are returned. On ``TimeoutError`` the
+        job is cancelled if still queued, else its result is thrown away.
+        """
+        job_id, future = self._submit(kwargs, keep=False)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            self._abandon(job_id)
+            raise
+
+    @property
+    def queue_depth(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": len(self._workers),
+                "busy": sum(1 for w in self._workers if w.job_id is not None),
+                "queue_depth": len(self._pending),
+                "max_queue": self.max_queue,
+                "recycled": self._recycled,
+            }
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+        for w in workers:
+            try:
+                w.conn.send(None)
+            except OSError:
+                pass
+        for w in workers:
+            w.proc.join(timeout)
+            if w.proc.is_alive():
+                w.proc.terminate()
+
+    # ── Internals ───────────────────────────────────────────────────────────
+
+    def _submit(self, kwargs: dict, keep: bool) -> tuple[str, Future]:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Render pool is shut down")
+            if len(self._pending) >= self.max_queue:
+                metrics.incr("render_pool.rejected")
+                raise RenderQueueFull(f"{len(self._pending)} reports already queued")
+            job_id = secrets.token_urlsafe(16)
+            if keep:
+                self._jobs.set(job_id, {"status": "queued", "submitted_at": time.time()})
+            future = self._futures[job_id] = Future()
+            self._pending.append((job_id, kwargs))
+            self._dispatch()
+        metrics.incr("render_pool.submitted")
+        return job_id, future
+
+    def _abandon(self, job_id: str) -> None:
+        """Forget a ``render_sync`` job whose caller stopped waiting."""
+        with self._lock:
+            queued = len(self._pending)
+            self._pending = deque(t for t in self._pending if t[0] != job_id)
+            # Still rendering: with no future left, _finish drops the result
+            self._futures.pop(job_id, None)
+        metrics.incr("render_pool.cancelled" if len(self._pending) < queued else "render_pool.abandoned")
+
+    def _spawn(self) -> None:
+        parent_conn, child_conn = self._ctx.Pipe()
+        proc = self._ctx.Process(
+            target=_worker_main,
+            args=(self.render, child_conn, self.max_jobs, self.max_rss_bytes),
+            name="render-worker",
+            daemon=True,
+        )
+        proc.start()
+        child_conn.close()
+        self._workers.append(_Worker(proc, parent_conn))
+
+    def _dispatch(self) -> None:
+        """Hand pending jobs to idle workers (caller holds the lock)."""
+        for w in self._workers:
+            if not self._pending:
+                return
+            if w.job_id is not None or w.retiring or not w.proc.is_alive():
+                continue
+            job_id, kwargs = self._pending[0]
+            try:
+                w.conn.send((job_id, kwargs))
+            except OSError:
+                # Died since the liveness check; the job stays first in line
+                # and the collector replaces the worker
+                w.retiring = True
+                continue
+            self._pending.popleft()
+            w.job_id = job_id
+            w.started_at = time.time()
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._jobs.set(job_id, {**job, "status": "running", "started_at": w.started_at})
+
+    def _finish(self, job_id: str, status: str, payload: Any, started_at: float) -> None:
+        finished_at = time.time()
+        future = self._futures.pop(job_id, None)
+        callback = self._callbacks.pop(job_id, None)
+        if callback is not None and status == "done":
+            self._ready_callbacks.append((callback, payload))
+        if future is not None and not future.done():
+            if status == "done":
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(payload))
+        # Only submit() jobs keep their outcome; render_sync ones are done with
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job = {**job, "status": status, "finished_at": finished_at}
+            if status == "done":
+                job["result"] = payload
+                job["size"] = len(payload)
+            else:
+                job["error"] = payload
+            self._jobs.set(job_id, job)
+        metrics.incr(f"render_pool.{status}")
+        metrics.observe("render_pool.render_ms", (finished_at - started_at) * 1000)
+
+    def _collect(self) -> None:
+        while not self._closed:
+            with self._lock:
+                waitables = [w.conn for w in self._workers] + [w.proc.sentinel for w in self._workers]
+            wait(waitables, timeout=POLL_INTERVAL)
+            with self._lock:
+                if self._closed:
+                    return
+                for w in list(self._workers):
+                    self._drain(w)
+                    if not w.proc.is_alive():
+                        self._replace(w)
+                self._dispatch()
+                ready, self._ready_callbacks = self._ready_callbacks, []
+            for callback, payload in ready:
+                try:
+                    callback(payload)
+                except Exception as e:
+                    logger.warning(f"Render job callback failed: {e}")
+
+    def _drain(self, w: _Worker) -> None:
+        try:
+            while w.conn.poll():
+                kind, job_id, payload, retire = w.conn.recv()
+                w.job_id = None
+                self._finish(job_id, kind, payload, w.started_at)
+                if retire:
+                    w.retiring = True
+                    logger.info(f"Render worker {w.proc.pid} recycling ({retire})")
+        except (EOFError, OSError):
+            pass  # Worker is gone; _replace handles it
+
+    def _replace(self, w: _Worker) -> None:
+        """Swap out a worker that has exited, failing its job if it died mid-render."""
+        w.proc.join(0)
+        if w.job_id is not None:
+            logger.warning(f"Render worker {w.proc.pid} died (exit code {w.proc.exitcode})")
+            self._finish(
+                w.job_id, "failed", f"Render worker died (exit code {w.proc.exitcode})", w.started_at
+            )
+        w.conn.close()
+        self._workers.remove(w)
+        self._recycled += 1
+        self._spawn()
+
+
+_pool: Optional[RenderPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> Optional[RenderPool]:
+    """The shared pool, started on first use; None when ``REPORT_RENDER_WORKERS`` is 0."""
+    global _pool
+    if _pool is not None:
+        return _pool
+    from app.config import get_settings
+
+    settings = get_settings()
+    if settings.REPORT_RENDER_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            from app.reports.generator import generate_report_bytes
+
+            _pool = RenderPool(
+                generate_report_bytes,
+                workers=settings.REPORT_RENDER_WORKERS,
+                max_jobs=settings.REPORT_WORKER_MAX_JOBS,
+                max_rss_mb=settings.REPORT_WORKER_MAX_RSS_MB,
+                max_queue=settings.REPORT_RENDER_MAX_QUEUE,
+                result_ttl=settings.REPORT_JOB_RESULT_TTL_SECONDS,
+            )
+        return _pool
+
+
+def render_pool_stats() -> Optional[dict]:
+    """Stats for the shared pool, or None if it hasn't been started."""
+    return _pool.stats() if _pool is not None else None
+
+
+def shutdown_render_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
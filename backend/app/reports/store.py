@@ -0,0 +1,233 @@
+"""
+Content-addressed cache of rendered PDF reports.
+
+A report is fully determined by its render inputs (grants, label, summary),
+the templates and the date printed on it, so the hash of those is used as
+its key. Rendered PDFs are kept in two tiers:
+
+- L1: files under ``REPORT_CACHE_DIR``, evicted least-recently-used once the
+  directory passes ``REPORT_CACHE_MAX_MB``;
+- L2: S3 under ``REPORT_CACHE_S3_PREFIX`` (when S3 is configured), shared
+  across restarts and machines and served to clients as presigned URLs.
+
+Uploads to L2 after a render happen in the background so the request that
+rendered the report doesn't wait on S3.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Optional
+
+from app.utils import metrics, s3
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+
+def _template_hash() -> str:
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(TEMPLATE_DIR)):
+        with open(os.path.join(TEMPLATE_DIR, name), "rb") as f:
+            digest.update(name.encode() + b"\0" + f.read())
+    return digest.hexdigest()[:16]
+
+
+_TEMPLATE_HASH = _template_hash()
+
+
+def report_key(
+    matched_grants: list[dict],
+    user_label: str = "GrantFinder User",
+    ai_summary: str = "",
+    renderer: Optional[str] = None,
+    **_: Any,
+) -> str:
+    """Hash of everything that ends up in the PDF.
+
+    Includes today's date (it is printed on the cover), so entries roll
+    over daily, and the renderer, since each lays the report out
+    differently. Extra keyword arguments such as ``catalogue_version`` are
+    accepted and ignored: they change how a report is rendered, not what.
+    """
+    payload = json.dumps(
+        {
+            "grants": matched_grants,
+            "label": user_label,
+            "summary": ai_summary,
+            "date": datetime.now().strftime("%d %B %Y"),
+            "templates": _TEMPLATE_HASH,
+            "renderer": renderer,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReportStore:
+    """Local-disk L1 with size-bounded LRU eviction, optionally backed by S3."""
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int,
+        remote: bool = False,
+        prefix: str = "report-cache/",
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.remote = remote
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._uploader = ThreadPoolExecutor(max_workers=2, thread_name_prefix="report-upload")
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(
+            os.path.getsize(os.path.join(directory, n))
+            for n in os.listdir(directory)
+            if n.endswith(".pdf")
+        )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def _remote_key(self, key: str) -> str:
+        return f"{self.prefix}{key}.pdf"
+
+    # ── L1 ──────────────────────────────────────────────────────────────────
+
+    def get_local(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # mtime doubles as the LRU clock
+        except FileNotFoundError:
+            return None
+        return data
+
+    def put_local(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        with self._lock:
+            existing = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp, path)
+            self._size += len(data) - existing
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used files until under ``max_bytes`` (lock held)."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".pdf"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+            metrics.incr("report_store.evictions")
+
+    # ── L1 + L2 ─────────────────────────────────────────────────────────────
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached bytes from L1, falling back to L2 (and refilling L1)."""
+        data = self.get_local(key)
+        if data is not None:
+            metrics.incr("report_store.l1_hits")
+            return data
+        if self.remote:
+            try:
+                data = s3.download_pdf(self._remote_key(key))
+            except Exception as e:
+                logger.warning(f"Report cache L2 read failed: {e}")
+                data = None
+            if data is not None:
+                metrics.incr("report_store.l2_hits")
+                self.put_local(key, data)
+                return data
+        metrics.incr("report_store.misses")
+        return None
+
+    def put(self, key: str, data: bytes, wait: bool = False) -> None:
+        """Store in L1 and (in the background unless ``wait``) upload to L2."""
+        self.put_local(key, data)
+        if not self.remote:
+            return
+        future = self._uploader.submit(self._upload, key, data)
+        if wait:
+            future.result()
+
+    def _upload(self, key: str, data: bytes) -> None:
+        try:
+            s3.upload_pdf(self._remote_key(key), data)
+        except Exception as e:
+            logger.warning(f"Report cache L2 upload failed: {e}")
+            raise
+
+    def presigned_url(self, key: str, data: Optional[bytes] = None, expires_in: int = 3600) -> Optional[str]:
+        """Presigned L2 URL for ``key``, uploading ``data`` first if L2 lacks it.
+
+        Returns None when S3 isn't configured or the object isn't available.
+        """
+        if not self.remote:
+            return None
+        remote_key = self._remote_key(key)
+        try:
+            if not s3.pdf_exists(remote_key):
+                data = data if data is not None else self.get_local(key)
+                if data is None:
+                    return None
+                s3.upload_pdf(remote_key, data)
+            return s3.get_presigned_url(remote_key, expires_in=expires_in)
+        except Exception as e:
+            logger.warning(f"Report cache presign failed: {e}")
+            return None
+
+    def stats(self) -> dict:
+        return {"l1_bytes": self._size, "l1_max_bytes": self.max_bytes, "remote": self.remote}
+
+
+_store: Optional[ReportStore] = None
+_store_lock = threading.Lock()
+
+
+def get_report_store() -> ReportStore:
+    """The shared store for this process, created from settings on first use."""
+    global _store
+    if _store is not None:
+        return _store
+    from app.config import get_settings
+
+    settings = get_settings()
+    with _store_lock:
+        if _store is None:
+            _store = ReportStore(
+                settings.REPORT_CACHE_DIR,
+                settings.REPORT_CACHE_MAX_MB * 2**20,
+                remote=s3.s3_configured(),
+                prefix=settings.REPORT_CACHE_S3_PREFIX,
+            )
+        return _store
@@ -84,11 +84,20 @@ class CategoryResult(BaseModel):
 
 class ScanResponse(BaseModel):
     scan_id: Optional[str] = None
+    scan_handle: Optional[str] = None  # Pass to /reports/* to reuse these results
     total_grants_found: int
     total_potential_value: float
     categories: list[CategoryResult]
     summary: str = ""
+    summary_token: Optional[str] = None  # Poll /scan/summary/{token} for the AI version
     generated_at: str
+    refreshing: bool = False  # A newer scan is being computed; fetch /results again shortly
+
+
+class SummaryStatusResponse(BaseModel):
+    token: str
+    status: str  # pending, ready, fallback
+    summary: str
 
 
 class ScanHistoryItem(BaseModel):
@@ -96,5 +105,37 @@ class ScanHistoryItem(BaseModel):
     total_grants: int
     total_value: Optional[float]
     created_at: str
+    grants_delta: Optional[int] = None  # Change in total_grants since the previous scan
 
     model_config = {"from_attributes": True}
+
+
+class ScanHistoryResponse(BaseModel):
+    scans: list[ScanHistoryItem]
+    per_page: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for older scans; None on the last page
+
+
+class GrantChangeItem(BaseModel):
+    grant_id: str
+    grant_name: Optional[str] = None  # None if the grant has left the catalogue
+    slug: Optional[str] = None
+    match_type_before: Optional[str] = None  # None if newly matched
+    match_type_after: Optional[str] = None  # None if no longer matched
+    score_before: Optional[float] = None
+    score_after: Optional[float] = None
+    max_amount: Optional[float] = None
+
+
+class ScanDiffResponse(BaseModel):
+    from_scan_id: str
+    to_scan_id: Optional[str] = None  # None when compared against a live match
+    added: list[GrantChangeItem]
+    removed: list[GrantChangeItem]
+    upgraded: list[GrantChangeItem]
+    downgraded: list[GrantChangeItem]
+    rescored: list[GrantChangeItem]
+    unchanged: int
+    total_value_before: float
+    total_value_after: float
+    value_delta: float
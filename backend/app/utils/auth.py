@@ -52,11 +52,12 @@ def decode_token(token: str) -> dict:
 
 # ── FastAPI dependencies ─────────────────────────────────────────────────────
 
-def get_current_user(
-    token: Optional[str] = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    """Dependency that returns the authenticated user or raises 401."""
+def get_current_user_id(token: Optional[str] = Depends(oauth2_scheme)) -> uuid.UUID:
+    """Dependency that returns the user id from a valid access token, or raises 401.
+
+    Doesn't check that the user still exists; for hot read paths that can
+    answer without the database.
+    """
     if token is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -71,8 +72,15 @@ def get_current_user(
             raise HTTPException(status_code=401, detail="Invalid token")
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return uuid.UUID(user_id)
 
-    user = db.query(User).filter(User.id == uuid.UUID(user_id)).first()
+
+def get_current_user(
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: Session = Depends(get_db),
+) -> User:
+    """Dependency that returns the authenticated user or raises 401."""
+    user = db.query(User).filter(User.id == user_id).first()
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
     return user
@@ -86,6 +94,6 @@ def get_optional_user(
     if token is None:
         return None
     try:
-        return get_current_user(token=token, db=db)
+        return get_current_user(user_id=get_current_user_id(token=token), db=db)
     except HTTPException:
         return None
@@ -0,0 +1,63 @@
+"""
+Per-request time budgets.
+
+A ``Deadline`` is created when a request starts and passed down through each
+stage. Mandatory stages check ``expired`` and give up early once the client
+has stopped waiting; optional stages (AI summaries) ask whether enough time
+is left via ``allows`` and use ``cap`` to bound their own timeouts, falling
+back to their cheap alternative otherwise.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, Optional
+
+from app.utils import metrics
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a mandatory stage starts after the request budget has run out."""
+
+
+class Deadline:
+    """Absolute point in (monotonic) time by which a request should finish."""
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.budget = seconds
+        self.expires_at = clock() + seconds
+
+    def reserve(self, seconds: float) -> "Deadline":
+        """A deadline ``seconds`` earlier, keeping that much back for later stages."""
+        child = Deadline(0.0, self._clock)
+        child.budget = self.budget - seconds
+        child.expires_at = self.expires_at - seconds
+        return child
+
+    def remaining(self) -> float:
+        """Seconds left, never negative."""
+        return max(self.expires_at - self._clock(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def allows(self, seconds: float) -> bool:
+        """Whether at least ``seconds`` are left."""
+        return self.remaining() >= seconds
+
+    def cap(self, timeout: Optional[float]) -> float:
+        """``timeout`` reduced to the time remaining."""
+        left = self.remaining()
+        return left if timeout is None else min(timeout, left)
+
+    def check(self, stage: str) -> None:
+        """Raise ``DeadlineExceeded`` if the budget is already spent."""
+        if self.expired:
+            metrics.incr(f"deadline.exceeded.{stage}")
+            raise DeadlineExceeded(f"Request budget of {self.budget:.1f}s exhausted before {stage}")
+
+    def skip(self, stage: str) -> None:
+        """Record that an optional stage was skipped for lack of time."""
+        metrics.incr(f"deadline.skipped.{stage}")
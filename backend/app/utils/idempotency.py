@@ -0,0 +1,110 @@
+"""
+``Idempotency-Key`` support for POSTs that clients retry.
+
+The first request with a given key runs normally and its response is kept
+for ``IDEMPOTENCY_KEY_TTL_SECONDS``; later requests with the same key get
+that response back (flagged ``Idempotent-Replayed: true``) without running
+anything. A duplicate that arrives while the first is still running waits
+for it instead of recomputing.
+
+Keys are scoped per endpoint (and per user where there is one) and bound to
+a fingerprint of the request, so reusing a key for a different request is
+rejected with 422. Only successful responses are kept: if the first request
+fails, a waiting or later duplicate runs the request itself.
+
+Entries live in process memory, like the other caches here, so duplicates
+are only caught when they reach the same worker.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Hashable, Optional, TypeVar
+
+from fastapi import Header, HTTPException, Response
+
+from app.config import get_settings
+from app.utils import metrics
+from app.utils.ttl_cache import TTLCache
+
+T = TypeVar("T")
+
+_settings = get_settings()
+
+
+class _Entry:
+    def __init__(self, fingerprint: str) -> None:
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.succeeded = False
+        self.response: Any = None
+
+
+_lock = threading.Lock()
+_entries: TTLCache[_Entry] = TTLCache(
+    maxsize=_settings.IDEMPOTENCY_KEY_MAX_ENTRIES, ttl=_settings.IDEMPOTENCY_KEY_TTL_SECONDS
+)
+
+
+def idempotency_key(
+    key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255),
+) -> Optional[str]:
+    """Dependency reading the optional ``Idempotency-Key`` header."""
+    return key
+
+
+def request_fingerprint(*parts: Any) -> str:
+    """Stable hash of whatever identifies a request (bodies, query params)."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def run_idempotent(
+    scope: Hashable,
+    key: Optional[str],
+    fingerprint: str,
+    response: Response,
+    compute: Callable[[], T],
+    timeout: float,
+) -> T:
+    """Run ``compute`` once per ``(scope, key)`` and replay its result to duplicates.
+
+    Without a key this is just ``compute()``. Duplicates wait up to
+    ``timeout`` seconds for a request still in flight, then get 409.
+    """
+    if key is None:
+        return compute()
+
+    cache_key = (scope, key)
+    while True:
+        with _lock:
+            entry = _entries.get(cache_key)
+            if entry is None:
+                entry = _Entry(fingerprint)
+                _entries.set(cache_key, entry)
+                break
+        if entry.fingerprint != fingerprint:
+            raise HTTPException(422, "Idempotency-Key was already used for a different request.")
+        if not entry.done.wait(timeout):
+            metrics.incr("idempotency.in_flight_timeouts")
+            raise HTTPException(409, "A request with this Idempotency-Key is still in progress.")
+        if entry.succeeded:
+            metrics.incr("idempotency.replayed")
+            response.headers["Idempotent-Replayed"] = "true"
+            return entry.response
+        # The first request failed and dropped its entry; try again ourselves
+
+    try:
+        result = compute()
+    except BaseException:
+        with _lock:
+            if _entries.get(cache_key) is entry:
+                _entries.pop(cache_key)
+        entry.done.set()
+        raise
+    entry.response = result
+    entry.succeeded = True
+    entry.done.set()
+    return result
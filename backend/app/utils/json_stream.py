@@ -0,0 +1,118 @@
+"""
+Incremental reader for streamed JSON objects.
+
+Accepts either NDJSON (one object per line) or a single JSON array of
+objects, detected from the first non-blank character, and yields each object
+as soon as it is complete. Only the object being parsed is buffered, so
+memory stays bounded by ``max_object_bytes`` however large the body is.
+
+A malformed or over-long NDJSON line is yielded as a ``ValueError`` and
+reading carries on with the next line. A malformed array element can't be
+skipped, so it ends the stream (as a final ``ValueError``).
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from typing import Any, AsyncIterator, Union
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+Item = Union[dict[str, Any], ValueError]
+
+
+def _parse_object(text: str) -> Item:
+    try:
+        value = json.loads(text)
+    except json.JSONDecodeError as e:
+        return ValueError(f"Invalid JSON: {e.msg}")
+    if not isinstance(value, dict):
+        return ValueError("Expected a JSON object")
+    return value
+
+
+async def iter_json_objects(
+    chunks: AsyncIterator[bytes], max_object_bytes: int = 64 * 1024
+) -> AsyncIterator[Item]:
+    """Yield the objects (or per-item errors) from an NDJSON or JSON-array body."""
+    utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    mode = None  # "ndjson" or "array"
+    finished = False
+
+    async def _more() -> bool:
+        nonlocal buffer, finished
+        if finished:
+            return False
+        try:
+            chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            buffer += utf8.decode(b"", final=True)
+            finished = True
+            return False
+        buffer += utf8.decode(chunk)
+        return True
+
+    while mode is None:
+        buffer = buffer.lstrip(_WHITESPACE)
+        if buffer:
+            mode = "array" if buffer[0] == "[" else "ndjson"
+            if mode == "array":
+                buffer = buffer[1:]
+        elif not await _more():
+            return
+
+    if mode == "ndjson":
+        skipping = False  # Dropping the rest of an over-long line
+        while True:
+            newline = buffer.find("\n")
+            if newline == -1:
+                if not skipping and len(buffer) > max_object_bytes:
+                    yield ValueError(f"Line longer than {max_object_bytes} bytes")
+                    skipping = True
+                if skipping:
+                    buffer = ""
+                if await _more():
+                    continue
+                if buffer.strip():
+                    yield _parse_object(buffer)
+                return
+            line, buffer = buffer[:newline], buffer[newline + 1:]
+            if skipping:
+                skipping = False
+            elif line.strip():
+                yield _parse_object(line)
+
+    # Array: skip separators, then decode one element at a time
+    expect_value = True
+    while True:
+        buffer = buffer.lstrip(_WHITESPACE)
+        if not buffer:
+            if await _more():
+                continue
+            yield ValueError("Unterminated JSON array")
+            return
+        if buffer[0] == "]":
+            return
+        if buffer[0] == "," and not expect_value:
+            buffer = buffer[1:]
+            expect_value = True
+            continue
+        if not expect_value:
+            yield ValueError("Expected ',' or ']' between array elements")
+            return
+        try:
+            value, end = _decoder.raw_decode(buffer)
+        except json.JSONDecodeError as e:
+            # Usually just incomplete: read more unless the element is too big
+            if len(buffer) <= max_object_bytes and await _more():
+                continue
+            yield ValueError(f"Invalid JSON: {e.msg}")
+            return
+        if end == len(buffer) and not isinstance(value, (dict, list)) and await _more():
+            continue  # A scalar may continue in the next chunk
+        buffer = buffer[end:]
+        expect_value = False
+        yield value if isinstance(value, dict) else ValueError("Expected a JSON object")
@@ -0,0 +1,53 @@
+"""Lightweight in-process metrics: counters and timing summaries.
+
+Values are per process and reset on restart; they are exposed through
+``GET /api/v1/admin/metrics`` for quick inspection.
+"""
+
+from __future__ import annotations
+
+import threading
+
+_lock = threading.Lock()
+_counters: dict[str, float] = {}
+_summaries: dict[str, dict[str, float]] = {}
+
+
+def incr(name: str, value: float = 1.0) -> None:
+    """Add ``value`` to a counter."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0.0) + value
+
+
+def observe(name: str, value: float) -> None:
+    """Record one observation (e.g. a latency in ms or a token count)."""
+    with _lock:
+        s = _summaries.get(name)
+        if s is None:
+            _summaries[name] = {"count": 1, "sum": value, "min": value, "max": value}
+            return
+        s["count"] += 1
+        s["sum"] += value
+        s["min"] = min(s["min"], value)
+        s["max"] = max(s["max"], value)
+
+
+def get_counter(name: str) -> float:
+    with _lock:
+        return _counters.get(name, 0.0)
+
+
+def snapshot() -> dict:
+    """Return a copy of all counters and summaries (with means)."""
+    with _lock:
+        summaries = {
+            name: {**s, "mean": s["sum"] / s["count"] if s["count"] else 0.0}
+            for name, s in _summaries.items()
+        }
+        return {"counters": dict(_counters), "summaries": summaries}
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _summaries.clear()
@@ -1,17 +1,32 @@
 """AWS S3 upload/download helpers for PDF reports."""
 
+from typing import Optional
+
 import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
 from app.config import get_settings
 
 settings = get_settings()
 
 
+def s3_configured() -> bool:
+    """Whether there is an S3 (or S3-compatible stand-in) to talk to."""
+    return bool(settings.AWS_S3_ENDPOINT_URL or settings.AWS_ACCESS_KEY_ID)
+
+
 def get_s3_client():
+    kwargs = {}
+    if settings.AWS_S3_ENDPOINT_URL:
+        # Local stand-ins (MinIO, moto server) don't do virtual-host buckets
+        kwargs["endpoint_url"] = settings.AWS_S3_ENDPOINT_URL
+        kwargs["config"] = Config(s3={"addressing_style": "path"})
     return boto3.client(
         "s3",
         region_name=settings.AWS_REGION,
         aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
         aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        **kwargs,
     )
 
 
@@ -27,6 +42,30 @@ def upload_pdf(key: str, body: bytes) -> str:
     return f"https://{settings.AWS_S3_BUCKET}.s3.{settings.AWS_REGION}.amazonaws.com/{key}"
 
 
+def download_pdf(key: str) -> Optional[bytes]:
+    """Fetch a stored PDF, or None if there is no such object."""
+    client = get_s3_client()
+    try:
+        obj = client.get_object(Bucket=settings.AWS_S3_BUCKET, Key=key)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+            return None
+        raise
+    return obj["Body"].read()
+
+
+def pdf_exists(key: str) -> bool:
+    """Whether an object exists under ``key``."""
+    client = get_s3_client()
+    try:
+        client.head_object(Bucket=settings.AWS_S3_BUCKET, Key=key)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404", "NotFound"):
+            return False
+        raise
+    return True
+
+
 def get_presigned_url(key: str, expires_in: int = 3600) -> str:
     """Generate a pre-signed download URL."""
     client = get_s3_client()
@@ -4,3 +4,4 @@ set -o errexit
 
 pip install --upgrade pip
 pip install -r requirements.txt
+# Schema migrations run from start.sh, once the database is reachable
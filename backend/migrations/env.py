@@ -7,12 +7,16 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+from app.config import get_settings
 from app.database import Base
 from app.models import *  # noqa — import all models so Alembic sees them
 
 config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
+if not config.get_main_option("sqlalchemy.url"):
+    # Migrate the database the app uses ("%" escaped for configparser)
+    config.set_main_option("sqlalchemy.url", get_settings().DATABASE_URL.replace("%", "%%"))
 
 target_metadata = Base.metadata
 
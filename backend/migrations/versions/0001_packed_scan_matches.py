@@ -0,0 +1,42 @@
+"""Add scan_results.packed_matches
+
+Compact storage for a scan's ranked matches (SCAN_RESULT_STORAGE=packed).
+Existing scans keep their scan_result_grants rows until converted with
+``python -m app.engine.scan_store --backfill``.
+
+Revision ID: 0001_packed_scan_matches
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001_packed_scan_matches"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _needs_column() -> bool:
+    # Tables are also created by create_all at startup: on a fresh database
+    # it builds scan_results with the column, and may already have added it
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("scan_results"):
+        return False
+    return not any(c["name"] == "packed_matches" for c in inspector.get_columns("scan_results"))
+
+
+def upgrade() -> None:
+    if _needs_column():
+        op.add_column("scan_results", sa.Column("packed_matches", sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    packed = op.get_bind().execute(
+        sa.text("SELECT COUNT(*) FROM scan_results WHERE packed_matches IS NOT NULL")
+    ).scalar()
+    if packed:
+        # Their matches only exist in this column
+        raise RuntimeError(f"{packed} scans are stored packed; refusing to drop packed_matches")
+    op.drop_column("scan_results", "packed_matches")
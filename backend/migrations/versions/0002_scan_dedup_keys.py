@@ -0,0 +1,39 @@
+"""Add scan_results.profile_hash and catalogue_version
+
+Lets POST /scan return the previous scan when neither the profile nor the
+catalogue changed. Older scans have NULLs and are never reused.
+
+Revision ID: 0002_scan_dedup_keys
+Revises: 0001_packed_scan_matches
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002_scan_dedup_keys"
+down_revision = "0001_packed_scan_matches"
+branch_labels = None
+depends_on = None
+
+_COLUMNS = (
+    ("profile_hash", sa.String(64)),
+    ("catalogue_version", sa.String(32)),
+)
+
+
+def upgrade() -> None:
+    # create_all at startup may already have added them (or will build the
+    # table with them on a fresh database)
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("scan_results"):
+        return
+    existing = {c["name"] for c in inspector.get_columns("scan_results")}
+    for name, type_ in _COLUMNS:
+        if name not in existing:
+            op.add_column("scan_results", sa.Column(name, type_, nullable=True))
+
+
+def downgrade() -> None:
+    for name, _ in reversed(_COLUMNS):
+        op.drop_column("scan_results", name)
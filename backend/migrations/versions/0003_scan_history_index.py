@@ -0,0 +1,41 @@
+"""Covering index for keyset-paginated scan history
+
+Replaces ix_scan_results_user_id, which is a prefix of the new index.
+
+Revision ID: 0003_scan_history_index
+Revises: 0002_scan_dedup_keys
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_scan_history_index"
+down_revision = "0002_scan_dedup_keys"
+branch_labels = None
+depends_on = None
+
+
+def _indexes() -> set[str]:
+    return {i["name"] for i in sa.inspect(op.get_bind()).get_indexes("scan_results")}
+
+
+def upgrade() -> None:
+    # create_all at startup may already have built the new layout (or will,
+    # on a fresh database)
+    if not sa.inspect(op.get_bind()).has_table("scan_results"):
+        return
+    existing = _indexes()
+    if "ix_scan_results_user_history" not in existing:
+        op.create_index(
+            "ix_scan_results_user_history",
+            "scan_results",
+            ["user_id", "created_at", "id", "total_grants", "total_value"],
+        )
+    if "ix_scan_results_user_id" in existing:
+        op.drop_index("ix_scan_results_user_id", table_name="scan_results")
+
+
+def downgrade() -> None:
+    op.create_index("ix_scan_results_user_id", "scan_results", ["user_id"])
+    op.drop_index("ix_scan_results_user_history", table_name="scan_results")
@@ -0,0 +1,33 @@
+"""Add eligibility_rules.updated_at
+
+Part of the catalogue fingerprint, so edits to an existing rule's value are
+seen by every process, not only the one that called invalidate_catalogue().
+Existing rows keep NULL until they are next written.
+
+Revision ID: 0004_rule_updated_at
+Revises: 0003_scan_history_index
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_rule_updated_at"
+down_revision = "0003_scan_history_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # create_all at startup may already have added it (or will build the
+    # table with it on a fresh database)
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("eligibility_rules"):
+        return
+    existing = {c["name"] for c in inspector.get_columns("eligibility_rules")}
+    if "updated_at" not in existing:
+        op.add_column("eligibility_rules", sa.Column("updated_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("eligibility_rules", "updated_at")
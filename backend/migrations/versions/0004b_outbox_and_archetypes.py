@@ -0,0 +1,59 @@
+"""Create email_outbox and summary_archetypes
+
+Both tables were introduced with only create_all behind them; later
+revisions alter email_outbox, so it has to exist by then.
+
+Revision ID: 0004b_outbox_and_archetypes
+Revises: 0004_rule_updated_at
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004b_outbox_and_archetypes"
+down_revision = "0004_rule_updated_at"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # create_all at startup may already have created them
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("email_outbox"):
+        op.create_table(
+            "email_outbox",
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("kind", sa.String(20), nullable=False),
+            sa.Column("to_email", sa.String(255), nullable=False),
+            sa.Column("subject", sa.String(500), nullable=False),
+            sa.Column("html", sa.Text(), nullable=False),
+            sa.Column("attachment_name", sa.String(255), nullable=True),
+            sa.Column("attachment", sa.LargeBinary(), nullable=True),
+            sa.Column("status", sa.String(20), nullable=False),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+            sa.Column("last_error", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("sent_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_email_outbox_due", "email_outbox", ["status", "next_attempt_at"])
+    if not inspector.has_table("summary_archetypes"):
+        op.create_table(
+            "summary_archetypes",
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("catalogue_version", sa.String(32), nullable=False),
+            sa.Column("archetype_key", sa.String(64), nullable=False),
+            sa.Column("summary", sa.Text(), nullable=False),
+            sa.Column("scan_count", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.UniqueConstraint("catalogue_version", "archetype_key", name="uq_summary_archetype"),
+        )
+        op.create_index(
+            "ix_summary_archetypes_catalogue_version", "summary_archetypes", ["catalogue_version"]
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("summary_archetypes")
+    op.drop_table("email_outbox")
@@ -0,0 +1,35 @@
+"""Add email_outbox.claim_token and claimed_at
+
+Dispatchers claim a batch with a token and send only the rows they actually
+claimed. Recovery requeues only claims older than EMAIL_CLAIM_TIMEOUT_SECONDS.
+
+Revision ID: 0005_email_claims
+Revises: 0004b_outbox_and_archetypes
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_email_claims"
+down_revision = "0004b_outbox_and_archetypes"
+branch_labels = None
+depends_on = None
+
+_COLUMNS = (
+    ("claim_token", sa.String(32)),
+    ("claimed_at", sa.DateTime()),
+)
+
+
+def upgrade() -> None:
+    # create_all at startup may already have added them
+    existing = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("email_outbox")}
+    for name, type_ in _COLUMNS:
+        if name not in existing:
+            op.add_column("email_outbox", sa.Column(name, type_, nullable=True))
+
+
+def downgrade() -> None:
+    for name, _ in reversed(_COLUMNS):
+        op.drop_column("email_outbox", name)
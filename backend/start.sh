@@ -0,0 +1,6 @@
+#!/usr/bin/env bash
+# Container / Render start command: bring the schema up to date, then serve
+set -o errexit
+
+alembic upgrade head
+exec uvicorn app.main:app --host 0.0.0.0 --port "${PORT:-8000}" "$@"
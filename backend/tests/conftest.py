@@ -0,0 +1,110 @@
+"""Shared fixtures: a throwaway SQLite database, scan test data and an API client."""
+
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import Base, get_db
+from app.engine.catalogue import invalidate_catalogue
+from app.engine.matcher import MatchResult, MatchType
+from app.models.grant import Grant
+from app.models.profile import UserProfile
+from app.models.user import User
+from app.utils.auth import create_access_token
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """SQLite file under ``tmp_path`` with the app's tables (foreign keys on, as in the app)."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _pragma(dbapi_conn, _):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+    # The catalogue snapshot is per process; don't let it outlive this database
+    invalidate_catalogue()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _scan_fixtures(db: Session, n: int) -> tuple[User, UserProfile, list[MatchResult]]:
+    run = uuid.uuid4().hex[:8]
+    user = User(email=f"test-{run}@example.com")
+    db.add(user)
+    db.flush()
+    profile = UserProfile(user_id=user.id)
+    grants = [
+        Grant(
+            name=f"Test grant {i}", slug=f"test-{run}-{i}", short_description="Test grant",
+            category="other", amount_type="fixed", max_amount=100 + i,
+            source_organisation="Test", source_url="https://example.com",
+        )
+        for i in range(n)
+    ]
+    db.add(profile)
+    db.add_all(grants)
+    db.commit()
+    types = list(MatchType)
+    results = [
+        MatchResult(
+            grant_id=str(g.id), grant_name=g.name, match_type=types[i % len(types)],
+            match_score=100.0 - i % 50, max_amount=float(g.max_amount), amount_description=None,
+            category=g.category, source_organisation=g.source_organisation, source_url=g.source_url,
+            application_url=None, short_description=g.short_description, slug=g.slug,
+            notes="Some rules need checking" if i % 3 == 0 else "",
+        )
+        for i, g in enumerate(grants)
+    ]
+    return user, profile, results
+
+
+@pytest.fixture
+def scan_fixtures(db):
+    """Factory: ``scan_fixtures(n)`` adds a user, a profile and ``n`` grants and
+    returns them with one ``MatchResult`` per grant (cycling through match types)."""
+    return lambda n: _scan_fixtures(db, n)
+
+
+@pytest.fixture
+def client(engine, monkeypatch):
+    """``TestClient`` for the app on the test database (startup hooks not run)."""
+    from fastapi.testclient import TestClient
+
+    import app.api.scan
+    import app.database
+    from app.main import app as fastapi_app
+
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def _get_db():
+        session = factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    # Background work opens its own sessions
+    monkeypatch.setattr(app.database, "SessionLocal", factory)
+    monkeypatch.setattr(app.api.scan, "SessionLocal", factory)
+    fastapi_app.dependency_overrides[get_db] = _get_db
+    yield TestClient(fastapi_app)
+    fastapi_app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def auth_headers():
+    """Factory: ``auth_headers(user)`` returns a bearer-token header for ``user``."""
+    return lambda user: {"Authorization": f"Bearer {create_access_token(user.id)}"}
@@ -0,0 +1,153 @@
+"""Tests for the shared AI client's circuit breaker.
+
+The breaker tests are pure; the client tests run the real Anthropic SDK
+against a local stub HTTP server (skipped if the SDK isn't installed).
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from app.ai.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# ── Circuit breaker ──────────────────────────────────────────────────────────
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=_Clock())
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_half_open_allows_single_probe():
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 11
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # Only one probe at a time
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens():
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=10, clock=clock)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now = 11
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.is_open()
+
+
+def test_released_probe_leaves_breaker_half_open():
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 11
+    assert breaker.allow()
+    breaker.release_probe()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()  # The next caller probes
+
+
+# ── Client against a local stub server ───────────────────────────────────────
+
+class _StubHandler(BaseHTTPRequestHandler):
+    status = 200
+    calls = 0
+
+    def do_POST(self):
+        type(self).calls += 1
+        self.rfile.read(int(self.headers.get("content-length", 0)))
+        if self.status != 200:
+            body = {"type": "error", "error": {"type": "api_error", "message": "boom"}}
+        else:
+            body = {
+                "id": "msg_stub",
+                "type": "message",
+                "role": "assistant",
+                "model": "stub",
+                "content": [{"type": "text", "text": "stub answer"}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {"input_tokens": 1, "output_tokens": 2},
+            }
+        payload = json.dumps(body).encode()
+        self.send_response(self.status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_client(monkeypatch):
+    pytest.importorskip("anthropic")
+    from app.config import get_settings
+    from app.ai import client
+
+    server = HTTPServer(("127.0.0.1", 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setenv("AI_MAX_RETRIES", "0")
+    get_settings.cache_clear()
+    client.reset_client()
+    monkeypatch.setattr(client, "breaker", CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    _StubHandler.status, _StubHandler.calls = 200, 0
+    yield client
+    server.shutdown()
+    client.reset_client()
+    get_settings.cache_clear()
+
+
+def test_client_reuses_connection_and_returns_text(stub_client):
+    for _ in range(2):
+        message = stub_client.create_message(model="stub", max_tokens=10, messages=[])
+        assert message.content[0].text == "stub answer"
+    assert stub_client.get_client() is stub_client.get_client()
+    assert _StubHandler.calls == 2
+
+
+def test_breaker_short_circuits_failing_upstream(stub_client):
+    from app.ai.circuit_breaker import CircuitOpenError
+
+    _StubHandler.status = 500
+    for _ in range(2):
+        with pytest.raises(Exception):
+            stub_client.create_message(model="stub", max_tokens=10, messages=[])
+    with pytest.raises(CircuitOpenError):
+        stub_client.create_message(model="stub", max_tokens=10, messages=[])
+    assert _StubHandler.calls == 2
+    assert not stub_client.ai_available()
+
+
+def test_local_error_neither_closes_nor_trips_breaker(stub_client):
+    stub_client.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    stub_client.breaker.record_failure()
+    assert stub_client.breaker.state == HALF_OPEN
+    with pytest.raises(TypeError):
+        stub_client.create_message(model="stub", max_tokens=10, messages=[], not_an_argument=True)
+    assert _StubHandler.calls == 0
+    assert stub_client.breaker.state == HALF_OPEN
+    assert stub_client.breaker.allow()
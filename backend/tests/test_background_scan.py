@@ -0,0 +1,61 @@
+"""Eager background scans: refresh on profile save, per-user coalescing."""
+
+import threading
+import uuid
+
+from app.engine import background_scan
+from app.models.profile import UserProfile
+from app.models.scan_result import ScanResult
+
+
+def test_refresh_scan_saves_once_until_profile_changes(db, scan_fixtures):
+    user, profile, _ = scan_fixtures(20)
+    user_id = user.id
+
+    first = background_scan.refresh_scan(db, user_id)
+    assert first is not None
+    assert background_scan.refresh_scan(db, user_id) == first
+    assert db.query(ScanResult).count() == 1
+
+    db.query(UserProfile).filter(UserProfile.user_id == user_id).update({"age": 70})
+    db.commit()
+    second = background_scan.refresh_scan(db, user_id)
+    assert second not in (None, first)
+    assert db.query(ScanResult).count() == 2
+    assert background_scan.refresh_scan(db, uuid.uuid4()) is None  # No profile
+
+
+def test_saves_coalesce_into_one_job_per_user(monkeypatch):
+    release = threading.Event()
+    started = threading.Event()
+    runs = []
+
+    def _refresh(user_id):
+        runs.append(user_id)
+        started.set()
+        release.wait(5)
+
+    monkeypatch.setattr(background_scan, "_refresh", _refresh)
+    monkeypatch.setattr(background_scan._settings, "BACKGROUND_SCAN_WORKERS", 1)
+    user_id = uuid.uuid4()
+
+    assert background_scan.schedule_scan(user_id)
+    assert started.wait(5)
+    assert background_scan.is_refreshing(user_id)
+    # Saved twice while running: one rerun, not two
+    background_scan.schedule_scan(user_id)
+    background_scan.schedule_scan(user_id)
+    assert not background_scan.wait_for_scan(user_id, 0.05)
+
+    release.set()
+    assert background_scan.wait_for_scan(user_id, 5)
+    assert runs == [user_id, user_id]
+    assert not background_scan.is_refreshing(user_id)
+
+
+def test_disabled_when_no_workers(monkeypatch):
+    monkeypatch.setattr(background_scan._settings, "BACKGROUND_SCAN_WORKERS", 0)
+    user_id = uuid.uuid4()
+    assert not background_scan.schedule_scan(user_id)
+    assert not background_scan.is_refreshing(user_id)
+    assert background_scan.wait_for_scan(user_id, 0)
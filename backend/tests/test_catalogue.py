@@ -0,0 +1,22 @@
+"""Catalogue snapshot freshness."""
+
+from app.engine.catalogue import get_catalogue
+from app.models.eligibility_rule import EligibilityRule
+from app.models.grant import Grant
+
+
+def test_rule_value_edit_changes_the_version(db, scan_fixtures):
+    scan_fixtures(2)
+    grant = db.query(Grant).first()
+    db.add(EligibilityRule(grant_id=grant.id, field="age", operator="gte", value="66"))
+    db.commit()
+    before = get_catalogue(db)
+
+    # Same rule count, same grant rows: only the rule's own timestamp moves.
+    # Written with a bulk update, as another process would, so nothing here
+    # calls invalidate_catalogue()
+    db.query(EligibilityRule).update({"value": "70"})
+    db.commit()
+    after = get_catalogue(db)
+    assert after.version != before.version
+    assert after.by_id[str(grant.id)]["eligibility_rules"][0]["value"] == "70"
@@ -0,0 +1,40 @@
+"""Streaming chat answers against the offline fake AI backend."""
+
+import pytest
+from app.ai import chat
+from app.ai.circuit_breaker import CircuitOpenError
+
+GRANTS = [{"name": "Rent Tax Credit", "slug": "rent-tax-credit", "long_description": "Up to €1,000."}]
+
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    from app.config import get_settings
+
+    monkeypatch.setenv("AI_BACKEND", "fake")
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+def test_stream_matches_blocking_answer(fake_backend):
+    chunks = list(chat.stream_grant_answer("How do I claim?", {"county": "Cork"}, GRANTS))
+    assert len(chunks) > 1
+    assert "".join(chunks) == chat.answer_grant_question("How do I claim?", {"county": "Cork"}, GRANTS)
+
+
+def test_stream_falls_back_when_unavailable(monkeypatch):
+    monkeypatch.setattr(chat, "ai_available", lambda: False)
+    assert list(chat.stream_grant_answer("q", {}, GRANTS)) == [chat.UNAVAILABLE_MESSAGE]
+
+
+def test_stream_reports_errors_as_a_chunk(monkeypatch):
+    def broken(**kwargs):
+        yield "Partial"
+        raise CircuitOpenError("AI service temporarily unavailable")
+
+    monkeypatch.setattr(chat, "ai_available", lambda: True)
+    monkeypatch.setattr(chat, "stream_text", broken)
+    chunks = list(chat.stream_grant_answer("q", {}, GRANTS))
+    assert chunks[0] == "Partial"
+    assert "couldn't process your question" in chunks[1]
@@ -0,0 +1,66 @@
+"""Request deadlines and how the AI summary degrades under them."""
+
+import pytest
+
+from app.engine import ai_summary
+from app.utils.deadline import Deadline, DeadlineExceeded
+
+GRANTS = [{"name": "Rent Tax Credit", "match_type": "eligible", "max_amount": 1000, "category": "tax_relief"}]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+# ── Deadline ─────────────────────────────────────────────────────────────────
+
+def test_remaining_cap_and_reserve():
+    clock = FakeClock()
+    deadline = Deadline(10.0, clock)
+    clock.now += 4
+    assert deadline.remaining() == 6.0
+    assert deadline.cap(20.0) == 6.0
+    assert deadline.cap(2.0) == 2.0
+    child = deadline.reserve(5.0)
+    assert child.remaining() == 1.0
+    assert not child.allows(2.0)
+    clock.now += 10
+    assert deadline.remaining() == 0.0
+
+
+def test_check_raises_once_expired():
+    clock = FakeClock()
+    deadline = Deadline(1.0, clock)
+    deadline.check("match")
+    clock.now += 1
+    with pytest.raises(DeadlineExceeded):
+        deadline.check("render")
+
+
+# ── AI summary ───────────────────────────────────────────────────────────────
+
+def test_summary_falls_back_without_calling_upstream_when_budget_is_short(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ai_summary, "ai_available", lambda: True)
+    monkeypatch.setattr(ai_summary, "request_summary", lambda prompt, timeout: calls.append(timeout) or "AI text")
+
+    short = Deadline(0.5)
+    text = ai_summary.generate_ai_summary({"age": 30}, GRANTS, 1000, deadline=short)
+    assert text == ai_summary._fallback_summary({"age": 30}, GRANTS, 1000)
+    assert calls == []
+
+    ai_summary.summary_cache.clear()
+    assert ai_summary.generate_ai_summary({"age": 30}, GRANTS, 1000, deadline=Deadline(60)) == "AI text"
+    assert calls and calls[0] <= ai_summary.get_settings().AI_SUMMARY_TIMEOUT_SECONDS
+    ai_summary.summary_cache.clear()
+
+
+def test_background_summary_skipped_when_request_already_late(monkeypatch):
+    monkeypatch.setattr(ai_summary, "ai_available", lambda: True)
+    token, text = ai_summary.start_ai_summary({"age": 41}, GRANTS, 1000, deadline=Deadline(0))
+    assert token is None
+    assert text == ai_summary._fallback_summary({"age": 41}, GRANTS, 1000)
@@ -0,0 +1,64 @@
+"""Near-duplicate FAQ answer cache for grant-scoped chat."""
+
+from app.ai import chat
+from app.ai.faq_cache import FAQCache
+
+PROFILE = {"county": "Cork", "home_status": "renting", "employment_status": "employed"}
+FIELDS = ("county", "home_status", "employment_status")
+
+
+def _cache(**kwargs):
+    return FAQCache("test.faq", profile_fields=FIELDS, **kwargs)
+
+
+# ── Matching ─────────────────────────────────────────────────────────────────
+
+def test_near_duplicate_questions_share_an_answer():
+    cache = _cache()
+    cache.store("rent-tax-credit", "How do I apply for this grant?", PROFILE, "v1", "Use myAccount.")
+    assert cache.lookup("rent-tax-credit", "how can I apply for this grant", PROFILE, "v1") == "Use myAccount."
+    assert cache.lookup("rent-tax-credit", "What documents do I need?", PROFILE, "v1") is None
+
+
+def test_key_includes_slug_profile_fields_and_version():
+    cache = _cache()
+    cache.store("rent-tax-credit", "How do I apply?", PROFILE, "v1", "A")
+    assert cache.lookup("seai-heat-pump", "How do I apply?", PROFILE, "v1") is None
+    assert cache.lookup("rent-tax-credit", "How do I apply?", {**PROFILE, "county": "Dublin"}, "v1") is None
+    assert cache.lookup("rent-tax-credit", "How do I apply?", PROFILE, "v2") is None
+    # Fields the prompt doesn't use don't split the key
+    assert cache.lookup("rent-tax-credit", "How do I apply?", {**PROFILE, "age": 40}, "v1") == "A"
+
+
+def test_lru_eviction_is_bounded():
+    cache = _cache(maxsize=2)
+    cache.store("a", "first question here", PROFILE, "v1", "1")
+    cache.store("a", "second question here", PROFILE, "v1", "2")
+    cache.lookup("a", "first question here", PROFILE, "v1")
+    cache.store("a", "third question here", PROFILE, "v1", "3")
+    assert cache.stats()["entries"] == 2
+    assert cache.lookup("a", "second question here", PROFILE, "v1") is None
+    assert cache.lookup("a", "first question here", PROFILE, "v1") == "1"
+
+
+# ── Chat integration ─────────────────────────────────────────────────────────
+
+def test_cache_hit_skips_upstream_call(monkeypatch):
+    calls = []
+
+    def fake_create(**kwargs):
+        calls.append(kwargs)
+        from app.ai.fake import create_message
+        return create_message(**kwargs)
+
+    monkeypatch.setattr(chat, "faq_cache", _cache())
+    monkeypatch.setattr(chat, "ai_available", lambda: True)
+    monkeypatch.setattr(chat, "create_message", fake_create)
+    grants = [{"name": "Rent Tax Credit", "slug": "rent-tax-credit"}]
+    key = ("rent-tax-credit", "v1")
+
+    first = chat.answer_grant_question("How do I claim it?", PROFILE, grants, key)
+    second = chat.answer_grant_question("how do i claim it", PROFILE, grants, key)
+    streamed = list(chat.stream_grant_answer("How do I claim it?", PROFILE, grants, key))
+    assert first == second == "".join(streamed)
+    assert len(calls) == 1
@@ -0,0 +1,44 @@
+"""ReportLab fast-path renderer and renderer selection."""
+
+from app.reports import generator
+from app.reports.benchmark import SUMMARY, sample_grants
+from app.reports.fast_renderer import generate_report_bytes_fast
+from app.reports.store import report_key
+
+
+def _page_count(pdf: bytes) -> int:
+    return pdf.count(b"/Type /Page\n") or pdf.count(b"/Type /Page ")
+
+
+def test_renders_every_section():
+    grants = sample_grants(64)  # Whole seed catalogue: backdated table and claim guide included
+    pdf = generate_report_bytes_fast(grants, "someone@example.com", SUMMARY)
+    assert pdf.startswith(b"%PDF-")
+    assert pdf.rstrip().endswith(b"%%EOF")
+    assert _page_count(pdf) > 5
+
+
+def test_long_reports_flow_across_pages():
+    short = generate_report_bytes_fast(sample_grants(10))
+    long = generate_report_bytes_fast(sample_grants(200), ai_summary="Paragraph.\n\n" * 80)
+    assert _page_count(long) > _page_count(short)
+
+
+def test_text_outside_cp1252_does_not_fail():
+    grant = {**sample_grants(1)[0], "name": "Grant → ✓ ≥ 日本", "notes": "⁠odd"}
+    assert generate_report_bytes_fast([grant]).startswith(b"%PDF-")
+
+
+def test_generate_report_bytes_selects_renderer(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        "app.reports.fast_renderer.generate_report_bytes_fast",
+        lambda *args: calls.append(args) or b"%PDF-fast",
+    )
+    assert generator.generate_report_bytes(sample_grants(2), renderer="fast") == b"%PDF-fast"
+    assert len(calls) == 1
+
+
+def test_report_key_depends_on_renderer():
+    grants = sample_grants(3)
+    assert report_key(grants, renderer="fast") != report_key(grants, renderer="weasyprint")
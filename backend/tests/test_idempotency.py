@@ -0,0 +1,121 @@
+"""Idempotency-Key replays and in-flight duplicates."""
+
+import threading
+import uuid
+
+import pytest
+from fastapi import HTTPException, Response
+
+import app.api.reports
+from app.config import get_settings
+from app.models.email_outbox import EmailOutbox
+from app.models.scan_result import ScanResult
+from app.reports.store import ReportStore
+from app.utils.idempotency import request_fingerprint, run_idempotent
+
+
+def _run(key, compute, fingerprint="f", timeout=5.0):
+    response = Response()
+    return run_idempotent("test", key, fingerprint, response, compute, timeout), response
+
+
+def test_replay_returns_stored_response():
+    key = uuid.uuid4().hex
+    calls = []
+    first, _ = _run(key, lambda: calls.append(1) or {"n": len(calls)})
+    second, response = _run(key, lambda: calls.append(1) or {"n": len(calls)})
+    assert first == second == {"n": 1} and len(calls) == 1
+    assert response.headers["Idempotent-Replayed"] == "true"
+
+    # No key: every call runs
+    _run(None, lambda: calls.append(1))
+    _run(None, lambda: calls.append(1))
+    assert len(calls) == 3
+
+
+def test_key_reused_for_different_request_is_rejected():
+    key = uuid.uuid4().hex
+    _run(key, lambda: 1, fingerprint=request_fingerprint({"a": 1}))
+    assert request_fingerprint({"a": 1}) == request_fingerprint({"a": 1})
+    with pytest.raises(HTTPException) as e:
+        _run(key, lambda: 2, fingerprint=request_fingerprint({"a": 2}))
+    assert e.value.status_code == 422
+
+
+def test_concurrent_duplicate_waits_for_the_first():
+    key = uuid.uuid4().hex
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "done"
+
+    first = threading.Thread(target=_run, args=(key, slow))
+    first.start()
+    started.wait(5)
+    with pytest.raises(HTTPException) as e:
+        _run(key, slow, timeout=0.05)
+    assert e.value.status_code == 409
+
+    results = []
+    second = threading.Thread(target=lambda: results.append(_run(key, slow)[0]))
+    second.start()
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert results == ["done"] and len(calls) == 1
+
+
+def test_failed_request_is_not_stored():
+    key = uuid.uuid4().hex
+
+    def fail():
+        raise HTTPException(400, "nope")
+
+    with pytest.raises(HTTPException):
+        _run(key, fail)
+    assert _run(key, lambda: "ok")[0] == "ok"
+
+
+@pytest.fixture
+def fake_ai(monkeypatch):
+    monkeypatch.setenv("AI_BACKEND", "fake")
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+def test_scan_retry_replays_the_first_scan(client, db, scan_fixtures, auth_headers, fake_ai):
+    user, _, _ = scan_fixtures(3)
+    headers = {**auth_headers(user), "Idempotency-Key": uuid.uuid4().hex}
+
+    first = client.post("/api/v1/scan", headers=headers, params={"force": True})
+    retry = client.post("/api/v1/scan", headers=headers, params={"force": True})
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert db.query(ScanResult).filter(ScanResult.user_id == user.id).count() == 1
+
+
+def test_email_retry_queues_one_message_per_recipient(client, db, tmp_path, monkeypatch, fake_ai):
+    monkeypatch.setattr(app.api.reports, "get_provider", lambda: object())
+    monkeypatch.setattr(app.api.reports, "get_render_pool", lambda: None)
+    store = ReportStore(str(tmp_path / "reports"), max_bytes=2**24)
+    monkeypatch.setattr(app.api.reports, "get_report_store", lambda: store)
+    key = {"Idempotency-Key": uuid.uuid4().hex}
+    body = {"email": "a@example.com", "renderer": "fast", "profile": {"county": "Cork"}}
+
+    first = client.post("/api/v1/reports/email", headers=key, json=body)
+    retry = client.post("/api/v1/reports/email", headers=key, json=body)
+    assert first.status_code == retry.status_code == 202
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+    # The same key from another recipient is a different request, not a clash
+    other = client.post("/api/v1/reports/email", headers=key, json={**body, "email": "b@example.com"})
+    assert other.status_code == 202 and "Idempotent-Replayed" not in other.headers
+    assert db.query(EmailOutbox).count() == 2
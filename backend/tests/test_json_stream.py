@@ -0,0 +1,46 @@
+"""Incremental NDJSON / JSON-array reader used by batch scans."""
+
+import asyncio
+
+from app.utils.json_stream import iter_json_objects
+
+
+async def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def _read(data: bytes, size: int = 3, **kwargs) -> list:
+    async def collect():
+        return [
+            item if isinstance(item, dict) else f"error: {item}"
+            async for item in iter_json_objects(_chunks(data, size), **kwargs)
+        ]
+    return asyncio.run(collect())
+
+
+def test_ndjson_split_across_chunks_with_bad_lines():
+    data = '{"a": 1}\n\n{"b": "é"}\nnot json\n[1]\n{"c": 3}'.encode()
+    assert _read(data) == [
+        {"a": 1}, {"b": "é"}, "error: Invalid JSON: Expecting value",
+        "error: Expected a JSON object", {"c": 3},
+    ]
+
+
+def test_json_array_elements_stream_one_at_a_time():
+    data = b' [ {"a": 1} , {"b": [1, 2]},{"c": "x]y"} ] '
+    for size in (1, 4, len(data)):
+        assert _read(data, size) == [{"a": 1}, {"b": [1, 2]}, {"c": "x]y"}]
+    assert _read(b"[]") == []
+    assert _read(b"") == []
+
+
+def test_broken_array_ends_the_stream():
+    assert _read(b'[{"a": 1} {"b": 2}]') == [{"a": 1}, "error: Expected ',' or ']' between array elements"]
+    assert _read(b'[{"a": 1},') == [{"a": 1}, "error: Unterminated JSON array"]
+    assert _read(b'[{"a": 1}, 5, {"b": 2}]', 1) == [{"a": 1}, "error: Expected a JSON object", {"b": 2}]
+
+
+def test_oversized_line_is_skipped():
+    data = b'{"a": "' + b"x" * 200 + b'"}\n{"b": 1}\n'
+    assert _read(data, 16, max_object_bytes=64) == ["error: Line longer than 64 bytes", {"b": 1}]
@@ -0,0 +1,273 @@
+"""Outbound mail queue: batching, retries with backoff and permanent failures.
+
+Delivery runs end to end against a minimal in-process stand-in for the
+Resend HTTP API (``/emails`` and ``/emails/batch``); a real sink works the
+same way via ``RESEND_API_URL``, or ``SMTP_HOST`` for an SMTP one.
+"""
+
+import base64
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.mail.outbox import MailDispatcher, backoff_seconds, enqueue_email
+from app.mail.providers import MailProvider, ResendProvider, SendError
+from app.models.email_outbox import EmailOutbox
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'mail.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine, tables=[EmailOutbox.__table__])
+    return sessionmaker(bind=engine)
+
+
+def _enqueue(session_factory, n, attachment=None):
+    db = session_factory()
+    try:
+        for i in range(n):
+            enqueue_email(db, f"user{i}@example.com", f"Report {i}", "<p>Hi</p>",
+                          "GrantFinder_Report.pdf" if attachment else None, attachment)
+    finally:
+        db.close()
+
+
+def _statuses(session_factory):
+    db = session_factory()
+    try:
+        return sorted(r.status for r in db.query(EmailOutbox))
+    finally:
+        db.close()
+
+
+# ── Resend stand-in ──────────────────────────────────────────────────────────
+
+class _ResendHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests: list = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests.append((self.path, body))
+        if self.path == "/emails/batch":
+            payload = {"data": [{"id": f"b{i}"} for i in range(len(body))]}
+        elif "bounce" in body["to"][0]:
+            self.send_response(422)
+            payload = {"name": "validation_error", "message": "Invalid `to` field", "statusCode": 422}
+            data = json.dumps(payload).encode()
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        else:
+            payload = {"id": "e1"}
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def resend_sink():
+    _ResendHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ResendHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", _ResendHandler.requests
+    server.shutdown()
+
+
+def test_batches_plain_messages_and_sends_attachments_singly(session_factory, resend_sink):
+    url, requests = resend_sink
+    _enqueue(session_factory, 3)
+    _enqueue(session_factory, 1, attachment=b"%PDF-1.4 report")
+    provider = ResendProvider("re_test", url, "GrantFinder <reports@grantfinder.ie>", timeout=5)
+    dispatcher = MailDispatcher(session_factory, lambda: provider)
+
+    assert dispatcher.run_once() == 4
+    assert _statuses(session_factory) == ["sent"] * 4
+    paths = sorted(path for path, _ in requests)
+    assert paths == ["/emails", "/emails/batch"]
+    batch = next(body for path, body in requests if path == "/emails/batch")
+    assert len(batch) == 3
+    single = next(body for path, body in requests if path == "/emails")
+    assert base64.b64decode(single["attachments"][0]["content"]) == b"%PDF-1.4 report"
+
+    db = session_factory()
+    assert all(r.attachment is None and r.sent_at for r in db.query(EmailOutbox))
+    db.close()
+
+
+def test_rejected_address_fails_without_retry(session_factory, resend_sink):
+    url, _ = resend_sink
+    db = session_factory()
+    enqueue_email(db, "bounce@example.com", "Report", "<p>Hi</p>", "r.pdf", b"%PDF")
+    db.close()
+    provider = ResendProvider("re_test", url, "GrantFinder <reports@grantfinder.ie>", timeout=5)
+    MailDispatcher(session_factory, lambda: provider).run_once()
+
+    db = session_factory()
+    row = db.query(EmailOutbox).one()
+    assert (row.status, row.attempts) == ("failed", 1)
+    assert "Invalid" in row.last_error
+    db.close()
+
+
+# ── Retries ──────────────────────────────────────────────────────────────────
+
+class _FlakyProvider(MailProvider):
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def send(self, messages):
+        self.calls += 1
+        if self.calls <= self.failures:
+            return [SendError("503 Service Unavailable")] * len(messages)
+        return [None] * len(messages)
+
+
+def _make_due(session_factory):
+    db = session_factory()
+    db.query(EmailOutbox).update({"next_attempt_at": datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    db.close()
+
+
+def test_transient_failures_back_off_then_send(session_factory):
+    _enqueue(session_factory, 2)
+    provider = _FlakyProvider(failures=2)
+    dispatcher = MailDispatcher(session_factory, lambda: provider, retry_base=60, max_attempts=5)
+
+    assert dispatcher.run_once() == 2
+    assert _statuses(session_factory) == ["pending", "pending"]
+    assert dispatcher.run_once() == 0  # Not due yet
+
+    db = session_factory()
+    row = db.query(EmailOutbox).first()
+    assert row.attempts == 1
+    assert timedelta(seconds=50) < row.next_attempt_at - datetime.utcnow() < timedelta(seconds=70)
+    db.close()
+
+    for _ in range(2):
+        _make_due(session_factory)
+        dispatcher.run_once()
+    assert _statuses(session_factory) == ["sent", "sent"]
+
+
+def test_gives_up_after_max_attempts(session_factory):
+    _enqueue(session_factory, 1)
+    dispatcher = MailDispatcher(session_factory, lambda: _FlakyProvider(failures=99), max_attempts=3)
+    for _ in range(3):
+        _make_due(session_factory)
+        dispatcher.run_once()
+    assert _statuses(session_factory) == ["failed"]
+
+
+def test_backoff_doubles_up_to_cap():
+    assert 27 <= backoff_seconds(1, 30, 3600) <= 33
+    assert 108 <= backoff_seconds(3, 30, 3600) <= 132
+    assert backoff_seconds(20, 30, 3600) <= 3600 * 1.1
+
+
+def test_background_thread_delivers_and_recovers(session_factory):
+    _enqueue(session_factory, 1)
+    db = session_factory()
+    db.query(EmailOutbox).update({"status": "sending"})  # Left mid-send by a crash
+    db.commit()
+    db.close()
+
+    sent = threading.Event()
+
+    class _Provider(MailProvider):
+        def send(self, messages):
+            sent.set()
+            return [None] * len(messages)
+
+    dispatcher = MailDispatcher(session_factory, _Provider, interval=0.05)
+    dispatcher.start()
+    try:
+        assert sent.wait(5)
+    finally:
+        dispatcher.stop()
+    assert _statuses(session_factory) == ["sent"]
+
+
+def test_overlapping_dispatchers_send_each_message_once(session_factory):
+    _enqueue(session_factory, 3)
+    sent = []
+
+    class _Provider(MailProvider):
+        def send(self, messages):
+            sent.extend(m.to for m in messages)
+            return [None] * len(messages)
+
+    first = MailDispatcher(session_factory, _Provider)
+    second = MailDispatcher(session_factory, _Provider)
+    # The second dispatcher claims and sends the batch after the first one
+    # has selected it but before its claim UPDATE
+    engine = session_factory.kw["bind"]
+    raced = []
+
+    def _race(conn, cursor, statement, params, context, executemany):
+        if not raced and statement.lstrip().startswith("UPDATE email_outbox SET status"):
+            raced.append(True)
+            assert second.run_once() == 3
+
+    event.listen(engine, "before_cursor_execute", _race)
+    try:
+        assert first.run_once() == 0
+    finally:
+        event.remove(engine, "before_cursor_execute", _race)
+    assert sorted(sent) == [f"user{i}@example.com" for i in range(3)]
+    assert _statuses(session_factory) == ["sent"] * 3
+
+
+def test_recover_leaves_live_claims_alone(session_factory):
+    _enqueue(session_factory, 2)
+    db = session_factory()
+    rows = db.query(EmailOutbox).all()
+    rows[0].status, rows[0].claimed_at = "sending", datetime.utcnow()
+    rows[1].status, rows[1].claimed_at = "sending", datetime.utcnow() - timedelta(hours=1)
+    db.commit()
+    db.close()
+
+    assert MailDispatcher(session_factory, claim_timeout=600).recover() == 1
+    assert _statuses(session_factory) == ["pending", "sending"]
+
+
+def test_reclaimed_message_keeps_the_new_dispatchers_result(session_factory):
+    _enqueue(session_factory, 2)
+
+    class _Quick(MailProvider):
+        def send(self, messages):
+            return [None] * len(messages)
+
+    rescuer = MailDispatcher(session_factory, _Quick, claim_timeout=0)
+
+    class _Stuck(MailProvider):
+        def send(self, messages):
+            # Outlives its claim: another dispatcher requeues and delivers the batch
+            assert rescuer.recover() == 2
+            assert rescuer.run_once() == 2
+            return [SendError("timed out", retryable=True)] * len(messages)
+
+    assert MailDispatcher(session_factory, _Stuck).run_once() == 2
+    db = session_factory()
+    try:
+        rows = db.query(EmailOutbox).all()
+        assert [(r.status, r.attempts, r.claim_token) for r in rows] == [("sent", 1, None)] * 2
+    finally:
+        db.close()
@@ -0,0 +1,59 @@
+"""``alembic upgrade head`` on databases that predate the migrations."""
+
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, text
+
+from app.database import Base
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+
+def _upgrade(url: str) -> None:
+    config = Config(str(BACKEND / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND / "migrations"))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+
+
+def _columns(engine, table: str) -> set[str]:
+    return {c["name"] for c in inspect(engine).get_columns(table)}
+
+
+def test_upgrade_brings_an_existing_database_to_the_current_layout(tmp_path):
+    url = f"sqlite:///{tmp_path / 'old.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    # Roll the schema back to what create_all built before the migrations
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_scan_results_user_history"))
+        conn.execute(text("CREATE INDEX ix_scan_results_user_id ON scan_results (user_id)"))
+        for column in ("packed_matches", "profile_hash", "catalogue_version"):
+            conn.execute(text(f"ALTER TABLE scan_results DROP COLUMN {column}"))
+        conn.execute(text("ALTER TABLE eligibility_rules DROP COLUMN updated_at"))
+        # Neither table existed in the original schema
+        conn.execute(text("DROP TABLE email_outbox"))
+        conn.execute(text("DROP TABLE summary_archetypes"))
+
+    _upgrade(url)
+    assert {"packed_matches", "profile_hash", "catalogue_version"} <= _columns(engine, "scan_results")
+    assert "updated_at" in _columns(engine, "eligibility_rules")
+    for table in ("email_outbox", "summary_archetypes"):
+        assert _columns(engine, table) == set(Base.metadata.tables[table].columns.keys())
+    indexes = {i["name"] for i in inspect(engine).get_indexes("scan_results")}
+    assert "ix_scan_results_user_history" in indexes and "ix_scan_results_user_id" not in indexes
+
+    _upgrade(url)  # Already at head: nothing to do
+    engine.dispose()
+
+
+def test_upgrade_then_create_all_on_a_new_database(tmp_path):
+    url = f"sqlite:///{tmp_path / 'new.db'}"
+    _upgrade(url)
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)  # As at startup
+    for table in Base.metadata.sorted_tables:
+        assert _columns(engine, table.name) == set(table.columns.keys())
+    engine.dispose()
@@ -0,0 +1,32 @@
+"""Unit tests for token-budgeted prompt assembly."""
+
+from app.ai.prompt_builder import estimate_tokens, fit_to_budget, truncate_to_tokens
+
+
+def test_estimate_tokens_is_roughly_four_chars():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("a" * 401) == 101
+
+
+def test_truncate_prefers_sentence_boundary():
+    text = "First sentence is here. Second sentence is a lot longer than the first one."
+    out = truncate_to_tokens(text, 8)
+    assert out == "First sentence is here."
+    assert truncate_to_tokens("short", 10) == "short"
+
+
+def test_fit_orders_by_score_and_respects_budget():
+    entries = ["low " * 20, "high " * 20, "mid " * 20]
+    chosen = fit_to_budget(entries, budget=60, scores=[1, 3, 2])
+    assert chosen[0].startswith("high")
+    assert chosen[1].startswith("mid")
+    assert sum(estimate_tokens(c) for c in chosen) <= 60
+
+
+def test_fit_truncates_partial_entry_and_drops_rest():
+    entries = ["a " * 100, "b " * 100, "c " * 100]  # ~50 tokens each
+    chosen = fit_to_budget(entries, budget=90)
+    assert len(chosen) == 2
+    assert chosen[1].endswith("…")
+    assert fit_to_budget(entries, budget=60) == [entries[0]]
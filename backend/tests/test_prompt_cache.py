@@ -0,0 +1,73 @@
+"""Unit tests for the content-addressed prompt cache."""
+
+import threading
+import time
+
+import pytest
+from app.ai.prompt_cache import PromptCache
+
+
+def test_hit_skips_compute():
+    cache = PromptCache("test.hit")
+    calls = []
+    compute = lambda: calls.append(1) or "answer"  # noqa: E731
+
+    assert cache.get_or_compute("prompt", "model", compute) == "answer"
+    assert cache.get_or_compute("prompt", "model", compute) == "answer"
+    assert cache.peek("prompt", "other-model") is None
+    assert len(calls) == 1
+    assert cache.stats()["hits"] >= 1
+
+
+def test_concurrent_duplicates_coalesce():
+    cache = PromptCache("test.coalesce")
+    calls = []
+    release = threading.Event()
+
+    def slow():
+        calls.append(1)
+        release.wait(2)
+        return "shared"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("p", "m", slow)))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert results == ["shared"] * 5
+    assert len(calls) == 1
+
+
+def test_failures_are_not_cached():
+    cache = PromptCache("test.fail")
+
+    def boom():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("p", "m", boom)
+    assert cache.get_or_compute("p", "m", lambda: "ok") == "ok"
+
+
+
+def test_result_stored_after_the_first_lookup_is_used():
+    cache = PromptCache("test.late")
+    cache.get_or_compute("p", "m", lambda: "stored")
+    # Simulate a caller whose first lookup ran just before the leader stored
+    # its result and left _inflight
+    real_get = cache._cache.get
+    lookups = []
+
+    def get(key, default=None):
+        lookups.append(key)
+        return None if len(lookups) == 1 else real_get(key, default)
+
+    cache._cache.get = get
+    assert cache.get_or_compute("p", "m", lambda: "recomputed") == "stored"
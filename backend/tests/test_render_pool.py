@@ -0,0 +1,109 @@
+"""Worker-process PDF render pool: job lifecycle, recycling and crashes."""
+
+import os
+import time
+
+import pytest
+
+from app.reports.render_pool import RenderPool, RenderQueueFull
+
+
+# Module-level so spawned workers can import them by name
+def render_pid(**kwargs):
+    return f"{kwargs['label']}:{os.getpid()}".encode()
+
+
+def render_or_crash(**kwargs):
+    if kwargs.get("crash"):
+        os._exit(9)
+    if kwargs.get("fail"):
+        raise ValueError("bad template")
+    time.sleep(kwargs.get("sleep", 0))
+    return b"ok"
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def _make(render, **kwargs):
+        pool = RenderPool(render, **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield _make
+    for pool in pools:
+        pool.shutdown()
+
+
+def test_jobs_complete_and_workers_recycle(make_pool):
+    pool = make_pool(render_pid, workers=1, max_jobs=2)
+    outputs = [pool.render_sync(timeout=30, label=str(i)) for i in range(3)]
+    pids = [out.split(b":")[1] for out in outputs]
+    assert outputs[0].startswith(b"0:")
+    assert pids[0] == pids[1] != pids[2]
+    job_id = pool.submit(label="x")
+    pool.wait(job_id, timeout=30)
+    assert pool.status(job_id)["status"] == "done"
+    assert pool.result(job_id).startswith(b"x:")
+    assert pool.stats()["recycled"] >= 1
+
+
+def test_failures_and_crashes_fail_the_job(make_pool):
+    pool = make_pool(render_or_crash, workers=1, max_jobs=10)
+    with pytest.raises(RuntimeError, match="bad template"):
+        pool.render_sync(timeout=30, fail=True)
+    with pytest.raises(RuntimeError, match="worker died"):
+        pool.render_sync(timeout=30, crash=True)
+    # The replacement worker picks up new jobs
+    assert pool.render_sync(timeout=30) == b"ok"
+
+
+def test_queue_is_bounded(make_pool):
+    pool = make_pool(render_or_crash, workers=1, max_queue=0)
+    with pytest.raises(RenderQueueFull):
+        pool.submit()
+    assert pool.stats()["queue_depth"] == 0
+
+
+def test_sync_renders_keep_nothing_and_abandoned_jobs_are_dropped(make_pool):
+    pool = make_pool(render_or_crash, workers=1)
+    assert pool.render_sync(timeout=30) == b"ok"
+    assert len(pool._jobs) == 0  # The bytes went to the caller only
+
+    with pytest.raises(TimeoutError):
+        pool.render_sync(timeout=0.3, sleep=1)  # Rendering: result discarded
+    with pytest.raises(TimeoutError):
+        pool.render_sync(timeout=0.1)  # Queued behind it: cancelled
+    assert pool.queue_depth == 0
+
+    assert pool.render_sync(timeout=30) == b"ok"
+    assert len(pool._jobs) == 0 and not pool._futures
+
+
+def test_job_callbacks_and_precomputed_results(make_pool):
+    pool = make_pool(render_or_crash, workers=1)
+    stored = []
+    job_id = pool.submit(on_done=stored.append)
+    assert pool.wait(job_id, timeout=30) == b"ok"
+    deadline = time.monotonic() + 5
+    while not stored and time.monotonic() < deadline:
+        time.sleep(0.01)  # Callbacks run on the collector thread after the result
+    assert stored == [b"ok"]
+
+    cached_id = pool.completed(b"cached")
+    assert pool.status(cached_id)["status"] == "done"
+    assert pool.result(cached_id) == b"cached"
+
+
+def test_worker_dying_before_dispatch_keeps_the_job_queued(make_pool):
+    pool = make_pool(render_or_crash, workers=1)
+    with pool._lock:  # Keep the collector from noticing until we're done
+        worker = pool._workers[0]
+        worker.proc.kill()
+        worker.proc.join(5)
+        worker.proc.is_alive = lambda: True  # Passed the liveness check just before dying
+        job_id = pool.submit()
+        assert pool.queue_depth == 1 and worker.retiring
+        del worker.proc.is_alive
+    assert pool.wait(job_id, timeout=30) == b"ok"  # Picked up by the replacement
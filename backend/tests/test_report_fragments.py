@@ -0,0 +1,35 @@
+"""Report HTML rendering with cached per-grant fragments."""
+
+from app.reports import generator
+from app.utils import metrics
+
+GRANTS = [
+    {
+        "name": "Rent Tax Credit", "slug": "rent-tax-credit", "category": "tax_relief",
+        "match_type": "eligible", "max_amount": 1000, "amount_description": "Up to €1,000",
+        "short_description": "Claim back rent.", "source_url": "https://revenue.ie",
+        "application_url": None, "notes": "", "estimated_annual_saving": 1000,
+        "estimated_backdated_saving": 4000, "savings_note": "€1,000/year",
+        "how_to_claim": "Log in to myAccount.",
+    },
+]
+
+
+def test_cached_fragments_render_the_same_html():
+    generator._fragments.clear()
+    uncached = generator.render_report_html(GRANTS, ai_summary="Hi")
+    hits = metrics.get_counter("report.fragments.hits")
+    first = generator.render_report_html(GRANTS, ai_summary="Hi", catalogue_version="v1")
+    second = generator.render_report_html(GRANTS, ai_summary="Hi", catalogue_version="v1")
+    assert uncached == first == second
+    assert metrics.get_counter("report.fragments.hits") == hits + 2  # grant card + claim card
+    assert 'class="grant-card"' in first and "Log in to myAccount." in first
+
+
+def test_per_user_fields_are_part_of_the_key():
+    generator._fragments.clear()
+    generator.render_report_html(GRANTS, catalogue_version="v1")
+    likely = [{**GRANTS[0], "match_type": "likely", "estimated_annual_saving": 500}]
+    html = generator.render_report_html(likely, catalogue_version="v1")
+    assert "badge-likely" in html
+    assert "saves €500/year" in html
@@ -0,0 +1,104 @@
+"""Content-addressed report cache: disk L1 eviction and an S3 L2.
+
+The L2 tests run boto3 against a minimal in-process S3 stand-in (PUT, GET
+and HEAD on path-style URLs); any S3-compatible server works the same way
+via ``AWS_S3_ENDPOINT_URL``.
+"""
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.request import urlopen
+
+import pytest
+
+from app.reports.store import ReportStore, report_key
+from app.utils import s3
+
+GRANTS = [{"name": "Rent Tax Credit", "slug": "rent-tax-credit", "max_amount": 1000}]
+
+
+# ── Keys and L1 ──────────────────────────────────────────────────────────────
+
+def test_key_covers_render_inputs_only():
+    base = report_key(GRANTS, ai_summary="Hi")
+    assert report_key(GRANTS, ai_summary="Hi", catalogue_version="v9") == base
+    assert report_key(GRANTS, ai_summary="Hello") != base
+    assert report_key(GRANTS, user_label="a@b.ie", ai_summary="Hi") != base
+
+
+def test_l1_evicts_least_recently_used(tmp_path):
+    store = ReportStore(str(tmp_path), max_bytes=250)
+    store.put("a", b"x" * 100)
+    store.put("b", b"x" * 100)
+    os.utime(tmp_path / "a.pdf", (1, 1))
+    os.utime(tmp_path / "b.pdf", (2, 2))
+    assert store.get("a") is not None  # Touch "a" so "b" is now oldest
+    store.put("c", b"x" * 100)
+    assert store.get("b") is None
+    assert store.get("a") is not None and store.get("c") is not None
+    assert store.stats()["l1_bytes"] == 200
+
+
+# ── L2 against a local S3 stand-in ───────────────────────────────────────────
+
+class _S3Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    objects: dict = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _key(self):
+        return self.path.split("?", 1)[0]
+
+    def _reply(self, status, body=b""):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_PUT(self):
+        self.objects[self._key()] = self.rfile.read(int(self.headers["Content-Length"]))
+        self._reply(200)
+
+    def do_GET(self):
+        body = self.objects.get(self._key())
+        if body is None:
+            return self._reply(404, b"<Error><Code>NoSuchKey</Code></Error>")
+        self._reply(200, body)
+
+    def do_HEAD(self):
+        self._reply(200 if self._key() in self.objects else 404)
+
+
+@pytest.fixture
+def local_s3(monkeypatch):
+    _S3Handler.objects = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _S3Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(s3.settings, "AWS_S3_ENDPOINT_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(s3.settings, "AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setattr(s3.settings, "AWS_SECRET_ACCESS_KEY", "test")
+    yield _S3Handler.objects
+    server.shutdown()
+
+
+def test_l2_fills_a_cold_l1(tmp_path, local_s3):
+    warm = ReportStore(str(tmp_path / "one"), max_bytes=10_000, remote=True)
+    warm.put("k1", b"%PDF-1", wait=True)
+    assert "/grantfinder-reports/report-cache/k1.pdf" in local_s3
+
+    cold = ReportStore(str(tmp_path / "two"), max_bytes=10_000, remote=True)
+    assert cold.get("k1") == b"%PDF-1"
+    assert cold.get_local("k1") == b"%PDF-1"
+    assert cold.get("missing") is None
+
+
+def test_presigned_url_uploads_on_demand(tmp_path, local_s3):
+    store = ReportStore(str(tmp_path), max_bytes=10_000, remote=True)
+    assert store.presigned_url("k2") is None  # Nothing anywhere yet
+    url = store.presigned_url("k2", b"%PDF-2")
+    with urlopen(url) as resp:
+        assert resp.read() == b"%PDF-2"
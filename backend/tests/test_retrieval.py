@@ -0,0 +1,57 @@
+"""Unit tests for the BM25 grant retrieval index used by chat."""
+
+import json
+import os
+from types import SimpleNamespace
+
+from app.ai.retrieval import GrantIndex, get_index, tokenize
+
+SEED_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "grants_seed.json")
+
+
+def _catalogue(version="v1"):
+    with open(SEED_FILE) as f:
+        grants = [{**g, "id": g["slug"]} for g in json.load(f)]
+    return SimpleNamespace(version=version, grants=grants)
+
+
+def test_tokenize_drops_stopwords_and_plurals():
+    assert tokenize("How do I claim the Rent Tax Credits?") == ["claim", "rent", "tax", "credit"]
+
+
+def test_search_ranks_by_relevance():
+    index = GrantIndex.build("v1", _catalogue().grants)
+    results = index.search("solar panels on my house", k=3)
+    assert results
+    assert "solar" in results[0]["slug"]
+
+
+def test_scan_boost_prefers_scanned_grants_and_fills_slots():
+    index = GrantIndex.build("v1", _catalogue().grants)
+    plain = [g["id"] for g in index.search("tax credit", k=5)]
+    target = plain[3]
+    boosted = [g["id"] for g in index.search("tax credit", k=5, boost={target: 1.0})]
+    assert boosted.index(target) < plain.index(target)
+
+    fill = index.search("zzzz unmatched words", k=2, boost={"unknown": 0.2, plain[0]: 0.9})
+    assert [g["id"] for g in fill] == [plain[0], next(g["id"] for g in index.defaults if g["id"] != plain[0])]
+
+
+def test_generic_question_is_topped_up_with_the_highest_value_grants():
+    grants = _catalogue().grants
+    index = GrantIndex.build("v1", grants)
+    top = max(g.get("max_amount") or 0 for g in grants)
+
+    unmatched = index.search("zzzz nothing", k=3)
+    assert len(unmatched) == 3 and unmatched[0]["max_amount"] == top
+    assert unmatched == index.search("zzzz nothing", k=3)
+
+    generic = index.search("what am I entitled to?", k=10)
+    assert len(generic) == 10
+    assert len({g["id"] for g in generic}) == 10
+
+
+def test_index_rebuilt_per_catalogue_version():
+    first = get_index(_catalogue("v1"))
+    assert get_index(_catalogue("v1")) is first
+    assert get_index(_catalogue("v2")) is not first
@@ -0,0 +1,98 @@
+"""Unit tests for the data-driven savings rule registry."""
+
+import json
+import os
+
+import pytest
+from app.engine import savings
+from app.engine.savings import calculate_savings, compile_registry, load_registry
+
+
+# ── Per-slug calculators ─────────────────────────────────────────────────────
+
+def test_dependent_relative_per_unit():
+    result = calculate_savings(
+        "dependent-relative-tax-credit", 305, "", "20-40k", {"num_dependent_relatives": 2}
+    )
+    assert result["estimated_annual_saving"] == 610.0
+    assert result["estimated_backdated_saving"] == 2440.0
+    assert result["savings_note"].startswith("€305 x 2 dependent relatives = €610/year")
+
+
+def test_child_benefit_plural():
+    one = calculate_savings("child-benefit", None, "", None, {"num_children": 1})
+    three = calculate_savings("child-benefit", None, "", None, {"num_children": 3})
+    assert one["savings_note"] == "€140/month x 1 child = €1,680/year"
+    assert three["savings_note"] == "€140/month x 3 children = €5,040/year"
+    assert three["estimated_backdated_saving"] is None
+
+
+def test_married_couple_gets_double_rent_credit():
+    result = calculate_savings("rent-tax-credit", 1000, "", None, {"marital_status": "married"})
+    assert result["estimated_annual_saving"] == 2000.0
+    assert result["estimated_backdated_saving"] == 8000.0
+
+
+def test_marginal_relief_uses_income_bracket():
+    low = calculate_savings("nursing-home-expenses-tax-relief", None, "", "<20k", {})
+    high = calculate_savings("nursing-home-expenses-tax-relief", None, "", "80k+", {})
+    assert "(20%)" in low["savings_note"]
+    assert "(40%)" in high["savings_note"]
+    assert high["estimated_annual_saving"] is None
+
+
+def test_unknown_slug_falls_back_to_max_amount():
+    credit = calculate_savings("some-credit", 500, "", None, {})
+    grant = calculate_savings("some-grant", 25000, "Up to €25,000", None, {})
+    assert credit["savings_note"] == "€500/year direct tax reduction"
+    assert grant["savings_note"] == "Up to €25,000"
+    assert calculate_savings("nothing", None, "", None, {})["estimated_annual_saving"] is None
+
+
+# ── Registry loading ─────────────────────────────────────────────────────────
+
+def test_unknown_kind_is_rejected():
+    data = {"income_tax_rates": {"40-60k": {"marginal_rate": 0.4}}, "rules": {"x": {"kind": "magic"}}}
+    with pytest.raises(ValueError):
+        compile_registry(data, "test")
+
+
+def test_registry_reloads_when_file_changes(tmp_path, monkeypatch):
+    with open(savings.SAVINGS_RULES_FILE) as f:
+        data = json.load(f)
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(data))
+
+    monkeypatch.setattr(savings, "SAVINGS_RULES_FILE", str(path))
+    monkeypatch.setattr(savings, "RELOAD_CHECK_INTERVAL", 0.0)
+    monkeypatch.setattr(savings, "_registry", None)
+
+    before = savings.get_registry()
+    assert before.calculators.get("new-credit") is None
+
+    data["rules"]["new-credit"] = {"kind": "fixed", "amount": 100, "note": "€100/year", "backdate_years": 2}
+    path.write_text(json.dumps(data))
+    mtime = os.path.getmtime(path)
+    os.utime(path, (mtime + 10, mtime + 10))
+
+    after = savings.get_registry()
+    assert after.version != before.version
+    assert after.calculate("new-credit", None, "", None, {})["estimated_backdated_saving"] == 200.0
+
+
+def test_bad_reload_keeps_previous_registry(tmp_path, monkeypatch):
+    path = tmp_path / "rules.json"
+    path.write_text(open(savings.SAVINGS_RULES_FILE).read())
+
+    monkeypatch.setattr(savings, "SAVINGS_RULES_FILE", str(path))
+    monkeypatch.setattr(savings, "RELOAD_CHECK_INTERVAL", 0.0)
+    monkeypatch.setattr(savings, "_registry", None)
+
+    good = savings.get_registry()
+    path.write_text("{not json")
+    mtime = os.path.getmtime(path)
+    os.utime(path, (mtime + 10, mtime + 10))
+
+    assert savings.get_registry() is good
+    with pytest.raises(ValueError):
+        load_registry(str(path))
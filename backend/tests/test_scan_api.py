@@ -0,0 +1,116 @@
+"""Scan endpoints over HTTP: conditional /results, history paging and streamed batches."""
+
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+from starlette.background import BackgroundTask
+
+from app.api.scan import _DuplexStreamingResponse
+from app.engine.scan_store import save_scan
+from app.models.grant import Grant
+from app.models.scan_result import ScanResult
+
+
+def test_results_etag_follows_catalogue_changes(client, db, scan_fixtures, auth_headers):
+    user, profile, results = scan_fixtures(3)
+    scan_id = save_scan(db, user.id, profile.id, results)
+    db.commit()
+    headers = auth_headers(user)
+
+    first = client.get("/api/v1/scan/results", headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.json()["scan_id"] == str(scan_id)
+
+    # Re-reads share the scan's handle rather than minting one each
+    reread = client.get("/api/v1/scan/results", headers=headers)
+    assert reread.json()["scan_handle"] == first.json()["scan_handle"] is not None
+
+    again = client.get("/api/v1/scan/results", headers={**headers, "If-None-Match": etag})
+    assert again.status_code == 304 and again.headers["ETag"] == etag
+
+    # Edited behind the app's back (another process), so nothing invalidates the snapshot
+    grant = db.query(Grant).filter(Grant.slug == results[0].slug).one()
+    grant.max_amount = 999
+    db.commit()
+    changed = client.get("/api/v1/scan/results", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+
+
+def test_history_pages_with_cursor(client, db, scan_fixtures, auth_headers):
+    user, profile, results = scan_fixtures(5)
+    scan_ids = []
+    for n in range(1, 6):
+        scan_id = save_scan(db, user.id, profile.id, results[:n])
+        db.get(ScanResult, scan_id).created_at = datetime(2026, 1, n)  # No ties for the id to break
+        db.commit()
+        scan_ids.append(scan_id)
+    headers = auth_headers(user)
+
+    seen, cursor = [], None
+    while True:
+        params = {"per_page": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/v1/scan/history", headers=headers, params=params)
+        assert page.status_code == 200
+        body = page.json()
+        seen.extend(body["scans"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert [s["id"] for s in seen] == [str(i) for i in reversed(scan_ids)]
+    assert [s["grants_delta"] for s in seen] == [1, 1, 1, 1, None]
+
+    bad = client.get("/api/v1/scan/history", headers=headers, params={"cursor": "not-a-cursor"})
+    assert bad.status_code == 400
+
+
+def _batch(client, headers, body: bytes) -> list[dict]:
+    response = client.post("/api/v1/scan/anonymous/batch", headers=headers, content=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.mark.parametrize("layout", ["ndjson", "array"])
+def test_batch_streams_one_line_per_profile(client, scan_fixtures, auth_headers, layout):
+    user, _, _ = scan_fixtures(3)
+    profiles = [{"county": "Cork"}, {"age": "not a number"}, {"pays_rent": True}]
+    if layout == "ndjson":
+        body = "\n".join(json.dumps(p) for p in profiles) + "\n"
+    else:
+        body = json.dumps(profiles)
+
+    lines = _batch(client, auth_headers(user), body.encode())
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    assert "result" in lines[0] and "result" in lines[2]
+    assert lines[1]["error"] == "Invalid profile" and lines[1]["details"][0]["loc"] == ["age"]
+
+
+def test_batch_reports_unparseable_lines(client, scan_fixtures, auth_headers):
+    user, _, _ = scan_fixtures(1)
+    lines = _batch(client, auth_headers(user), b'{"county": "Cork"}\n{not json}\n')
+    assert "result" in lines[0]
+    assert lines[1]["index"] == 1 and "error" in lines[1]
+
+
+def test_duplex_response_runs_background_and_keeps_errors():
+    ran = []
+
+    async def body(fail: bool):
+        yield b"line\n"
+        if fail:
+            raise OSError("disk full")
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "asgi": {"spec_version": "2.3"}}
+    ok = _DuplexStreamingResponse(body(False), background=BackgroundTask(ran.append, 1))
+    asyncio.run(ok(scope, None, send))
+    assert ran == [1]
+
+    failing = _DuplexStreamingResponse(body(True))
+    with pytest.raises(OSError, match="disk full"):
+        asyncio.run(failing(scope, None, send))
@@ -0,0 +1,56 @@
+"""Diffing scans from their id/score vectors."""
+
+import dataclasses
+
+from app.engine.matcher import MatchType
+from app.engine.scan_diff import diff_against_results, diff_scans, diff_vectors, match_vector, scan_head
+from app.engine.scan_store import save_scan
+
+
+def test_merge_classifies_every_grant(scan_fixtures):
+    _, _, results = scan_fixtures(6)
+    before = results[:4]
+    after = [
+        dataclasses.replace(results[0], match_type=MatchType.ELIGIBLE),  # Was eligible: unchanged
+        dataclasses.replace(results[1], match_type=MatchType.ELIGIBLE),  # Likely -> eligible
+        dataclasses.replace(results[2], match_type=MatchType.NOT_ELIGIBLE),  # Possible -> not eligible
+        dataclasses.replace(results[3], match_score=results[3].match_score - 10),
+        results[4],
+        results[5],
+    ]
+    diff = diff_vectors(match_vector(before), match_vector(after), 10, 25)
+    ids = lambda changes: sorted(str(c.grant_id) for c in changes)  # noqa: E731
+    assert diff.unchanged == 1
+    assert ids(diff.upgraded) == [results[1].grant_id]
+    assert diff.upgraded[0].match_type_before == "likely"
+    assert ids(diff.downgraded) == [results[2].grant_id]
+    assert ids(diff.rescored) == [results[3].grant_id]
+    assert ids(diff.added) == sorted([results[4].grant_id, results[5].grant_id])
+    assert diff.removed == []
+    assert diff.value_delta == 15 and diff.has_changes
+
+    reverse = diff_vectors(match_vector(after), match_vector(before))
+    assert ids(reverse.removed) == ids(diff.added)
+    assert ids(reverse.upgraded) == ids(diff.downgraded)
+
+
+def test_diff_stored_scans_across_layouts(db, scan_fixtures):
+    user, profile, results = scan_fixtures(40)
+    first = save_scan(db, user.id, profile.id, results[:30], packed=False)
+    db.commit()
+    second = save_scan(db, user.id, profile.id, results[10:], packed=True)
+    db.commit()
+
+    latest = scan_head(db, user.id)
+    assert latest.id == second
+    previous = scan_head(db, user.id, older_than=latest)
+    assert previous.id == first
+    assert scan_head(db, user.id, older_than=previous) is None
+
+    diff = diff_scans(db, previous, latest)
+    assert len(diff.removed) == 10 and len(diff.added) == 10
+    assert diff.unchanged == 20 and not (diff.upgraded or diff.downgraded or diff.rescored)
+    assert diff.value_delta == sum(r.max_amount for r in results[30:]) - sum(r.max_amount for r in results[:10])
+
+    # A fresh match identical to the stored one shows no change
+    assert not diff_against_results(db, latest, results[10:]).has_changes
@@ -0,0 +1,107 @@
+"""Scan handles: report endpoints reusing a scan's materialised results."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.api import reports, scan
+from app.engine import scan_handles
+from app.engine.scan_handles import MaterialisedScan, create_handle, get_handle, ready_summary
+from app.schemas.scan import AnonymousScanRequest
+from app.utils.deadline import Deadline
+
+GRANTS = [{"name": "Rent Tax Credit", "slug": "rent-tax-credit", "max_amount": 1000}]
+
+
+def _scan(**overrides) -> MaterialisedScan:
+    fields = dict(
+        profile={"home_status": "renting"},
+        matched_grants=GRANTS,
+        total_value=1000.0,
+        catalogue_version="v1",
+        summary="Pre-generated summary",
+        summary_token=None,
+    )
+    return MaterialisedScan(**{**fields, **overrides})
+
+
+def test_handle_ignored_after_catalogue_change():
+    handle = create_handle(_scan())
+    assert get_handle(handle, "v1").matched_grants == GRANTS
+    assert get_handle(handle, "v2") is None
+    assert get_handle("unknown", "v1") is None
+
+
+def test_keyed_handles_are_reused(monkeypatch):
+    jobs = {"t": {"status": "pending", "summary": "Template summary"}}
+    monkeypatch.setattr(scan_handles, "get_ai_summary", jobs.get)
+    first = create_handle(_scan(summary="", summary_token="t"), key=("scan-1", "v1"))
+    # A re-read without the job doesn't replace the handle's pending summary...
+    assert create_handle(_scan(summary=""), key=("scan-1", "v1")) == first
+    assert get_handle(first, "v1").summary_token == "t"
+    # ...but one with the stored summary does
+    assert create_handle(_scan(summary="Stored"), key=("scan-1", "v1")) == first
+    assert ready_summary(get_handle(first, "v1")) == "Stored"
+
+    assert create_handle(_scan(), key=("scan-1", "v2")) != first
+    assert create_handle(_scan()) != create_handle(_scan())
+
+
+def test_ready_summary_waits_for_background_job(monkeypatch):
+    jobs = {"t": {"status": "pending", "summary": "Template summary"}}
+    monkeypatch.setattr(scan_handles, "get_ai_summary", jobs.get)
+    scan = _scan(summary_token="t")
+    assert ready_summary(scan) is None
+    jobs["t"] = {"status": "ready", "summary": "AI summary"}
+    assert ready_summary(scan) == "AI summary"
+    assert ready_summary(_scan()) == "Pre-generated summary"  # No job
+    assert ready_summary(_scan(summary="")) is None  # Only the template was available
+
+
+@pytest.fixture
+def catalogue(monkeypatch):
+    snapshot = SimpleNamespace(version="v1")
+    monkeypatch.setattr(reports, "get_catalogue", lambda db: snapshot)
+    return snapshot
+
+
+def test_report_inputs_skip_recomputation_with_handle(monkeypatch, catalogue):
+    def _fail(*args, **kwargs):
+        raise AssertionError("recomputed")
+
+    monkeypatch.setattr(reports, "_build_report_data", _fail)
+    monkeypatch.setattr(reports, "_report_summary", _fail)
+    handle = create_handle(_scan())
+    grants, total, version, summary = reports._report_inputs(
+        AnonymousScanRequest(), handle, db=None, deadline=Deadline(30)
+    )
+    assert (grants, total, version, summary) == (GRANTS, 1000.0, "v1", "Pre-generated summary")
+
+
+def test_report_inputs_recompute_when_handle_stale(monkeypatch, catalogue):
+    monkeypatch.setattr(
+        reports, "_build_report_data", lambda body, db, deadline: ([], {}, 0.0, "v1")
+    )
+    monkeypatch.setattr(reports, "_report_summary", lambda *args: "Fresh summary")
+    handle = create_handle(_scan(catalogue_version="v0"))
+    assert reports._report_inputs(AnonymousScanRequest(), handle, None, Deadline(30)) == (
+        [], 0.0, "v1", "Fresh summary"
+    )
+
+
+@pytest.mark.parametrize("token, text, cached, kept", [
+    (None, "Template", False, ""),  # No AI: the report should try again
+    (None, "Cached AI", True, "Cached AI"),
+    ("t", "Template", False, ""),  # The job's result is picked up by token
+])
+def test_handle_keeps_only_a_final_summary(monkeypatch, token, text, cached, kept):
+    def start(profile, grants, total, on_ready=None, deadline=None):
+        if cached:
+            on_ready(text)
+        return token, text
+
+    monkeypatch.setattr(scan, "lookup_summary", lambda *args: None)
+    monkeypatch.setattr(scan, "start_ai_summary", start)
+    response = scan._build_response([], {}, catalogue_version="v1")
+    assert response.summary == text
+    assert get_handle(response.scan_handle, "v1").summary == kept
@@ -0,0 +1,155 @@
+"""Bulk scan persistence."""
+
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from app.engine.catalogue import get_catalogue
+from app.engine.scan_store import (
+    backfill_packed, latest_unchanged_scan, load_matches, pack_matches,
+    cached_latest_scan, decode_cursor, forget_latest_scan, history_page, profile_hash, remember_latest_scan, save_scan,
+    stored_results, summary_stored, unpack_matches,
+)
+from app.models.scan_result import ScanResult, ScanResultGrant
+
+
+def test_save_scan_writes_matches_in_one_executemany(engine, db, scan_fixtures):
+    user, profile, results = scan_fixtures(120)
+    user_id, profile_id = user.id, profile.id
+
+    statements = []
+    event.listen(
+        engine, "before_cursor_execute",
+        lambda conn, cursor, stmt, params, context, executemany: statements.append(stmt),
+    )
+    scan_id = save_scan(db, user_id, profile_id, results)
+    db.commit()
+    assert len(statements) == 2  # Scan row + one executemany for the matches
+
+    scan = db.get(ScanResult, scan_id)
+    assert scan.total_grants == 120
+    assert float(scan.total_value) == sum(r.max_amount for r in results)
+    rows = (
+        db.query(ScanResultGrant)
+        .filter(ScanResultGrant.scan_result_id == scan_id)
+        .order_by(ScanResultGrant.sort_order)
+        .all()
+    )
+    assert [str(r.grant_id) for r in rows] == [r.grant_id for r in results]
+    assert rows[0].grant.name == results[0].grant_name
+    assert len({r.id for r in rows}) == 120
+
+
+def test_save_scan_without_matches(db, scan_fixtures):
+    user, profile, _ = scan_fixtures(0)
+    scan_id = save_scan(db, user.id, profile.id, [])
+    db.commit()
+    assert db.get(ScanResult, scan_id).total_grants == 0
+
+
+def test_packed_round_trip_keeps_rank_scores_and_notes(db, scan_fixtures):
+    user, profile, results = scan_fixtures(300)
+    rows_id = save_scan(db, user.id, profile.id, results, packed=False)
+    packed_id = save_scan(db, user.id, profile.id, results, packed=True)
+    db.commit()
+
+    packed_scan = db.get(ScanResult, packed_id)
+    assert db.query(ScanResultGrant).filter(ScanResultGrant.scan_result_id == packed_id).count() == 0
+    as_rows = load_matches(db, db.get(ScanResult, rows_id))
+    as_packed = load_matches(db, packed_scan)
+    assert [(m.grant_id, m.match_type, m.sort_order) for m in as_packed] == \
+        [(m.grant_id, m.match_type, m.sort_order) for m in as_rows]
+    assert [m.match_score for m in as_packed] == [m.match_score for m in as_rows]
+    assert [m.notes or "" for m in as_packed] == [r.notes for r in results]
+    # About 20 bytes a match: the note is stored once, only the grant ids don't compress
+    assert len(packed_scan.packed_matches) < 300 * 24
+
+
+def test_unpack_empty_and_unknown_version():
+    assert unpack_matches(pack_matches([])) == []
+    with pytest.raises(ValueError):
+        unpack_matches(b"\x09" + pack_matches([])[1:])
+
+
+def test_backfill_packs_row_scans_and_deletes_rows(db, scan_fixtures):
+    user, profile, results = scan_fixtures(40)
+    ids = [save_scan(db, user.id, profile.id, results[:n], packed=False) for n in (40, 10, 0)]
+    db.commit()
+    before = {i: load_matches(db, db.get(ScanResult, i)) for i in ids}
+
+    assert backfill_packed(db, batch_size=2) == {"scans": 3, "rows_packed": 50}
+    db.expire_all()
+    assert db.query(ScanResultGrant).count() == 0
+    for i in ids:
+        scan = db.get(ScanResult, i)
+        assert scan.packed_matches is not None
+        assert load_matches(db, scan) == before[i]
+    assert backfill_packed(db) == {"scans": 0, "rows_packed": 0}
+
+
+def test_unchanged_scan_is_found_and_rebuilt_from_catalogue(db, scan_fixtures):
+    user, profile, results = scan_fixtures(30)
+    catalogue = get_catalogue(db)
+    digest = profile_hash({"age": 70, "county": "Cork"})
+    assert digest == profile_hash({"county": "Cork", "age": 70})
+
+    scan_id = save_scan(db, user.id, profile.id, results, packed=True,
+                        profile_digest=digest, catalogue_version=catalogue.version)
+    db.commit()
+
+    previous = latest_unchanged_scan(db, user.id, profile.id, digest, catalogue.version)
+    assert previous.id == scan_id
+    rebuilt = stored_results(db, previous, catalogue)
+    assert [(r.grant_id, r.grant_name, r.match_type, r.match_score, r.notes) for r in rebuilt] == \
+        [(r.grant_id, r.grant_name, r.match_type, r.match_score, r.notes) for r in results]
+
+    assert latest_unchanged_scan(db, user.id, profile.id, profile_hash({"age": 71}), catalogue.version) is None
+    assert latest_unchanged_scan(db, user.id, profile.id, digest, "other-version") is None
+    # Only the latest scan counts
+    save_scan(db, user.id, profile.id, results[:5], profile_digest="x", catalogue_version=catalogue.version)
+    db.commit()
+    assert latest_unchanged_scan(db, user.id, profile.id, digest, catalogue.version) is None
+
+    # A grant that left the catalogue means the scan must be recomputed
+    missing = catalogue.__class__(
+        version=catalogue.version, content_hash="", savings_version="",
+        by_id={k: v for k, v in catalogue.by_id.items() if k != results[0].grant_id},
+    )
+    assert stored_results(db, previous, missing) is None
+    assert len(stored_results(db, previous, missing, skip_missing=True)) == 29
+
+
+def test_latest_scan_cache_tracks_summary():
+    user_id, scan_id, newer_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    remember_latest_scan(user_id, scan_id, False)
+    summary_stored(user_id, scan_id)
+    assert cached_latest_scan(user_id) == (scan_id, True)
+
+    remember_latest_scan(user_id, newer_id, False)
+    summary_stored(user_id, scan_id)  # An older scan's summary doesn't count
+    assert cached_latest_scan(user_id) == (newer_id, False)
+    forget_latest_scan(user_id)
+    assert cached_latest_scan(user_id) is None
+
+
+def test_history_pages_by_cursor_with_deltas(db, scan_fixtures):
+    user, profile, results = scan_fixtures(10)
+    for n in (2, 5, 5, 3, 8):
+        save_scan(db, user.id, profile.id, results[:n])
+    db.commit()
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        entries, cursor = history_page(db, user.id, 2, cursor)
+        seen.extend(entries)
+        pages += 1
+        if cursor is None:
+            break
+    assert pages == 3
+    assert [e.total_grants for e in seen] == [8, 3, 5, 5, 2]
+    assert [e.grants_delta for e in seen] == [5, -2, 0, 3, None]
+    assert len({e.id for e in seen}) == 5
+
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
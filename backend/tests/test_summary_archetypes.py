@@ -0,0 +1,94 @@
+"""Archetype clustering and lookup for pre-generated AI summaries."""
+
+import threading
+
+from app.engine import summary_archetypes as sa
+from app.engine.catalogue import CatalogueSnapshot
+
+GRANTS = [
+    {
+        "id": "rent", "name": "Rent Tax Credit", "slug": "rent-tax-credit",
+        "short_description": "", "category": "tax_relief", "max_amount": 1000,
+        "amount_description": "Up to €1,000", "source_organisation": "Revenue",
+        "source_url": "https://example.com", "application_url": None,
+        "eligibility_rules": [{
+            "rule_group": 0, "field": "home_status", "operator": "eq", "value": "renting",
+            "description": "Renting", "is_mandatory": True,
+        }],
+    },
+]
+CATALOGUE = CatalogueSnapshot("v1", "c", "s", GRANTS, {"rent": GRANTS[0]}, {"rent-tax-credit": GRANTS[0]})
+
+RENTER = {"age": 30, "county": "Cork", "home_status": "renting", "employment_status": "employed"}
+
+
+# ── Keys ─────────────────────────────────────────────────────────────────────
+
+def test_key_ignores_county_and_exact_age_within_band():
+    grants = [{"name": "Rent Tax Credit", "match_type": "eligible", "max_amount": 1000}]
+    base = sa.archetype_key(RENTER, grants)
+    assert sa.archetype_key({**RENTER, "age": 33, "county": "Dublin"}, grants) == base
+    assert sa.archetype_key({**RENTER, "age": 40}, grants) != base
+    assert sa.archetype_key(RENTER, [{**grants[0], "match_type": "likely"}]) != base
+
+
+def test_archetype_profile_is_coarse():
+    coarse = sa.archetype_profile({**RENTER, "has_children": True, "num_children": 6})
+    assert coarse["age"] == "25-34"
+    assert coarse["num_children"] == "4+"
+    assert "county" not in coarse
+
+
+# ── Clustering and lookup ────────────────────────────────────────────────────
+
+def test_cluster_profiles_counts_and_filters():
+    owner = {**RENTER, "home_status": "owner"}
+    profiles = [RENTER, {**RENTER, "county": "Galway"}, {**RENTER, "age": 31}, owner]
+    clusters = sa.cluster_profiles(profiles, CATALOGUE, top=10, min_count=2)
+    assert len(clusters) == 1
+    assert clusters[0].scan_count == 3
+    assert [g["name"] for g in clusters[0].matched_grants] == ["Rent Tax Credit"]
+
+
+def test_lookup_matches_scan_grants(monkeypatch):
+    archetype = sa.cluster_profiles([RENTER], CATALOGUE, min_count=1)[0]
+    monkeypatch.setattr(sa, "_load_summaries", lambda version: {archetype.key: "Hello renter"} if version == "v1" else {})
+    sa.invalidate_summaries()
+    scan_grants = [{**g, "match_score": 100} for g in archetype.matched_grants]
+    # The first lookup for a version misses and loads in the background
+    assert sa.lookup_summary("v1", RENTER, scan_grants) is None
+    sa._store.pending.result(timeout=5)
+    assert sa.lookup_summary("v1", {**RENTER, "county": "Kerry"}, scan_grants) == "Hello renter"
+    assert sa.lookup_summary("v2", RENTER, scan_grants) is None
+    sa.invalidate_summaries()
+
+
+def test_stale_summaries_served_while_reloading(monkeypatch):
+    release, loads = threading.Event(), []
+
+    def load(version):
+        loads.append(version)
+        if len(loads) > 1:
+            release.wait(5)
+        return {"k": f"load {len(loads)}"}
+
+    monkeypatch.setattr(sa, "_load_summaries", load)
+    sa.invalidate_summaries()
+    sa._store.get("v1")
+    sa._store.pending.result(timeout=5)
+    assert sa._store.get("v1") == {"k": "load 1"}
+
+    monkeypatch.setattr(sa, "RELOAD_CHECK_INTERVAL", 0.0)
+    for _ in range(3):  # One reload at a time; callers don't wait for it
+        assert sa._store.get("v1") == {"k": "load 1"}
+    release.set()
+    sa._store.pending.result(timeout=5)
+    assert loads == ["v1", "v1"]
+    assert sa._store.summaries == {"k": "load 2"}
+
+    # A failed reload keeps the copy already loaded
+    monkeypatch.setattr(sa, "_load_summaries", lambda version: None)
+    sa._store.get("v1")
+    sa._store.pending.result(timeout=5)
+    assert sa._store.summaries == {"k": "load 2"}
+    sa.invalidate_summaries()
@@ -0,0 +1,31 @@
+"""Unit tests for the in-process TTL cache."""
+
+import time
+
+from app.utils.ttl_cache import TTLCache
+
+
+def test_entries_expire():
+    cache = TTLCache(maxsize=10, ttl=0.01)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert "a" not in cache
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+
+def test_per_entry_ttl_override():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("short", 1, ttl=0)
+    assert cache.pop("short") is None
@@ -47,7 +47,7 @@ export default function ResultsPage() {
   const handleDownloadPDF = async () => {
     setIsDownloading(true);
     try {
-      const response = await reportsAPI.downloadPDF(profile);
+      const response = await reportsAPI.downloadPDF(profile, results.scan_handle);
       const blob = new Blob([response.data], { type: 'application/pdf' });
       const url = window.URL.createObjectURL(blob);
       const link = document.createElement('a');
@@ -69,7 +69,7 @@ export default function ResultsPage() {
     if (!email) return;
     setEmailStatus('sending');
     try {
-      await reportsAPI.emailPDF(profile, email);
+      await reportsAPI.emailPDF(profile, email, results.scan_handle);
       setEmailStatus('sent');
     } catch {
       setEmailStatus('error');
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import type { ProfileData, ScanResponse, AuthTokens, Grant } from '@/types';
+import type { ProfileData, ScanResponse, ScanHistoryPage, ScanDiff, SummaryStatus, AuthTokens, Grant } from '@/types';
 
 const api = axios.create({
   baseURL: process.env.NEXT_PUBLIC_API_URL || '/api/v1',
@@ -69,9 +69,18 @@ export const profileAPI = {
 export const scanAPI = {
   anonymous: (data: ProfileData) =>
     api.post<ScanResponse>('/scan/anonymous', data),
-  run: () => api.post<ScanResponse>('/scan'),
+  // The server returns the previous scan when nothing changed; force recomputes
+  run: (force = false) =>
+    api.post<ScanResponse>('/scan', null, force ? { params: { force: true } } : undefined),
   latest: () => api.get<ScanResponse>('/scan/results'),
-  history: () => api.get('/scan/history'),
+  history: (cursor?: string | null, perPage = 20) =>
+    api.get<ScanHistoryPage>('/scan/history', {
+      params: { per_page: perPage, ...(cursor ? { cursor } : {}) },
+    }),
+  // Defaults to the latest scan against the one before it; live compares with a fresh match
+  diff: (params: { from_scan?: string; to_scan?: string; live?: boolean } = {}) =>
+    api.get<ScanDiff>('/scan/diff', { params }),
+  summary: (token: string) => api.get<SummaryStatus>(`/scan/summary/${token}`),
 };
 
 // ─── Grants ─────────────────────────────────────────────────────────────────
@@ -89,12 +98,13 @@ export const grantsAPI = {
 // ─── Reports ─────────────────────────────────────────────────────────────────
 
 export const reportsAPI = {
-  downloadPDF: (profileData: ProfileData) =>
-    api.post('/reports/download', profileData, {
+  // scanHandle (from the scan response) lets the server reuse the scan's results
+  downloadPDF: (profileData: ProfileData, scanHandle?: string | null) =>
+    api.post('/reports/download', { ...profileData, scan_handle: scanHandle }, {
       responseType: 'blob',
     }),
-  emailPDF: (profileData: ProfileData, email: string) =>
-    api.post('/reports/email', { profile: profileData, email }),
+  emailPDF: (profileData: ProfileData, email: string, scanHandle?: string | null) =>
+    api.post('/reports/email', { profile: profileData, email, scan_handle: scanHandle }),
 };
 
 // ─── Chat ───────────────────────────────────────────────────────────────────
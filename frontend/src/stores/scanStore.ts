@@ -12,36 +12,60 @@ interface ScanState {
   clearResults: () => void;
 }
 
-export const useScanStore = create<ScanState>((set) => ({
-  results: null,
-  isScanning: false,
-  error: null,
+const SUMMARY_POLL_INTERVAL_MS = 1500;
+const SUMMARY_POLL_ATTEMPTS = 20;
 
-  runAnonymousScan: async (profile) => {
-    set({ isScanning: true, error: null });
-    try {
-      const { data } = await scanAPI.anonymous(profile);
-      set({ results: data, isScanning: false });
-    } catch (err: any) {
-      set({
-        isScanning: false,
-        error: err.response?.data?.detail || 'An error occurred while scanning.',
-      });
+export const useScanStore = create<ScanState>((set, get) => {
+  // Swap in the AI summary once the background job finishes
+  const pollSummary = async (token: string) => {
+    for (let i = 0; i < SUMMARY_POLL_ATTEMPTS; i++) {
+      await new Promise((resolve) => setTimeout(resolve, SUMMARY_POLL_INTERVAL_MS));
+      const current = get().results;
+      if (!current || current.summary_token !== token) return;
+      try {
+        const { data } = await scanAPI.summary(token);
+        if (data.status === 'pending') continue;
+        set({ results: { ...current, summary: data.summary } });
+        return;
+      } catch {
+        return;
+      }
     }
-  },
+  };
 
-  runAuthenticatedScan: async () => {
-    set({ isScanning: true, error: null });
-    try {
-      const { data } = await scanAPI.run();
-      set({ results: data, isScanning: false });
-    } catch (err: any) {
-      set({
-        isScanning: false,
-        error: err.response?.data?.detail || 'An error occurred while scanning.',
-      });
-    }
-  },
+  return {
+    results: null,
+    isScanning: false,
+    error: null,
+
+    runAnonymousScan: async (profile) => {
+      set({ isScanning: true, error: null });
+      try {
+        const { data } = await scanAPI.anonymous(profile);
+        set({ results: data, isScanning: false });
+        if (data.summary_token) pollSummary(data.summary_token);
+      } catch (err: any) {
+        set({
+          isScanning: false,
+          error: err.response?.data?.detail || 'An error occurred while scanning.',
+        });
+      }
+    },
+
+    runAuthenticatedScan: async () => {
+      set({ isScanning: true, error: null });
+      try {
+        const { data } = await scanAPI.run();
+        set({ results: data, isScanning: false });
+        if (data.summary_token) pollSummary(data.summary_token);
+      } catch (err: any) {
+        set({
+          isScanning: false,
+          error: err.response?.data?.detail || 'An error occurred while scanning.',
+        });
+      }
+    },
 
-  clearResults: () => set({ results: null, error: null }),
-}));
+    clearResults: () => set({ results: null, error: null }),
+  };
+});
@@ -95,11 +95,59 @@ export interface CategoryResult {
 
 export interface ScanResponse {
   scan_id: string | null;
+  scan_handle?: string | null;
   total_grants_found: number;
   total_potential_value: number;
   categories: CategoryResult[];
   summary: string;
+  summary_token?: string | null;
   generated_at: string;
+  refreshing?: boolean; // A newer scan is being computed in the background
+}
+
+export interface SummaryStatus {
+  token: string;
+  status: 'pending' | 'ready' | 'fallback';
+  summary: string;
+}
+
+export interface ScanHistoryItem {
+  id: string;
+  total_grants: number;
+  total_value: number | null;
+  created_at: string;
+  grants_delta: number | null; // Change in total_grants since the previous scan
+}
+
+export interface ScanHistoryPage {
+  scans: ScanHistoryItem[];
+  per_page: number;
+  next_cursor: string | null; // Pass back as cursor for older scans
+}
+
+export interface GrantChange {
+  grant_id: string;
+  grant_name: string | null; // null if the grant has left the catalogue
+  slug: string | null;
+  match_type_before: 'eligible' | 'likely' | 'possible' | 'not_eligible' | null; // null if newly matched
+  match_type_after: 'eligible' | 'likely' | 'possible' | 'not_eligible' | null; // null if no longer matched
+  score_before: number | null;
+  score_after: number | null;
+  max_amount: number | null;
+}
+
+export interface ScanDiff {
+  from_scan_id: string;
+  to_scan_id: string | null; // null when compared against a live match
+  added: GrantChange[];
+  removed: GrantChange[];
+  upgraded: GrantChange[];
+  downgraded: GrantChange[];
+  rescored: GrantChange[];
+  unchanged: number;
+  total_value_before: number;
+  total_value_after: number;
+  value_delta: number;
 }
 
 // ─── Grant Types ────────────────────────────────────────────────────────────